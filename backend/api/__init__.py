@@ -1,34 +1,64 @@
 import os
+import importlib
 from flask import Flask
 from .config import Config
-from .extensions import db, migrate, bcrypt, cors
-from . import admin_cli
+from .extensions import db, migrate, cors, database_engine_options, init_db_profile
+from . import admin_cli, capabilities
+from .ai_scheduler import ai_scheduler
+from .template_catalog import template_catalog
+from .passwords import password_hasher
+from .json_provider import init_json_provider
+from .compression import response_compressor
+from .slide_renderer import slide_renderer
+from .search import search_index, migration_include_object
+from .media_gc import media_collector
+from .media_server import media_server
+from .metrics import metrics
+from .profiler import request_profiler
+
+# Модули маршрутов импортируются по имени; тяжелые зависимости внутри них грузятся лениво
+BLUEPRINTS = (
+    ('.routes.auth', 'auth_bp', '/api'),
+    ('.routes.presentations', 'presentations_bp', '/api'),
+    ('.routes.slides', 'slides_bp', '/api'),
+    ('.routes.elements', 'elements_bp', '/api'),
+    ('.routes.ai_generator', 'ai_bp', '/api'),
+    ('.routes.templates', 'templates_bp', '/api'),
+    ('.routes.admin', 'admin_bp', '/api'),
+    ('.routes.uploads', 'uploads_bp', '/api'),
+    ('.routes.search', 'search_bp', '/api'),
+    ('.routes.metrics', 'metrics_bp', None),
+)
+
+def register_blueprints(app):
+    for module_name, attribute, url_prefix in BLUEPRINTS:
+        blueprint = getattr(importlib.import_module(module_name, __name__), attribute)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    init_json_provider(app)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', database_engine_options(app.config))
 
     db.init_app(app)
-    migrate.init_app(app, db)
-    bcrypt.init_app(app)
+    init_db_profile(app)
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    migrate.init_app(app, db, include_object=migration_include_object)
     cors.init_app(app)
+    ai_scheduler.init_app(app)
+    template_catalog.init_app(app)
+    password_hasher.init_app(app)
+    response_compressor.init_app(app)
+    slide_renderer.init_app(app)
+    search_index.init_app(app)
+    media_collector.init_app(app)
+    media_server.init_app(app)
 
     admin_cli.init_app(app)
+    capabilities.init_app(app)
 
-    from .routes.auth import auth_bp
-    from .routes.presentations import presentations_bp
-    from .routes.slides import slides_bp
-    from .routes.elements import elements_bp
-    from .routes.ai_generator import ai_bp 
-    from .routes.templates import templates_bp
-    from .routes.admin import admin_bp
-
-    app.register_blueprint(auth_bp, url_prefix='/api')
-    app.register_blueprint(presentations_bp, url_prefix='/api')
-    app.register_blueprint(slides_bp, url_prefix='/api')
-    app.register_blueprint(elements_bp, url_prefix='/api')
-    app.register_blueprint(ai_bp, url_prefix='/api')
-    app.register_blueprint(templates_bp, url_prefix='/api')
-    app.register_blueprint(admin_bp, url_prefix='/api')
+    register_blueprints(app)
 
     return app
\ No newline at end of file
@@ -1,7 +1,12 @@
+import os
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from .extensions import db
 from .models import User, SystemPrompt
+from .uploads import gc_upload_sessions
+from .query_plans import check_query_plans
+from .image_variants import is_variant_source, manifest_path, generate_image_variants
 
 @click.command(name='make-admin')
 @click.argument('email')
@@ -64,6 +69,36 @@ def seed_prompts():
     print("Заполнение промптами завершено.")
 
 
+@click.command(name='gc-upload-sessions')
+@with_appcontext
+def gc_upload_sessions_command():
+    """Удаляет незавершенные сессии поблочной загрузки старше UPLOAD_SESSION_TTL."""
+    removed = gc_upload_sessions(current_app.config['UPLOAD_SESSION_TTL'])
+    print(f"Удалено незавершенных загрузок: {removed}")
+
+
+@click.command(name='image-variants')
+@click.option('--force', is_flag=True, help='Пересоздать варианты, даже если манифест уже есть.')
+@with_appcontext
+def image_variants_command(force):
+    """Строит уменьшенные WebP/JPEG-варианты для уже загруженных изображений."""
+    config = current_app.config
+    folder = config['UPLOAD_FOLDER']
+    built = 0
+    for name in sorted(os.listdir(folder)) if os.path.isdir(folder) else ():
+        path = os.path.join(folder, name)
+        if not is_variant_source(name) or (not force and os.path.exists(manifest_path(path))):
+            continue
+        manifest = generate_image_variants(
+            path, config['IMAGE_VARIANT_WIDTHS'], config['IMAGE_VARIANT_FORMATS'], config['IMAGE_VARIANT_QUALITY']
+        )
+        built += manifest is not None
+    print(f"Построены варианты для изображений: {built}")
+
+
 def init_app(app):
     app.cli.add_command(make_admin)
-    app.cli.add_command(seed_prompts)
\ No newline at end of file
+    app.cli.add_command(seed_prompts)
+    app.cli.add_command(gc_upload_sessions_command)
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(image_variants_command)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from .metrics import metrics
+
+
+class AiQueueFull(Exception):
+    pass
+
+
+class AiQueueTimeout(Exception):
+    def __init__(self, position):
+        super().__init__(f"AI queue timeout at position {position}")
+        self.position = position
+
+
+class _Ticket:
+    __slots__ = ('user_id', 'enqueued_at', 'granted')
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class AiScheduler:
+    def __init__(self, max_concurrent=4, max_per_user=1, max_queued_per_user=3, queue_timeout=120):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queued_per_user = max_queued_per_user
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._running = {}
+        self._total_running = 0
+        # Порядок ключей задает очередность обхода пользователей (round-robin)
+        self._queues = OrderedDict()
+
+    def init_app(self, app):
+        self.max_concurrent = app.config.get('AI_MAX_CONCURRENT', self.max_concurrent)
+        self.max_per_user = app.config.get('AI_MAX_PER_USER', self.max_per_user)
+        self.max_queued_per_user = app.config.get('AI_MAX_QUEUED_PER_USER', self.max_queued_per_user)
+        self.queue_timeout = app.config.get('AI_QUEUE_TIMEOUT', self.queue_timeout)
+        app.extensions['ai_scheduler'] = self
+
+    def _dispatch(self):
+        granted_any = False
+        while self._total_running < self.max_concurrent:
+            chosen = None
+            for user_id, queue in self._queues.items():
+                if queue and self._running.get(user_id, 0) < self.max_per_user:
+                    chosen = user_id
+                    break
+            if chosen is None:
+                break
+
+            ticket = self._queues[chosen].popleft()
+            ticket.granted = True
+            self._running[chosen] = self._running.get(chosen, 0) + 1
+            self._total_running += 1
+            granted_any = True
+
+            if self._queues[chosen]:
+                self._queues.move_to_end(chosen)
+            else:
+                del self._queues[chosen]
+
+        if granted_any:
+            self._cond.notify_all()
+
+    def _position(self, ticket):
+        queue = self._queues.get(ticket.user_id)
+        if not queue or ticket not in queue:
+            return 0
+        index = queue.index(ticket)
+        ahead = 0
+        before_ticket_user = True
+        for user_id, other in self._queues.items():
+            if user_id == ticket.user_id:
+                ahead += index
+                before_ticket_user = False
+                continue
+            ahead += min(len(other), index)
+            if before_ticket_user and len(other) > index:
+                ahead += 1
+        return ahead + 1
+
+    def acquire(self, user_id, timeout=None):
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._cond:
+            queue = self._queues.get(user_id)
+            if queue is not None and len(queue) >= self.max_queued_per_user:
+                raise AiQueueFull()
+
+            ticket = _Ticket(user_id)
+            self._queues.setdefault(user_id, deque()).append(ticket)
+            self._dispatch()
+
+            deadline = time.monotonic() + timeout
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    position = self._position(ticket)
+                    queue = self._queues.get(user_id)
+                    if queue is not None:
+                        queue.remove(ticket)
+                        if not queue:
+                            del self._queues[user_id]
+                    raise AiQueueTimeout(position)
+                self._cond.wait(remaining)
+            return ticket
+
+    def release(self, ticket):
+        with self._cond:
+            user_id = ticket.user_id
+            self._running[user_id] -= 1
+            if not self._running[user_id]:
+                del self._running[user_id]
+            self._total_running -= 1
+            self._dispatch()
+
+    def status(self, user_id):
+        with self._cond:
+            queue = self._queues.get(user_id) or ()
+            positions = [self._position(ticket) for ticket in queue]
+            return {
+                'running': self._running.get(user_id, 0),
+                'queued': len(queue),
+                'position': min(positions) if positions else 0,
+                'total_running': self._total_running,
+                'total_queued': sum(len(q) for q in self._queues.values()),
+                'max_concurrent': self.max_concurrent,
+                'max_per_user': self.max_per_user,
+            }
+
+    def depth(self):
+        with self._cond:
+            return {
+                'running': self._total_running,
+                'queued': sum(len(q) for q in self._queues.values()),
+            }
+
+
+ai_scheduler = AiScheduler()
+
+metrics.gauge(
+    'ai_requests', 'Запросы к ИИ: выполняются (running) и ждут в очереди (queued).', ('state',),
+    collect=ai_scheduler.depth
+)
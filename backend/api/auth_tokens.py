@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+import jwt
+from flask import current_app
+from sqlalchemy import select, update, delete, or_
+from .extensions import db
+from .models import User, UserSession
+
+ACCESS_TOKEN = 'access'
+REFRESH_TOKEN = 'refresh'
+REUSE_GRACE = timedelta(seconds=10)
+
+
+class TokenError(Exception):
+    pass
+
+
+class CurrentUser:
+    """Пользователь из claims access-токена; в базу при проверке токена не ходим."""
+    __slots__ = ('id', 'email', 'is_admin', 'can_use_ai', 'session_id')
+
+    def __init__(self, id, email, is_admin, can_use_ai, session_id):
+        self.id = id
+        self.email = email
+        self.is_admin = is_admin
+        self.can_use_ai = can_use_ai
+        self.session_id = session_id
+
+    @classmethod
+    def from_claims(cls, claims):
+        return cls(
+            id=claims['user_id'],
+            email=claims.get('email'),
+            is_admin=claims.get('is_admin', False),
+            can_use_ai=claims.get('can_use_ai', False),
+            session_id=claims.get('sid'),
+        )
+
+
+def _encode(payload, ttl):
+    payload['exp'] = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm="HS256")
+
+
+def _decode(token, token_type):
+    try:
+        claims = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+    except jwt.PyJWTError as e:
+        raise TokenError(str(e))
+    if claims.get('type') != token_type:
+        raise TokenError('Неверный тип токена')
+    return claims
+
+
+def decode_access_token(token):
+    return CurrentUser.from_claims(_decode(token, ACCESS_TOKEN))
+
+
+def _issue_tokens(user, session_id, generation):
+    access_token = _encode({
+        'type': ACCESS_TOKEN,
+        'user_id': user.id,
+        'email': user.email,
+        'is_admin': user.is_admin,
+        'can_use_ai': user.can_use_ai,
+        'sid': session_id,
+    }, current_app.config['ACCESS_TOKEN_TTL'])
+    refresh_token = _encode({
+        'type': REFRESH_TOKEN,
+        'sid': session_id,
+        'gen': generation,
+    }, current_app.config['REFRESH_TOKEN_TTL'])
+    return access_token, refresh_token
+
+
+def start_session(user):
+    now = datetime.utcnow()
+    # Заодно убираем истекшие и отозванные сессии этого пользователя (индекс по user_id)
+    db.session.execute(delete(UserSession).where(
+        UserSession.user_id == user.id,
+        or_(UserSession.expires_at < now, UserSession.revoked_at.isnot(None))
+    ))
+    session = UserSession(
+        user_id=user.id,
+        generation=0,
+        created_at=now,
+        last_used_at=now,
+        expires_at=now + timedelta(seconds=current_app.config['REFRESH_TOKEN_TTL']),
+    )
+    db.session.add(session)
+    db.session.flush()
+    return _issue_tokens(user, session.id, session.generation)
+
+
+def refresh_session(refresh_token):
+    claims = _decode(refresh_token, REFRESH_TOKEN)
+    row = db.session.execute(
+        select(UserSession, User).join(User, User.id == UserSession.user_id).where(UserSession.id == claims.get('sid'))
+    ).first()
+    if row is None:
+        raise TokenError('Сессия не найдена')
+    session, user = row
+
+    now = datetime.utcnow()
+    if session.revoked_at is not None or session.expires_at < now:
+        raise TokenError('Сессия завершена')
+    if claims.get('gen') != session.generation:
+        # Предыдущий токен только что обменяла соседняя вкладка — просто отказываем
+        if claims.get('gen') == session.generation - 1 and now - session.last_used_at < REUSE_GRACE:
+            raise TokenError('Refresh-токен уже обновлен')
+        # Иначе старый refresh-токен предъявлен повторно: вероятна утечка, закрываем сессию
+        session.revoked_at = now
+        db.session.commit()
+        raise TokenError('Refresh-токен уже использован')
+
+    rotated = db.session.execute(
+        update(UserSession)
+        .where(UserSession.id == session.id, UserSession.generation == session.generation)
+        .values(generation=UserSession.generation + 1, last_used_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if rotated.rowcount != 1:
+        db.session.rollback()
+        raise TokenError('Refresh-токен уже обновлен')
+    tokens = _issue_tokens(user, session.id, session.generation + 1)
+    db.session.commit()
+    return tokens, user
+
+
+def revoke_session(refresh_token):
+    try:
+        claims = _decode(refresh_token, REFRESH_TOKEN)
+    except TokenError:
+        return False
+    session = db.session.get(UserSession, claims.get('sid'))
+    if session is None or session.revoked_at is not None:
+        return False
+    session.revoked_at = datetime.utcnow()
+    db.session.commit()
+    return True
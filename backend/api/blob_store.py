@@ -0,0 +1,93 @@
+import os
+import time
+import hashlib
+from flask import current_app
+from .extensions import db
+from .models import Presentation, Slide, SlideElement, MEDIA_ELEMENT_TYPES, MEDIA_ELEMENT_FILTER
+from .media_previews import preview_paths
+from .image_variants import variant_paths, forget_manifests
+
+COPY_BUFFER_SIZE = 1024 * 1024
+UPLOADS_URL_MARKER = '/static/uploads/'
+
+
+def save_stream_hashed(stream, dest_path):
+    digest = hashlib.sha256()
+    with open(dest_path, 'wb') as f:
+        for block in iter(lambda: stream.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+            f.write(block)
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def blob_name(digest, extension):
+    return f"{digest}{extension.lower()}"
+
+
+def commit_blob(source_path, digest, extension, subdir=''):
+    folder = os.path.join(current_app.config['UPLOAD_FOLDER'], subdir)
+    os.makedirs(folder, exist_ok=True)
+    filename = blob_name(digest, extension)
+    target_path = os.path.join(folder, filename)
+    if os.path.exists(target_path):
+        os.remove(source_path)
+        # Повторная загрузка продлевает жизнь файлу: сборщик мусора не удалит его до появления ссылки
+        os.utime(target_path)
+        return filename, False
+    os.replace(source_path, target_path)
+    return filename, True
+
+
+def local_media_path(url):
+    if not url or UPLOADS_URL_MARKER not in url:
+        return None
+    relative_path = url.split(UPLOADS_URL_MARKER, 1)[1]
+    parts = relative_path.split('/')
+    if any(part in ('', '.', '..') for part in parts):
+        return None
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], *parts)
+
+
+def count_media_references(url):
+    element_refs = db.session.query(db.func.count(SlideElement.id)).filter(
+        db.text(MEDIA_ELEMENT_FILTER), SlideElement.content == url
+    ).scalar()
+    background_refs = db.session.query(db.func.count(Slide.id)).filter(Slide.background_image == url).scalar()
+    preview_refs = db.session.query(db.func.count(Presentation.id)).filter(Presentation.preview_image == url).scalar()
+    return element_refs + background_refs + preview_refs
+
+
+def release_media(url):
+    path = local_media_path(url)
+    if not path or not os.path.exists(path):
+        return False
+    if count_media_references(url) > 0:
+        return False
+    # Дедупликация: этот же blob могли только что загрузить заново, а элемент с его URL еще не создан.
+    # commit_blob обновляет mtime при совпадении, поэтому свежие файлы оставляем сборщику мусора
+    grace_period = current_app.config.get('MEDIA_GC_GRACE_PERIOD', 0)
+    try:
+        if time.time() - os.path.getmtime(path) < grace_period:
+            return False
+    except OSError:
+        return False
+
+    try:
+        os.remove(path)
+        for derived_path in (*preview_paths(path).values(), *variant_paths(path)):
+            if os.path.exists(derived_path):
+                os.remove(derived_path)
+    except OSError as e:
+        print(f"Error deleting media file {path}: {e}")
+        return False
+    finally:
+        forget_manifests()
+    return True
@@ -0,0 +1,64 @@
+import sys
+import importlib.util
+import click
+from flask import jsonify
+from flask.cli import with_appcontext
+
+# Тяжелые и платформенные зависимости подгружаются только при первом обращении
+BACKENDS = {
+    'pptx': {'modules': ('pptx',), 'description': 'Экспорт и импорт PPTX (python-pptx)'},
+    'imaging': {'modules': ('PIL',), 'description': 'Обработка изображений (Pillow)'},
+    'media': {'modules': ('ffmpeg',), 'description': 'Перекодирование видео и превью (ffmpeg-python)'},
+    'waveform': {'modules': ('numpy',), 'description': 'Волновые формы аудио (numpy)'},
+    'powerpoint': {
+        'modules': ('win32com', 'pythoncom'),
+        'platform': 'win32',
+        'description': 'Конвертация в PDF через MS PowerPoint (pywin32)',
+    },
+    'gigachat': {'modules': ('gigachat',), 'description': 'Генерация текста (GigaChat)'},
+}
+
+_available = {}
+
+
+class BackendUnavailable(Exception):
+    def __init__(self, name):
+        self.name = name
+        super().__init__(f"Функция недоступна на этом сервере: {BACKENDS[name]['description']}")
+
+
+def is_available(name):
+    if name not in _available:
+        backend = BACKENDS[name]
+        platform = backend.get('platform')
+        _available[name] = (platform is None or sys.platform == platform) and all(
+            importlib.util.find_spec(module) is not None for module in backend['modules']
+        )
+    return _available[name]
+
+
+def require(name):
+    if not is_available(name):
+        raise BackendUnavailable(name)
+
+
+def capabilities():
+    return {name: is_available(name) for name in BACKENDS}
+
+
+def handle_backend_unavailable(error):
+    return jsonify({'message': str(error), 'capability': error.name}), 501
+
+
+@click.command(name='capabilities')
+@with_appcontext
+def capabilities_command():
+    """Показывает, какие необязательные бэкенды доступны на этом сервере."""
+    for name, available in capabilities().items():
+        status = 'ok' if available else '--'
+        print(f"[{status}] {name}: {BACKENDS[name]['description']}")
+
+
+def init_app(app):
+    app.register_error_handler(BackendUnavailable, handle_backend_unavailable)
+    app.cli.add_command(capabilities_command)
@@ -11,4 +11,68 @@ class Config:
     KANDINSKY_API_KEY=os.environ.get('KANDINSKY_API_KEY')
     KANDINSKY_SECRET_KEY=os.environ.get('KANDINSKY_SECRET_KEY')
     TELEGRAM_BOT_TOKEN=os.environ.get('TELEGRAM_BOT_TOKEN')
-    TELEGRAM_CHAT_ID=os.environ.get('TELEGRAM_CHAT_ID')
\ No newline at end of file
+    TELEGRAM_CHAT_ID=os.environ.get('TELEGRAM_CHAT_ID')
+    FUSIONBRAIN_API_URL = os.environ.get('FUSIONBRAIN_API_URL', 'https://api-key.fusionbrain.ai/')
+    FUSIONBRAIN_POLL_INTERVAL = float(os.environ.get('FUSIONBRAIN_POLL_INTERVAL', 5))
+    TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')
+    GIGACHAT_BASE_URL = os.environ.get('GIGACHAT_BASE_URL')
+    GIGACHAT_AUTH_URL = os.environ.get('GIGACHAT_AUTH_URL')
+    AI_MAX_CONCURRENT = int(os.environ.get('AI_MAX_CONCURRENT', 4))
+    AI_MAX_PER_USER = int(os.environ.get('AI_MAX_PER_USER', 1))
+    AI_MAX_QUEUED_PER_USER = int(os.environ.get('AI_MAX_QUEUED_PER_USER', 3))
+    AI_QUEUE_TIMEOUT = int(os.environ.get('AI_QUEUE_TIMEOUT', 120))
+    MEDIA_WORKERS = int(os.environ.get('MEDIA_WORKERS', 2))
+    VIDEO_TRANSCODE_PRESET = os.environ.get('VIDEO_TRANSCODE_PRESET', 'veryfast')
+    VIDEO_TRANSCODE_CRF = int(os.environ.get('VIDEO_TRANSCODE_CRF', 23))
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+    UPLOAD_CHUNK_MAX_SIZE = int(os.environ.get('UPLOAD_CHUNK_MAX_SIZE', 32 * 1024 * 1024))
+    UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+    PPTX_IMPORT_SYNC_MAX_SIZE = int(os.environ.get('PPTX_IMPORT_SYNC_MAX_SIZE', 5 * 1024 * 1024))
+    PPTX_IMPORT_MAX_SLIDES = int(os.environ.get('PPTX_IMPORT_MAX_SLIDES', 500))
+    UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', 24 * 60 * 60))
+    TEMPLATE_CATALOG_TTL = int(os.environ.get('TEMPLATE_CATALOG_TTL', 60))
+    SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') == '1'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 15000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    ACCESS_TOKEN_TTL = int(os.environ.get('ACCESS_TOKEN_TTL', 15 * 60))
+    REFRESH_TOKEN_TTL = int(os.environ.get('REFRESH_TOKEN_TTL', 30 * 24 * 3600))
+    JSON_USE_ORJSON = os.environ.get('JSON_USE_ORJSON', '1') == '1'
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    STRUCTURED_LOGS = os.environ.get('STRUCTURED_LOGS', '1') == '1'
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '1') == '1'
+    PROFILER_DIR = os.environ.get('PROFILER_DIR')
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 5))
+    PROFILER_MAX_CAPTURES = int(os.environ.get('PROFILER_MAX_CAPTURES', 50))
+    PROFILER_MAX_STATEMENTS = int(os.environ.get('PROFILER_MAX_STATEMENTS', 500))
+    SLIDE_RENDER_WORKERS = int(os.environ.get('SLIDE_RENDER_WORKERS', os.cpu_count() or 2))
+    SLIDE_RENDER_SCALE = float(os.environ.get('SLIDE_RENDER_SCALE', 1.0))
+    SLIDE_RENDER_TIMEOUT = int(os.environ.get('SLIDE_RENDER_TIMEOUT', 300))
+    SLIDE_RENDER_FONT = os.environ.get('SLIDE_RENDER_FONT')
+    SLIDE_RENDER_IMAGE_CACHE_SIZE = int(os.environ.get('SLIDE_RENDER_IMAGE_CACHE_SIZE', 64 * 1024 * 1024))
+    BULK_EXPORT_WORKERS = int(os.environ.get('BULK_EXPORT_WORKERS', 4))
+    BULK_EXPORT_ASSET_CACHE_SIZE = int(os.environ.get('BULK_EXPORT_ASSET_CACHE_SIZE', 256 * 1024 * 1024))
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+    IMAGE_VARIANT_WIDTHS = tuple(int(width) for width in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640,1280,1920').split(',') if width)
+    IMAGE_VARIANT_FORMATS = tuple(os.environ.get('IMAGE_VARIANT_FORMATS', 'webp').split(','))
+    IMAGE_VARIANT_QUALITY = int(os.environ.get('IMAGE_VARIANT_QUALITY', 80))
+    MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', 365 * 24 * 60 * 60))
+    MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE')
+    MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-uploads/')
+    MEDIA_GC_INTERVAL = int(os.environ.get('MEDIA_GC_INTERVAL', 0))
+    MEDIA_GC_GRACE_PERIOD = int(os.environ.get('MEDIA_GC_GRACE_PERIOD', 24 * 60 * 60))
\ No newline at end of file
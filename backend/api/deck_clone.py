@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import select, insert
+from .extensions import db
+from .models import Presentation, Slide, SlideElement
+from .serializers import element_order_columns
+from .search import search_index
+
+SLIDE_COPY_COLUMNS = ('background_color', 'background_image')
+ELEMENT_COPY_COLUMNS = (
+    'element_type', 'pos_x', 'pos_y', 'width', 'height', 'content',
+    'font_size', 'autoplay', 'muted', 'status'
+)
+
+
+def _load_deck_rows(presentation_id):
+    element_columns = [getattr(SlideElement, name).label(f'el_{name}') for name in ELEMENT_COPY_COLUMNS]
+    query = (
+        select(Slide.id, *[getattr(Slide, name) for name in SLIDE_COPY_COLUMNS], SlideElement.id.label('el_id'), *element_columns)
+        .select_from(Slide)
+        .outerjoin(SlideElement, SlideElement.slide_id == Slide.id)
+        .where(Slide.presentation_id == presentation_id)
+        .order_by(Slide.slide_number, Slide.id, *element_order_columns())
+    )
+    return db.session.execute(query).all()
+
+
+def insert_deck(presentation_id, title, user_id, slide_rows, elements_by_slide, is_template=False):
+    """Пакетная вставка презентации: slide_rows — поля слайдов по порядку, elements_by_slide — их элементы."""
+    now = datetime.utcnow()
+    db.session.execute(insert(Presentation).values(
+        id=presentation_id, title=title, user_id=user_id,
+        is_template=is_template, created_at=now, updated_at=now
+    ))
+
+    if not slide_rows:
+        slide_rows, elements_by_slide = [{}], [[]]
+    slide_rows = [
+        {**row, 'slide_number': number, 'presentation_id': presentation_id}
+        for number, row in enumerate(slide_rows, start=1)
+    ]
+
+    # Один executemany с RETURNING выдает id всех новых слайдов в порядке параметров
+    new_slide_ids = db.session.scalars(
+        insert(Slide).returning(Slide.id, sort_by_parameter_order=True),
+        slide_rows
+    ).all()
+
+    element_rows = [
+        {'id': str(uuid.uuid4()), 'slide_id': slide_id, **element}
+        for slide_id, elements in zip(new_slide_ids, elements_by_slide)
+        for element in elements
+    ]
+    if element_rows:
+        db.session.execute(insert(SlideElement), element_rows)
+
+    # Вставка идет мимо ORM, поэтому поисковый индекс обновляем явно
+    search_index.index_presentation(presentation_id)
+    return presentation_id
+
+
+def clone_presentation(source_id, user_id, title, is_template=False):
+    slide_rows = []
+    elements_by_slide = []
+    previous_slide_id = None
+    for row in _load_deck_rows(source_id):
+        if row.id != previous_slide_id:
+            previous_slide_id = row.id
+            slide_rows.append({name: getattr(row, name) for name in SLIDE_COPY_COLUMNS})
+            elements_by_slide.append([])
+        if row.el_id is not None:
+            elements_by_slide[-1].append({name: getattr(row, f'el_{name}') for name in ELEMENT_COPY_COLUMNS})
+
+    return insert_deck(str(uuid.uuid4()), title, user_id, slide_rows, elements_by_slide, is_template)
\ No newline at end of file
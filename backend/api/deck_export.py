@@ -0,0 +1,224 @@
+import io
+import os
+import re
+import time
+import zipfile
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from werkzeug.security import safe_join
+from flask import current_app, Response
+from .blob_store import local_media_path
+from .metrics import timed_http, export_duration, log_event
+
+SERVER_BASE_URL = 'http://127.0.0.1:5000'
+DEFAULT_WORKERS = 4
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+# Собранная презентация до этого размера держится в памяти, крупнее уходит во временный файл
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+MAX_NAME_LENGTH = 100
+ERRORS_NAME = 'errors.txt'
+UNSAFE_NAME_RE = re.compile(r'[\x00-\x1f\\/:*?"<>|]+')
+
+
+def _download_image(image_url):
+    if image_url.startswith('/'):
+        image_url = f"{SERVER_BASE_URL}{image_url}"
+    try:
+        response = timed_http('image_download', 'GET', image_url, stream=True, timeout=30)
+        response.raise_for_status()
+        return response.content
+    except Exception as e:
+        print(f"Ошибка загрузки изображения {image_url}: {e}")
+        return None
+
+
+def _local_image_path(url):
+    path = url.split('?', 1)[0]
+    if '/static/uploads/' in path:
+        return local_media_path(path)
+    if path.startswith('/static/'):
+        return safe_join(current_app.static_folder, path[len('/static/'):])
+    return None
+
+
+class AssetCache:
+    """Картинки для сборки PPTX, общие для всех презентаций одного экспорта.
+
+    Собственные файлы читаются с диска, а не HTTP-запросом к самому серверу. Внешние картинки
+    (и эскизы YouTube) скачиваются один раз, даже если их одновременно ждут несколько потоков;
+    неудачная загрузка тоже запоминается. Кеш ограничен суммарным размером в байтах.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.downloads = 0
+        self.hits = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def image(self, url):
+        """BytesIO с содержимым картинки или None, если ее не удалось получить."""
+        path = _local_image_path(url)
+        if path is not None:
+            try:
+                with open(path, 'rb') as f:
+                    return io.BytesIO(f.read())
+            except OSError as e:
+                print(f"Ошибка чтения изображения {url}: {e}")
+                return None
+        data = self._remote(url)
+        return io.BytesIO(data) if data is not None else None
+
+    def _remote(self, url):
+        while True:
+            with self._lock:
+                if url in self._entries:
+                    self._entries.move_to_end(url)
+                    self.hits += 1
+                    return self._entries[url]
+                event = self._inflight.get(url)
+                if event is None:
+                    event = self._inflight[url] = threading.Event()
+                    self.downloads += 1
+                    break
+            # Тот же URL уже скачивает другой поток
+            event.wait()
+        data = None
+        try:
+            data = _download_image(url)
+        finally:
+            with self._lock:
+                self._store(url, data)
+                del self._inflight[url]
+            event.set()
+        return data
+
+    def _store(self, url, data):
+        size = len(data) if data is not None else 0
+        if size > self.max_size:
+            return
+        self._entries[url] = data
+        self._size += size
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted) if evicted is not None else 0
+
+
+def archive_names(titles):
+    """Имена файлов в архиве по названиям презентаций: без запрещенных символов и без повторов."""
+    names, used = [], set()
+    for title in titles:
+        base = UNSAFE_NAME_RE.sub('_', title or '').strip(' .')[:MAX_NAME_LENGTH] or 'Презентация'
+        name, copy = f"{base}.pptx", 1
+        while name.lower() in used or name == ERRORS_NAME:
+            copy += 1
+            name = f"{base} ({copy}).pptx"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+class _ZipSink:
+    # Неперематываемый приемник: zipfile пишет в него, а генератор ответа забирает накопленное
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _entry_info(name, size):
+    info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+    # PPTX уже сжат внутри, повторное сжатие только тратит процессор
+    info.compress_type = zipfile.ZIP_STORED
+    info.external_attr = 0o644 << 16
+    info.file_size = size
+    return info
+
+
+def stream_decks_zip(app, decks, build, workers=DEFAULT_WORKERS, cache_size=DEFAULT_CACHE_SIZE):
+    """Генератор ZIP-архива из презентаций decks — списка (id, имя файла в архиве).
+
+    build(presentation_id, assets) возвращает объект python-pptx. Сборки идут в пуле из workers
+    потоков через общий AssetCache, одновременно в работе не больше workers презентаций.
+    Готовая презентация сразу дописывается в поток ответа кусками, поэтому целиком архив
+    нигде не хранится. Ошибки отдельных презентаций перечисляются в errors.txt в конце архива.
+    """
+    assets = AssetCache(cache_size)
+    sink = _ZipSink()
+    pending = iter(decks)
+    running = {}
+    failed = []
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='deck-export')
+
+    def build_file(presentation_id):
+        with app.app_context():
+            prs = build(presentation_id, assets)
+            deck_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            prs.save(deck_file)
+            return deck_file
+
+    def submit_next():
+        deck = next(pending, None)
+        if deck is not None:
+            running[executor.submit(build_file, deck[0])] = deck
+
+    try:
+        with export_duration.time(format='pptx_zip'):
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for _ in range(workers):
+                    submit_next()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        presentation_id, name = running.pop(future)
+                        submit_next()
+                        try:
+                            deck_file = future.result()
+                        except Exception as e:
+                            print(f"Не удалось собрать презентацию {presentation_id} для архива: {e}")
+                            failed.append(f"{name}: не удалось собрать презентацию")
+                            continue
+                        with deck_file:
+                            size = deck_file.seek(0, os.SEEK_END)
+                            deck_file.seek(0)
+                            with archive.open(_entry_info(name, size), 'w') as entry:
+                                while chunk := deck_file.read(CHUNK_SIZE):
+                                    entry.write(chunk)
+                                    yield sink.drain()
+                if failed:
+                    archive.writestr(ERRORS_NAME, '\n'.join(failed) + '\n')
+            yield sink.drain()
+        log_event(
+            'deck_export', decks=len(decks), failed=len(failed), asset_downloads=assets.downloads,
+            asset_hits=assets.hits, duration_ms=round((time.monotonic() - started) * 1000)
+        )
+    finally:
+        # Клиент мог оборвать скачивание: еще не начатые сборки отменяются
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def zip_response(app, decks, build, download_name):
+    config = app.config
+    stream = stream_decks_zip(
+        app, decks, build, config.get('BULK_EXPORT_WORKERS', DEFAULT_WORKERS),
+        config.get('BULK_EXPORT_ASSET_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+    )
+    response = Response(stream, mimetype='application/zip', direct_passthrough=True)
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return response
\ No newline at end of file
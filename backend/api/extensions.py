@@ -1,9 +1,53 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from flask_bcrypt import Bcrypt
 from flask_cors import CORS
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 
 db = SQLAlchemy()
 migrate = Migrate()
-bcrypt = Bcrypt()
-cors = CORS()
\ No newline at end of file
+cors = CORS()
+
+
+def _is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def database_engine_options(config):
+    if _is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        # Ожидание блокировки в драйвере согласуем с PRAGMA busy_timeout
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def sqlite_pragmas(config):
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': config['SQLITE_SYNCHRONOUS'],
+        'busy_timeout': config['SQLITE_BUSY_TIMEOUT_MS'],
+        'mmap_size': config['SQLITE_MMAP_SIZE'],
+        'cache_size': -config['SQLITE_CACHE_SIZE_KB'],
+        'temp_store': 'MEMORY',
+    }
+
+
+def init_db_profile(app):
+    if not _is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']) or not app.config.get('SQLITE_TUNING', True):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+
+    def apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', apply_pragmas)
@@ -0,0 +1,132 @@
+import os
+import re
+import json
+import uuid
+import posixpath
+from functools import lru_cache
+from .capabilities import is_available
+
+DEFAULT_WIDTHS = (320, 640, 1280, 1920)
+DEFAULT_FORMATS = ('webp',)
+DEFAULT_QUALITY = 80
+FORMATS = {
+    'webp': {'mime': 'image/webp', 'pil': 'WEBP', 'extension': 'webp'},
+    'jpeg': {'mime': 'image/jpeg', 'pil': 'JPEG', 'extension': 'jpg'},
+}
+MANIFEST_SUFFIX = '.variants.json'
+VARIANT_SUFFIX_RE = re.compile(r'\.w\d+\.(webp|jpg)$')
+MANIFEST_CACHE_SIZE = 4096
+# Растровые форматы, которые Pillow открывает; SVG и анимации отдаются как есть
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif', '.tif', '.tiff')
+
+
+def is_variant_source(filename):
+    # Сами варианты (<имя>.w320.webp) и служебные файлы имеют составное расширение
+    stem, extension = os.path.splitext(filename)
+    return extension.lower() in SOURCE_EXTENSIONS and '.' not in stem
+
+
+def manifest_path(image_path):
+    return f"{os.path.splitext(image_path)[0]}{MANIFEST_SUFFIX}"
+
+
+def variant_filename(image_path, width, extension):
+    return f"{os.path.basename(os.path.splitext(image_path)[0])}.w{width}.{extension}"
+
+
+def variant_paths(image_path):
+    """Все производные файлы картинки: уменьшенные копии и манифест."""
+    folder = os.path.dirname(image_path)
+    prefix = f"{os.path.basename(os.path.splitext(image_path)[0])}."
+    paths = [manifest_path(image_path)]
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(prefix) and VARIANT_SUFFIX_RE.fullmatch(name[len(prefix) - 1:]):
+                    paths.append(entry.path)
+    except OSError:
+        pass
+    return paths
+
+
+def _save_atomic(path, write):
+    # Уникальное временное имя: повторная загрузка той же картинки может запустить вторую задачу параллельно
+    part_path = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        write(part_path)
+        os.replace(part_path, path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def _save_variant(image, path, spec, quality):
+    options = {'method': 4} if spec['pil'] == 'WEBP' else {'optimize': True}
+    image.save(path, format=spec['pil'], quality=quality, **options)
+
+
+def generate_image_variants(image_path, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, quality=DEFAULT_QUALITY):
+    """Уменьшенные копии изображения и манифест с их списком; выполняется в пуле процессов media_jobs."""
+    if not is_available('imaging') or not image_path.lower().endswith(SOURCE_EXTENSIONS):
+        return None
+    from PIL import Image, ImageOps
+    folder = os.path.dirname(image_path)
+    try:
+        with Image.open(image_path) as source:
+            if getattr(source, 'n_frames', 1) > 1:
+                return None
+            image = ImageOps.exif_transpose(source)
+            image.load()
+        manifest = {'width': image.width, 'height': image.height, 'variants': []}
+        # Увеличивать не имеет смысла: варианты только меньше оригинала
+        for width in sorted(w for w in widths if w < image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for name in formats:
+                spec = FORMATS[name]
+                variant = resized.convert('RGB') if spec['pil'] == 'JPEG' else resized
+                filename = variant_filename(image_path, width, spec['extension'])
+                _save_atomic(os.path.join(folder, filename), lambda path: _save_variant(variant, path, spec, quality))
+                manifest['variants'].append({'width': width, 'type': spec['mime'], 'file': filename})
+
+        def write_manifest(path):
+            with open(path, 'w') as f:
+                json.dump(manifest, f)
+        # Манифест пишется последним: по нему API понимает, что все варианты готовы
+        _save_atomic(manifest_path(image_path), write_manifest)
+        return manifest
+    except Exception as e:
+        print(f"Не удалось построить варианты изображения {image_path}: {e}")
+        return None
+
+
+@lru_cache(maxsize=MANIFEST_CACHE_SIZE)
+def _load_manifest(path):
+    # Исключения не кешируются: манифест, которого еще нет, появится после фоновой задачи
+    with open(path) as f:
+        return json.load(f)
+
+
+def forget_manifests():
+    # lru_cache не умеет удалять отдельный ключ; манифесты перечитаются при следующем обращении
+    _load_manifest.cache_clear()
+
+
+def image_variant_urls(content_url, upload_folder):
+    """srcset по MIME-типу для IMAGE-элемента: {'srcset': {'image/webp': 'url 320w, url 640w'}}."""
+    if not content_url or '/static/uploads/' not in content_url:
+        return {}
+    filename = content_url.split('/')[-1]
+    try:
+        manifest = _load_manifest(manifest_path(os.path.join(upload_folder, filename)))
+    except (OSError, ValueError):
+        return {}
+    if not manifest['variants']:
+        return {}
+    url_dir = posixpath.dirname(content_url)
+    srcset = {}
+    for variant in manifest['variants']:
+        candidate = f"{url_dir}/{variant['file']} {variant['width']}w"
+        srcset[variant['type']] = f"{srcset[variant['type']]}, {candidate}" if variant['type'] in srcset else candidate
+    return {'srcset': srcset, 'naturalWidth': manifest['width'], 'naturalHeight': manifest['height']}
\ No newline at end of file
@@ -0,0 +1,176 @@
+import os
+import time
+import threading
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select, union
+from .extensions import db
+from .models import Presentation, Slide, SlideElement, MediaJob, MEDIA_ELEMENT_FILTER
+from .blob_store import UPLOADS_URL_MARKER
+from .media_jobs import PENDING_STATUSES
+from .media_previews import preview_paths
+from .image_variants import MANIFEST_SUFFIX, VARIANT_SUFFIX_RE, forget_manifests
+from .uploads import SESSIONS_DIR, gc_upload_sessions
+from .metrics import metrics, log_event
+
+STAMP_FILE = '.media-gc'
+# Суффиксы производных файлов (постеры, раскадровки, волновые формы, варианты картинок) от имени исходника
+PREVIEW_SUFFIXES = tuple(preview_paths('').values()) + (MANIFEST_SUFFIX,)
+
+media_gc_removed_files = metrics.counter('media_gc_removed_files_total', 'Файлы, удаленные сборщиком медиа.')
+media_gc_reclaimed_bytes = metrics.counter('media_gc_reclaimed_bytes_total', 'Байты, освобожденные сборщиком медиа.')
+
+
+def referenced_media_statement():
+    """Все URL медиа, на которые ссылается база, одним запросом по индексам."""
+    return union(
+        select(SlideElement.content.label('url')).where(db.text(MEDIA_ELEMENT_FILTER)),
+        select(Slide.background_image).where(Slide.background_image.isnot(None)),
+        select(Presentation.preview_image).where(Presentation.preview_image.isnot(None)),
+        # Итоговый файл перекодирования появляется раньше, чем его id попадает в элементы
+        select(MediaJob.result_url).where(MediaJob.result_url.isnot(None), MediaJob.status.in_(PENDING_STATUSES)),
+    )
+
+
+def _relative_path(url):
+    if not url or UPLOADS_URL_MARKER not in url:
+        return None
+    return url.split(UPLOADS_URL_MARKER, 1)[1].split('?', 1)[0]
+
+
+def referenced_files():
+    paths = set()
+    for url in db.session.scalars(referenced_media_statement()):
+        relative_path = _relative_path(url)
+        if relative_path:
+            paths.add(os.path.normpath(relative_path))
+    return paths
+
+
+def _owner(relative_path):
+    # Превью video.poster.jpg живет, пока в базе есть ссылка на video.mp4
+    for suffix in PREVIEW_SUFFIXES:
+        if relative_path.endswith(suffix):
+            return relative_path[:-len(suffix)]
+    match = VARIANT_SUFFIX_RE.search(relative_path)
+    return relative_path[:match.start()] if match else None
+
+
+def iter_upload_files(root):
+    """Обходит папку загрузок потоково через scandir, пропуская сессии поблочной загрузки."""
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            for entry in entries:
+                relative_path = os.path.join(relative_dir, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    if relative_path != SESSIONS_DIR:
+                        stack.append(relative_path)
+                elif entry.is_file(follow_symlinks=False) and relative_path != STAMP_FILE:
+                    yield relative_path, entry.stat(follow_symlinks=False)
+
+
+def collect_media(root, grace_period, dry_run=False):
+    """Удаляет файлы без ссылок из базы старше grace_period секунд; возвращает (файлов, байт)."""
+    if not os.path.isdir(root):
+        return 0, 0
+    referenced = referenced_files()
+    referenced_stems = {os.path.splitext(path)[0] for path in referenced}
+    # Ссылки читаются до обхода, поэтому файлы моложе grace_period (свежие загрузки) не трогаем
+    cutoff = time.time() - grace_period
+    removed = reclaimed = 0
+    for relative_path, stat in iter_upload_files(root):
+        if stat.st_mtime >= cutoff or relative_path in referenced:
+            continue
+        owner = _owner(relative_path)
+        if owner is not None and owner in referenced_stems:
+            continue
+        if not dry_run:
+            try:
+                os.remove(os.path.join(root, relative_path))
+            except OSError as e:
+                print(f"Не удалось удалить {relative_path}: {e}")
+                continue
+        removed += 1
+        reclaimed += stat.st_size
+    if not dry_run:
+        if removed:
+            forget_manifests()
+        media_gc_removed_files.inc(removed)
+        media_gc_reclaimed_bytes.inc(reclaimed)
+    return removed, reclaimed
+
+
+class MediaCollector:
+    """Периодическая сборка мусора в UPLOAD_FOLDER в фоновом потоке (MEDIA_GC_INTERVAL > 0).
+
+    Время последнего запуска хранится в файле-метке, поэтому несколько процессов сервера
+    не запускают сборку чаще интервала.
+    """
+
+    def __init__(self, interval=0, grace_period=24 * 3600):
+        self.interval = interval
+        self.grace_period = grace_period
+        self._thread = None
+
+    def init_app(self, app):
+        self.interval = app.config.get('MEDIA_GC_INTERVAL', self.interval)
+        self.grace_period = app.config.get('MEDIA_GC_GRACE_PERIOD', self.grace_period)
+        app.extensions['media_collector'] = self
+        app.cli.add_command(gc_media_command)
+        if self.interval > 0 and not app.testing and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, args=(app,), name='media-gc', daemon=True)
+            self._thread.start()
+
+    def run(self, app, dry_run=False, grace_period=None):
+        root = app.config['UPLOAD_FOLDER']
+        started = time.monotonic()
+        sessions = 0 if dry_run else gc_upload_sessions(app.config['UPLOAD_SESSION_TTL'])
+        removed, reclaimed = collect_media(root, self.grace_period if grace_period is None else grace_period, dry_run)
+        log_event(
+            'media_gc', removed=removed, reclaimed_bytes=reclaimed, upload_sessions=sessions,
+            dry_run=dry_run, duration_ms=round((time.monotonic() - started) * 1000)
+        )
+        return removed, reclaimed, sessions
+
+    def _due(self, stamp_path):
+        try:
+            return time.time() - os.path.getmtime(stamp_path) >= self.interval
+        except OSError:
+            return True
+
+    def _loop(self, app):
+        # Проверяем метку чаще интервала, чтобы перезапуск процесса не сдвигал расписание
+        check_every = min(self.interval, 300)
+        while True:
+            time.sleep(check_every)
+            stamp_path = os.path.join(app.config['UPLOAD_FOLDER'], STAMP_FILE)
+            if not self._due(stamp_path):
+                continue
+            try:
+                os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+                with open(stamp_path, 'a'):
+                    os.utime(stamp_path)
+                with app.app_context():
+                    self.run(app)
+                    db.session.remove()
+            except Exception as e:
+                print(f"Ошибка сборки мусора медиа: {e}")
+
+
+@click.command(name='gc-media')
+@click.option('--dry-run', is_flag=True, help='Только посчитать, ничего не удалять.')
+@click.option('--grace', type=int, default=None, help='Не трогать файлы моложе стольких секунд (по умолчанию MEDIA_GC_GRACE_PERIOD).')
+@with_appcontext
+def gc_media_command(dry_run, grace):
+    """Удаляет из папки загрузок файлы, на которые не ссылается ни одна презентация."""
+    removed, reclaimed, sessions = media_collector.run(current_app._get_current_object(), dry_run, grace)
+    verb = 'Будет удалено' if dry_run else 'Удалено'
+    print(f"{verb} файлов: {removed}, освобождено: {reclaimed / (1024 * 1024):.1f} МБ ({reclaimed} байт)")
+    if sessions:
+        print(f"Удалено незавершенных загрузок: {sessions}")
+
+
+media_collector = MediaCollector()
\ No newline at end of file
@@ -0,0 +1,175 @@
+import os
+import time
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from datetime import datetime
+from .extensions import db
+from .models import MediaJob, SlideElement
+from .media_previews import generate_previews
+from .image_variants import generate_image_variants
+from .capabilities import is_available
+from .metrics import metrics, media_job_duration, log_event
+
+_pool = None
+_pool_lock = threading.Lock()
+_inflight = {'transcode': 0, 'previews': 0, 'variants': 0, 'import': 0}
+
+PENDING_STATUSES = ('pending', 'processing')
+
+
+def get_media_pool(app):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=app.config.get('MEDIA_WORKERS', 2))
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _submit(app, kind, fn, *args):
+    started = time.monotonic()
+    future = get_media_pool(app).submit(fn, *args)
+    with _pool_lock:
+        _inflight[kind] += 1
+
+    def track(done):
+        with _pool_lock:
+            _inflight[kind] -= 1
+        if done.cancelled():
+            status = 'cancelled'
+        else:
+            status = 'failed' if done.exception() else 'ready'
+        media_job_duration.observe(time.monotonic() - started, kind=kind, status=status)
+
+    future.add_done_callback(track)
+    return future
+
+
+def _inflight_snapshot():
+    with _pool_lock:
+        return dict(_inflight)
+
+
+metrics.gauge(
+    'media_jobs_inflight', 'Фоновые медиа-задачи в пуле процессов (в очереди и выполняются).', ('kind',),
+    collect=_inflight_snapshot
+)
+
+
+def probe_media(path):
+    if not is_available('media'):
+        return None
+    import ffmpeg
+    try:
+        return ffmpeg.probe(path)
+    except ffmpeg.Error as e:
+        print(f"FFprobe Error: {e.stderr.decode(errors='ignore') if e.stderr else e}")
+        return None
+
+
+def can_stream_copy(probe):
+    if not probe:
+        return False
+    formats = probe.get('format', {}).get('format_name', '').split(',')
+    if 'mp4' not in formats:
+        return False
+
+    video_streams = [s for s in probe.get('streams', []) if s.get('codec_type') == 'video']
+    audio_streams = [s for s in probe.get('streams', []) if s.get('codec_type') == 'audio']
+    if len(video_streams) != 1:
+        return False
+
+    video = video_streams[0]
+    if video.get('codec_name') != 'h264' or video.get('pix_fmt') not in ('yuv420p', 'yuvj420p'):
+        return False
+    return all(a.get('codec_name') == 'aac' for a in audio_streams)
+
+
+def transcode_video(source_path, target_path, stream_copy, preset='veryfast', crf=23):
+    import ffmpeg
+    part_path = f"{target_path}.part"
+    stream = ffmpeg.input(source_path)
+    if stream_copy:
+        output = stream.output(part_path, format='mp4', c='copy', movflags='+faststart')
+    else:
+        output = stream.output(
+            part_path, format='mp4', vcodec='libx264', acodec='aac',
+            preset=preset, crf=crf, pix_fmt='yuv420p', movflags='+faststart'
+        )
+    try:
+        output.overwrite_output().run(capture_stdout=True, capture_stderr=True)
+        os.replace(part_path, target_path)
+    except ffmpeg.Error as e:
+        # ffmpeg.Error не сериализуется между процессами, поэтому передаем только текст
+        stderr = e.stderr.decode(errors='ignore') if e.stderr else str(e)
+        raise RuntimeError(stderr[-2000:])
+    finally:
+        for path in (source_path, part_path):
+            if os.path.exists(path):
+                os.remove(path)
+    generate_previews(target_path, 'UPLOADED_VIDEO')
+    return target_path
+
+
+def _finish_job(app, job_id, future):
+    with app.app_context():
+        job = db.session.get(MediaJob, job_id)
+        if not job:
+            return
+        error = future.exception()
+        if error:
+            job.status = 'failed'
+            job.error = str(error)
+        else:
+            job.status = 'ready'
+        log_event(
+            'media_job', job_id=job_id, kind=job.kind, status=job.status,
+            duration_ms=round((datetime.utcnow() - job.created_at).total_seconds() * 1000),
+            error=str(error)[-500:] if error else None
+        )
+
+        if job.result_url:
+            SlideElement.query.filter(
+                SlideElement.content == job.result_url,
+                SlideElement.status.in_(PENDING_STATUSES)
+            ).update({'status': job.status}, synchronize_session=False)
+        db.session.commit()
+
+
+def submit_transcode(app, source_path, target_path, result_url, stream_copy, user_id=None):
+    job = MediaJob(kind='transcode', status='processing', result_url=result_url, user_id=user_id)
+    db.session.add(job)
+    db.session.commit()
+
+    future = _submit(
+        app, 'transcode', transcode_video, source_path, target_path, stream_copy,
+        app.config.get('VIDEO_TRANSCODE_PRESET', 'veryfast'),
+        app.config.get('VIDEO_TRANSCODE_CRF', 23)
+    )
+    future.add_done_callback(partial(_finish_job, app, job.id))
+    return job
+
+
+def submit_previews(app, media_path, element_type):
+    return _submit(app, 'previews', generate_previews, media_path, element_type)
+
+
+def submit_image_variants(app, image_path):
+    return _submit(
+        app, 'variants', generate_image_variants, image_path,
+        app.config.get('IMAGE_VARIANT_WIDTHS'), app.config.get('IMAGE_VARIANT_FORMATS'),
+        app.config.get('IMAGE_VARIANT_QUALITY')
+    )
+
+
+def submit_import(app, fn, *args):
+    return _submit(app, 'import', fn, *args)
+
+
+def media_status_for_url(url):
+    job = MediaJob.query.filter_by(result_url=url).order_by(MediaJob.created_at.desc()).first()
+    if not job or job.status == 'ready':
+        return 'ready'
+    return 'processing' if job.status in PENDING_STATUSES else job.status
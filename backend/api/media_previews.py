@@ -0,0 +1,149 @@
+import os
+import json
+import posixpath
+from .capabilities import is_available
+
+POSTER_MAX_WIDTH = 1280
+STRIP_FRAMES = 8
+STRIP_FRAME_HEIGHT = 90
+WAVEFORM_POINTS = 200
+WAVEFORM_SAMPLE_RATE = 8000
+WAVEFORM_POSTER_SIZE = (800, 200)
+
+
+def preview_paths(media_path):
+    root, _extension = os.path.splitext(media_path)
+    return {
+        'poster': f"{root}.poster.jpg",
+        'strip': f"{root}.strip.jpg",
+        'waveform': f"{root}.waveform.json",
+        'waveform_poster': f"{root}.poster.png",
+    }
+
+
+def _media_duration(path):
+    import ffmpeg
+    probe = ffmpeg.probe(path)
+    return float(probe.get('format', {}).get('duration') or 0)
+
+
+def extract_video_previews(video_path):
+    import ffmpeg
+    paths = preview_paths(video_path)
+    duration = _media_duration(video_path)
+
+    # Первый кадр часто черный, поэтому постер берем с 10% длительности
+    poster_time = min(duration * 0.1, 5.0) if duration else 0
+    (
+        ffmpeg.input(video_path, ss=poster_time)
+        .filter('scale', f"min({POSTER_MAX_WIDTH},iw)", -2)
+        .output(paths['poster'], vframes=1, **{'q:v': 3})
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+
+    if duration:
+        (
+            ffmpeg.input(video_path)
+            .filter('fps', fps=f"{STRIP_FRAMES}/{duration}")
+            .filter('scale', -2, STRIP_FRAME_HEIGHT)
+            .filter('tile', f"{STRIP_FRAMES}x1")
+            .output(paths['strip'], vframes=1, **{'q:v': 5})
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    return paths
+
+
+def compute_waveform_peaks(samples, points=WAVEFORM_POINTS):
+    import numpy as np
+    if samples.size == 0:
+        return np.zeros(points)
+    if samples.size < points:
+        return np.abs(samples.astype(np.int32)) / 32768.0
+    usable = samples.size - samples.size % points
+    buckets = np.abs(samples[:usable].astype(np.int32)).reshape(points, -1)
+    return buckets.max(axis=1) / 32768.0
+
+
+def _draw_waveform(peaks, path, size=WAVEFORM_POSTER_SIZE):
+    from PIL import Image, ImageDraw
+    width, height = size
+    image = Image.new('RGB', size, (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    bar_width = width / len(peaks)
+    middle = height / 2
+    for index, peak in enumerate(peaks):
+        half = max(1, peak * middle * 0.9)
+        left = index * bar_width
+        draw.rectangle(
+            [left + bar_width * 0.15, middle - half, left + bar_width * 0.85, middle + half],
+            fill=(25, 118, 210)
+        )
+    image.save(path, 'PNG', optimize=True)
+
+
+def extract_audio_waveform(audio_path, points=WAVEFORM_POINTS):
+    import ffmpeg
+    import numpy as np
+    paths = preview_paths(audio_path)
+    out, _err = (
+        ffmpeg.input(audio_path)
+        .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=WAVEFORM_SAMPLE_RATE)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    samples = np.frombuffer(out, dtype=np.int16)
+    peaks = compute_waveform_peaks(samples, points)
+
+    with open(paths['waveform'], 'w') as f:
+        json.dump({
+            'duration': round(samples.size / WAVEFORM_SAMPLE_RATE, 3),
+            'peaks': [round(float(p), 3) for p in peaks]
+        }, f)
+    _draw_waveform(peaks, paths['waveform_poster'])
+    return paths
+
+
+def generate_previews(media_path, element_type):
+    if not is_available('media') or (element_type == 'AUDIO' and not is_available('waveform')):
+        print(f"Превью для {media_path} не построены: нет ffmpeg-python или numpy")
+        return None
+    import ffmpeg
+    try:
+        if element_type == 'UPLOADED_VIDEO':
+            return extract_video_previews(media_path)
+        if element_type == 'AUDIO':
+            return extract_audio_waveform(media_path)
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode(errors='ignore') if e.stderr else str(e)
+        print(f"Не удалось построить превью для {media_path}: {stderr[-500:]}")
+    except Exception as e:
+        print(f"Не удалось построить превью для {media_path}: {e}")
+    return None
+
+
+def media_preview_urls(content_url, element_type, upload_folder):
+    if not content_url or element_type not in ('UPLOADED_VIDEO', 'AUDIO'):
+        return {}
+    filename = content_url.split('/')[-1]
+    paths = preview_paths(os.path.join(upload_folder, filename))
+    url_root = posixpath.splitext(content_url)[0]
+
+    urls = {}
+    if element_type == 'UPLOADED_VIDEO':
+        if os.path.exists(paths['poster']):
+            urls['posterUrl'] = f"{url_root}.poster.jpg"
+        if os.path.exists(paths['strip']):
+            urls['thumbnailStripUrl'] = f"{url_root}.strip.jpg"
+    else:
+        if os.path.exists(paths['waveform']):
+            urls['waveformUrl'] = f"{url_root}.waveform.json"
+        if os.path.exists(paths['waveform_poster']):
+            urls['posterUrl'] = f"{url_root}.poster.png"
+    return urls
+
+
+def export_poster_path(media_path, element_type):
+    paths = preview_paths(media_path)
+    candidate = paths['poster'] if element_type == 'UPLOADED_VIDEO' else paths['waveform_poster']
+    return candidate if os.path.exists(candidate) else None
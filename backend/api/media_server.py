@@ -0,0 +1,97 @@
+import os
+import re
+import mimetypes
+from urllib.parse import quote
+from flask import request, send_file, abort, Response
+from werkzeug.security import safe_join
+
+# Имена blob-файлов — sha256 содержимого (blob_store.blob_name), их превью — то же имя с суффиксом
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{64}(\.[0-9a-z]+){1,2}$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+SENDFILE_MODES = ('x-sendfile', 'x-accel-redirect')
+
+
+class MediaServer:
+    """Отдача файлов из UPLOAD_FOLDER по /static/uploads/<путь>.
+
+    Файлы с content-hash именами неизменяемы: они кешируются на год (immutable), а имя служит сильным ETag.
+    Диапазоны (Range) для перемотки видео обрабатывает werkzeug. Если задан MEDIA_SENDFILE, тело файла
+    отдает фронтовой сервер (Apache mod_xsendfile или nginx X-Accel-Redirect) вместе с Range.
+    """
+
+    def __init__(self, max_age=IMMUTABLE_MAX_AGE, sendfile=None, accel_prefix='/protected-uploads/'):
+        self.max_age = max_age
+        self.sendfile = sendfile
+        self.accel_prefix = accel_prefix
+        self.upload_folder = None
+
+    def init_app(self, app):
+        self.max_age = app.config.get('MEDIA_CACHE_MAX_AGE', self.max_age)
+        self.sendfile = app.config.get('MEDIA_SENDFILE') or None
+        self.accel_prefix = app.config.get('MEDIA_ACCEL_PREFIX', self.accel_prefix)
+        self.upload_folder = app.config['UPLOAD_FOLDER']
+        if self.sendfile is not None and self.sendfile not in SENDFILE_MODES:
+            raise ValueError(f"MEDIA_SENDFILE должен быть одним из {SENDFILE_MODES}")
+        app.extensions['media_server'] = self
+        # Более конкретное правило перекрывает встроенный /static/<path:filename> для загрузок
+        app.add_url_rule(f"{app.static_url_path}/uploads/<path:filename>", endpoint='media', view_func=self.serve)
+
+    def _resolve(self, filename):
+        # Служебные папки (.incoming, .chunked) и недописанные .part-файлы наружу не отдаются
+        parts = filename.split('/')
+        if any(part.startswith('.') for part in parts) or filename.endswith('.part'):
+            return None
+        path = safe_join(self.upload_folder, *parts)
+        return path if path is not None and os.path.isfile(path) else None
+
+    def serve(self, filename):
+        path = self._resolve(filename)
+        if path is None:
+            abort(404)
+
+        immutable = HASHED_NAME_RE.match(os.path.basename(filename)) is not None
+        if immutable:
+            etag = os.path.basename(filename)
+            # Повторная проверка кеша не трогает файл вовсе
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                self._cache_headers(response)
+                return response
+        else:
+            etag = True
+
+        if self.sendfile is not None:
+            return self._offload(filename, path, etag if immutable else None, immutable)
+
+        response = send_file(path, conditional=True, etag=etag, max_age=self.max_age if immutable else None)
+        # werkzeug ставит Accept-Ranges только на ответы 206, а плеер по нему решает, можно ли перематывать
+        response.headers['Accept-Ranges'] = 'bytes'
+        if immutable:
+            self._cache_headers(response)
+        return response
+
+    def _cache_headers(self, response):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.cache_control.immutable = True
+
+    def _offload(self, filename, path, etag, immutable):
+        # Тело, Range и Content-Length формирует фронтовой сервер; здесь только заголовки
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        if self.sendfile == 'x-sendfile':
+            response.headers['X-Sendfile'] = path
+        else:
+            response.headers['X-Accel-Redirect'] = f"{self.accel_prefix.rstrip('/')}/{quote(filename)}"
+        response.headers['Accept-Ranges'] = 'bytes'
+        if etag is not None:
+            response.set_etag(etag)
+        if immutable:
+            self._cache_headers(response)
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+
+media_server = MediaServer()
\ No newline at end of file
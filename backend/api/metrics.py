@@ -0,0 +1,295 @@
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from .extensions import db
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+event_log = logging.getLogger('api.events')
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Значение считывается функцией в момент сбора метрик (глубина очередей и т.п.)."""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=(), collect=None):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self):
+        if self.collect is not None:
+            collected = self.collect()
+            items = collected.items() if isinstance(collected, dict) else [((), collected)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key if isinstance(key, tuple) else (key,))} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            if 'outcome' in self.label_names:
+                labels['outcome'] = outcome
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', _format_value(bound))])} {cumulative}"
+                )
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self.enabled = True
+        self.structured_logs = True
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=(), collect=None):
+        return self._register(Gauge(name, documentation, labels, collect))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"Не удалось собрать метрику {metric.name}: {e}")
+        return '\n'.join(lines) + '\n'
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.structured_logs = app.config.get('STRUCTURED_LOGS', True)
+        app.extensions['metrics'] = self
+        if self.structured_logs and not event_log.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            event_log.addHandler(handler)
+            event_log.setLevel(logging.INFO)
+            event_log.propagate = False
+        if not self.enabled:
+            return
+
+        app.before_request(_start_request)
+        app.after_request(_finish_request)
+        with app.app_context():
+            _instrument_engine(db.engine)
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    'http_requests_total', 'Количество HTTP-запросов.', ('method', 'endpoint', 'status')
+)
+http_request_duration = metrics.histogram(
+    'http_request_duration_seconds', 'Длительность обработки HTTP-запроса.', ('method', 'endpoint')
+)
+request_db_queries = metrics.histogram(
+    'http_request_db_queries', 'Число SQL-запросов на один HTTP-запрос.', ('endpoint',), QUERY_COUNT_BUCKETS
+)
+request_db_duration = metrics.histogram(
+    'http_request_db_seconds', 'Суммарное время SQL-запросов за один HTTP-запрос.', ('endpoint',)
+)
+db_query_duration = metrics.histogram(
+    'db_query_duration_seconds', 'Длительность SQL-запросов.', ('operation',)
+)
+external_request_duration = metrics.histogram(
+    'external_request_duration_seconds', 'Длительность исходящих запросов к внешним сервисам.', ('service', 'outcome')
+)
+export_duration = metrics.histogram(
+    'export_duration_seconds', 'Длительность экспорта презентаций.', ('format', 'outcome')
+)
+media_job_duration = metrics.histogram(
+    'media_job_duration_seconds', 'Длительность фоновых медиа-задач.', ('kind', 'status')
+)
+
+
+def timed_http(service, method, url, **kwargs):
+    """Исходящий HTTP-запрос через requests с замером времени по сервису."""
+    import requests
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        response = requests.request(method, url, **kwargs)
+        outcome = 'ok' if response.status_code < 400 else 'error'
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        external_request_duration.observe(elapsed, service=service, outcome=outcome)
+        if outcome == 'error':
+            log_event('external_request', service=service, method=method, outcome=outcome, duration_ms=round(elapsed * 1000, 2))
+
+
+def log_event(event_name, **fields):
+    if metrics.structured_logs:
+        event_log.info(json.dumps({'event': event_name, 'ts': round(time.time(), 3), **fields}, ensure_ascii=False, default=str))
+
+
+def _endpoint_label():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_db_queries = 0
+    g.metrics_db_seconds = 0.0
+
+
+def _finish_request(response):
+    started = g.get('metrics_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = _endpoint_label()
+    db_queries = g.get('metrics_db_queries', 0)
+    db_seconds = g.get('metrics_db_seconds', 0.0)
+
+    http_requests.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    http_request_duration.observe(elapsed, method=request.method, endpoint=endpoint)
+    request_db_queries.observe(db_queries, endpoint=endpoint)
+    request_db_duration.observe(db_seconds, endpoint=endpoint)
+
+    current_user = g.get('current_user')
+    log_event(
+        'request',
+        method=request.method,
+        path=request.path,
+        endpoint=endpoint,
+        status=response.status_code,
+        duration_ms=round(elapsed * 1000, 2),
+        db_queries=db_queries,
+        db_ms=round(db_seconds * 1000, 2),
+        user_id=getattr(current_user, 'id', None),
+    )
+    response.headers['Server-Timing'] = f"app;dur={elapsed * 1000:.1f}, db;dur={db_seconds * 1000:.1f}"
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['metrics_query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('metrics_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+    db_query_duration.observe(elapsed, operation=operation)
+    if has_request_context() and 'metrics_started' in g:
+        g.metrics_db_queries += 1
+        g.metrics_db_seconds += elapsed
+
+
+def _instrument_engine(engine):
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
@@ -2,6 +2,10 @@ from .extensions import db
 from datetime import datetime
 import uuid
 
+MEDIA_ELEMENT_TYPES = ('IMAGE', 'UPLOADED_VIDEO', 'AUDIO')
+# Условие частичного индекса: SQLite применяет его, только если запрос содержит тот же литерал, без параметров
+MEDIA_ELEMENT_FILTER = "element_type IN ('IMAGE', 'UPLOADED_VIDEO', 'AUDIO')"
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -10,6 +14,16 @@ class User(db.Model):
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
     can_use_ai = db.Column(db.Boolean, default=True, nullable=False)
     presentations = db.relationship('Presentation', backref='owner', lazy=True, cascade="all, delete-orphan")
+    sessions = db.relationship('UserSession', backref='user', lazy=True, cascade="all, delete-orphan")
+
+class UserSession(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=True)
 
 class SystemPrompt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -20,24 +34,39 @@ class SystemPrompt(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Presentation(db.Model):
+    __table_args__ = (
+        db.Index('ix_presentation_user_template_updated', 'user_id', 'is_template', 'updated_at'),
+        db.Index('ix_presentation_template_created', 'is_template', 'created_at'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = db.Column(db.String(150), nullable=False, default="Новая презентация")
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     slides = db.relationship('Slide', backref='presentation', lazy=True, cascade="all, delete-orphan")
-    is_template = db.Column(db.Boolean, default=False, nullable=False, index=True)
-    preview_image = db.Column(db.String(255), nullable=True)
+    is_template = db.Column(db.Boolean, default=False, nullable=False)
+    preview_image = db.Column(db.String(255), nullable=True, index=True)
 
 class Slide(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('presentation_id', 'slide_number', name='uq_slide_presentation_number'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     slide_number = db.Column(db.Integer, nullable=False)
     background_color = db.Column(db.String(7), nullable=False, default='#FFFFFF')
-    background_image = db.Column(db.String(255), nullable=True) 
+    background_image = db.Column(db.String(255), nullable=True, index=True)
     presentation_id = db.Column(db.String(36), db.ForeignKey('presentation.id'), nullable=False)
     elements = db.relationship('SlideElement', backref='slide', lazy=True, cascade="all, delete-orphan")
 
 class SlideElement(db.Model):
+    __table_args__ = (
+        # Ссылки на медиафайлы (подсчет ссылок и сборщик мусора); тексты элементов в индекс не попадают
+        db.Index(
+            'ix_slide_element_media_content', 'content',
+            sqlite_where=db.text(MEDIA_ELEMENT_FILTER), postgresql_where=db.text(MEDIA_ELEMENT_FILTER),
+            mysql_length={'content': 255}
+        ),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     element_type = db.Column(db.String(10), nullable=False)
     pos_x = db.Column(db.Integer, nullable=False, default=100)
@@ -46,6 +75,33 @@ class SlideElement(db.Model):
     height = db.Column(db.Integer, nullable=False, default=150)
     content = db.Column(db.Text, nullable=True)
     font_size = db.Column(db.Integer, nullable=False, default=24)
-    slide_id = db.Column(db.Integer, db.ForeignKey('slide.id'), nullable=False)
+    slide_id = db.Column(db.Integer, db.ForeignKey('slide.id'), nullable=False, index=True)
     autoplay = db.Column(db.Boolean, default=False, nullable=False)
-    muted = db.Column(db.Boolean, default=False, nullable=False)
\ No newline at end of file
+    muted = db.Column(db.Boolean, default=False, nullable=False)
+    status = db.Column(db.String(12), default='ready', nullable=False)
+
+class MediaJob(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(12), nullable=False, default='pending', index=True)
+    result_url = db.Column(db.String(255), nullable=True, index=True)
+    error = db.Column(db.Text, nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SearchDocument(db.Model):
+    # Текст для поиска: заголовок презентации (slide_id пустой) или TEXT-элемент слайда
+    id = db.Column(db.Integer, primary_key=True)
+    doc_key = db.Column(db.String(40), unique=True, nullable=False)
+    presentation_id = db.Column(db.String(36), nullable=False, index=True)
+    slide_id = db.Column(db.Integer, nullable=True, index=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    body = db.Column(db.Text, nullable=False)
+    length = db.Column(db.Integer, nullable=False, default=0)
+
+class SearchPosting(db.Model):
+    # Инвертированный индекс для СУБД без FTS5
+    term = db.Column(db.String(64), primary_key=True)
+    document_id = db.Column(db.Integer, primary_key=True, index=True)
+    frequency = db.Column(db.Integer, nullable=False)
\ No newline at end of file
@@ -0,0 +1,100 @@
+import re
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from .metrics import metrics
+
+BCRYPT_COST_RE = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password, password_hash):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        return False
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=2, max_pending=16, timeout=10):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', self.rounds)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        app.extensions['password_hasher'] = self
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+            return self._pool
+
+    def _reset_pool(self, broken_pool):
+        with self._pool_lock:
+            if self._pool is broken_pool:
+                self._pool = None
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        # Очередь ограничена: при всплеске логинов лишние запросы получают отказ, а не копятся
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy()
+        with self._pending_lock:
+            self.pending += 1
+        try:
+            pool = self._get_pool()
+            future = pool.submit(fn, *args)
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy()
+        except BrokenProcessPool:
+            # Упавший воркер ломает весь пул: следующий вызов создаст новый
+            self._reset_pool(pool)
+            raise PasswordHasherBusy()
+        finally:
+            with self._pending_lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def hash_password(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def check_password(self, password_hash, password):
+        return self._run(_check_password, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        match = BCRYPT_COST_RE.match(password_hash or '')
+        return not match or int(match.group(1)) != self.rounds
+
+
+password_hasher = PasswordHasher()
+
+metrics.gauge(
+    'password_hash_pending', 'Хеширования паролей, ожидающие пула процессов.',
+    collect=lambda: password_hasher.pending
+)
@@ -0,0 +1,292 @@
+import os
+import re
+import uuid
+import hashlib
+from datetime import datetime
+from functools import partial
+from flask import current_app, url_for
+from .extensions import db
+from .models import MediaJob
+from .capabilities import require, BackendUnavailable
+from .blob_store import UPLOADS_URL_MARKER, blob_name
+from .deck_clone import insert_deck
+from .media_jobs import submit_import, submit_previews, submit_image_variants
+from .metrics import log_event
+from .serializers import presentation_summary
+from .slide_renderer import SLIDE_WIDTH, SLIDE_HEIGHT, PIXELS_PER_INCH
+
+EMU_PER_INCH = 914400
+PPTX_EXTENSION = '.pptx'
+DEFAULT_TITLE = 'Импортированная презентация'
+# python-pptx подставляет это название в core properties всех новых файлов, в том числе нашего экспорта
+GENERIC_CORE_TITLE = 'PowerPoint Presentation'
+DEFAULT_FONT_SIZE = 18
+VIDEO_EXTENSIONS = ('.mp4', '.m4v')
+# EMF/WMF и TIFF браузер не покажет, такие картинки пропускаются
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp', 'svg')
+YOUTUBE_LINK_RE = re.compile(r'(?:youtube\.com/watch\?v=|youtu\.be/)([\w-]{11})')
+HEX_COLOR_RE = re.compile(r'^[0-9A-Fa-f]{6}$')
+
+
+class PptxImportError(Exception):
+    pass
+
+
+def emu_to_px(emu, scale=1.0):
+    """Обратное к px_to_inches при экспорте: EMU -> дюймы -> пиксели холста 1280x720."""
+    return round(emu / EMU_PER_INCH * PIXELS_PER_INCH * scale)
+
+
+def _store_blob(data, extension, upload_folder):
+    # Та же схема имен, что и у загрузок: повторный импорт не дублирует файлы
+    filename = blob_name(hashlib.sha256(data).hexdigest(), extension)
+    target_path = os.path.join(upload_folder, filename)
+    created = not os.path.exists(target_path)
+    if created:
+        part_path = f"{target_path}.{uuid.uuid4().hex}.part"
+        with open(part_path, 'wb') as f:
+            f.write(data)
+        os.replace(part_path, target_path)
+    return f"{UPLOADS_URL_MARKER}{filename}", target_path, created
+
+
+def _related_blob(part, r_id):
+    try:
+        related = part.related_part(r_id)
+    except KeyError:
+        # Внешние ссылки (r:link на файл вне пакета) импортировать нечем
+        return None, None, None
+    return related.blob, related.partname.ext, related.content_type
+
+
+def _group_transform(group, transform):
+    from pptx.oxml.ns import qn
+    xfrm = group._element.grpSpPr.find(qn('a:xfrm'))
+    child_offset = xfrm.find(qn('a:chOff')) if xfrm is not None else None
+    child_extent = xfrm.find(qn('a:chExt')) if xfrm is not None else None
+    if child_offset is None or child_extent is None:
+        return transform
+    # Координаты детей группы заданы в ее собственной системе (chOff/chExt)
+    scale_x = group.width / int(child_extent.get('cx')) if int(child_extent.get('cx')) else 1
+    scale_y = group.height / int(child_extent.get('cy')) if int(child_extent.get('cy')) else 1
+    x0, kx, y0, ky = transform
+    return (
+        x0 + kx * (group.left - int(child_offset.get('x')) * scale_x), kx * scale_x,
+        y0 + ky * (group.top - int(child_offset.get('y')) * scale_y), ky * scale_y,
+    )
+
+
+def _iter_shapes(shapes, transform=(0, 1, 0, 1)):
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            yield from _iter_shapes(shape.shapes, _group_transform(shape, transform))
+        elif None not in (shape.left, shape.top, shape.width, shape.height):
+            x0, kx, y0, ky = transform
+            yield shape, (x0 + kx * shape.left, y0 + ky * shape.top, kx * shape.width, ky * shape.height)
+
+
+def _font_size(text_frame):
+    for paragraph in text_frame.paragraphs:
+        for run in paragraph.runs:
+            if run.font.size is not None:
+                return run.font.size.pt
+        if paragraph.font.size is not None:
+            return paragraph.font.size.pt
+    return DEFAULT_FONT_SIZE
+
+
+def _media_element(shape, upload_folder, new_media):
+    from pptx.oxml.ns import qn
+    media_file = None
+    for tag in ('a:videoFile', 'a:audioFile'):
+        media_file = shape._element.find(f".//{qn(tag)}")
+        if media_file is not None:
+            break
+    if media_file is None:
+        return None
+    blob, extension, content_type = _related_blob(shape.part, media_file.get(qn('r:link')))
+    if blob is None:
+        return None
+    # add_movie пишет a:videoFile и для аудио, поэтому тип определяем по content type части
+    if content_type.startswith('audio/') or media_file.tag == qn('a:audioFile'):
+        element_type = 'AUDIO'
+    elif extension.lower() in VIDEO_EXTENSIONS:
+        element_type = 'UPLOADED_VIDEO'
+    else:
+        print(f"Видео {content_type} пропущено при импорте: поддерживается только MP4")
+        return None
+    url, path, created = _store_blob(blob, f".{extension}", upload_folder)
+    if created:
+        new_media.append((path, element_type))
+    return {'element_type': element_type, 'content': url}
+
+
+def _shape_element(shape, upload_folder, new_media):
+    from pptx.shapes.picture import Picture, Movie
+    if isinstance(shape, Movie):
+        return _media_element(shape, upload_folder, new_media)
+    if isinstance(shape, Picture):
+        try:
+            address = shape.click_action.hyperlink.address
+        except (AttributeError, KeyError):
+            address = None
+        match = YOUTUBE_LINK_RE.search(address or '')
+        if match:
+            # Экспорт сохраняет YouTube-видео как эскиз со ссылкой на ролик
+            return {'element_type': 'YOUTUBE_VIDEO', 'content': match.group(1)}
+        try:
+            image = shape.image
+        except (AttributeError, KeyError, ValueError):
+            return None
+        if image.ext.lower() not in IMAGE_EXTENSIONS:
+            print(f"Изображение .{image.ext} пропущено при импорте")
+            return None
+        url, path, created = _store_blob(image.blob, f".{image.ext}", upload_folder)
+        if created:
+            new_media.append((path, 'IMAGE'))
+        return {'element_type': 'IMAGE', 'content': url}
+    if shape.has_text_frame and shape.text_frame.text.strip():
+        # \v — мягкий перенос строки внутри абзаца
+        return {'element_type': 'TEXT', 'content': shape.text_frame.text.replace('\v', '\n'), 'font_size': _font_size(shape.text_frame)}
+    return None
+
+
+def _background(slide, upload_folder):
+    from pptx.enum.dml import MSO_FILL, MSO_COLOR_TYPE
+    from pptx.oxml.ns import qn
+    row = {}
+    if slide.follow_master_background:
+        return row
+    fill = slide.background.fill
+    if fill.type == MSO_FILL.SOLID and fill.fore_color.type == MSO_COLOR_TYPE.RGB:
+        color = str(fill.fore_color.rgb)
+        if HEX_COLOR_RE.match(color):
+            row['background_color'] = f"#{color.upper()}"
+    elif fill.type == MSO_FILL.PICTURE:
+        blip = slide._element.find(f".//{qn('p:bg')}//{qn('a:blip')}")
+        if blip is not None:
+            blob, extension, _content_type = _related_blob(slide.part, blip.get(qn('r:embed')))
+            if blob is not None:
+                row['background_image'] = _store_blob(blob, f".{extension}", upload_folder)[0]
+    return row
+
+
+def parse_pptx(source_path, upload_folder, max_slides):
+    """Разбирает .pptx в строки слайдов и элементов; медиа сразу сохраняются в хранилище загрузок.
+
+    Выполняется в пуле процессов media_jobs, поэтому не использует приложение и базу.
+    """
+    from pptx import Presentation as PptxPresentation
+    new_media = []
+    try:
+        try:
+            prs = PptxPresentation(source_path)
+        except Exception as e:
+            print(f"Не удалось открыть .pptx {source_path}: {e}")
+            raise PptxImportError('Не удалось открыть файл PowerPoint')
+        if len(prs.slides) > max_slides:
+            raise PptxImportError(f"Слишком много слайдов: {len(prs.slides)}, допустимо {max_slides}")
+
+        os.makedirs(upload_folder, exist_ok=True)
+        # Слайды другого формата (4:3, 13.33x7.5) вписываются в холст редактора по центру с сохранением пропорций
+        scale = min(SLIDE_WIDTH / emu_to_px(prs.slide_width), SLIDE_HEIGHT / emu_to_px(prs.slide_height))
+        offset_x = (SLIDE_WIDTH - emu_to_px(prs.slide_width, scale)) // 2
+        offset_y = (SLIDE_HEIGHT - emu_to_px(prs.slide_height, scale)) // 2
+        slide_rows = []
+        elements_by_slide = []
+        for slide in prs.slides:
+            slide_rows.append(_background(slide, upload_folder))
+            elements = []
+            for shape, (left, top, width, height) in _iter_shapes(slide.shapes):
+                element = _shape_element(shape, upload_folder, new_media)
+                if element is None:
+                    continue
+                element.update({
+                    'pos_x': offset_x + emu_to_px(left, scale), 'pos_y': offset_y + emu_to_px(top, scale),
+                    'width': max(1, emu_to_px(width, scale)), 'height': max(1, emu_to_px(height, scale)),
+                })
+                if 'font_size' in element:
+                    element['font_size'] = max(1, round(element['font_size'] * scale))
+                elements.append(element)
+            elements_by_slide.append(elements)
+
+        core_title = (prs.core_properties.title or '').strip()
+        return {
+            'title': core_title if core_title != GENERIC_CORE_TITLE else '',
+            'slides': slide_rows,
+            'elements': elements_by_slide,
+            'media': new_media,
+        }
+    finally:
+        if os.path.exists(source_path):
+            os.remove(source_path)
+
+
+def _deck_title(title, parsed):
+    return (title or parsed['title'] or DEFAULT_TITLE)[:150]
+
+
+def _insert_parsed(app, presentation_id, title, user_id, parsed):
+    insert_deck(presentation_id, _deck_title(title, parsed), user_id, parsed['slides'], parsed['elements'])
+    # Варианты картинок, постеры и волновые формы для новых файлов, как после обычной загрузки
+    for path, element_type in parsed['media']:
+        if element_type == 'IMAGE':
+            submit_image_variants(app, path)
+        else:
+            submit_previews(app, path, element_type)
+
+
+def _finish_import(app, job_id, presentation_id, title, user_id, future):
+    with app.app_context():
+        job = db.session.get(MediaJob, job_id)
+        if not job:
+            return
+        error = future.exception()
+        if error is None:
+            try:
+                _insert_parsed(app, presentation_id, title, user_id, future.result())
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(MediaJob, job_id)
+                error = e
+        job.status = 'failed' if error else 'ready'
+        job.error = str(error) if error else None
+        log_event(
+            'media_job', job_id=job_id, kind=job.kind, status=job.status,
+            duration_ms=round((datetime.utcnow() - job.created_at).total_seconds() * 1000),
+            error=str(error)[-500:] if error else None
+        )
+        db.session.commit()
+
+
+def import_pptx(source_path, title, user_id):
+    """Небольшие файлы импортируются прямо в запросе, крупные — фоновой задачей (статус в /media/jobs)."""
+    if os.path.splitext(source_path)[1].lower() != PPTX_EXTENSION:
+        os.remove(source_path)
+        return {'message': 'Поддерживаются только файлы .pptx'}, 400
+    try:
+        require('pptx')
+    except BackendUnavailable:
+        os.remove(source_path)
+        raise
+    app = current_app._get_current_object()
+    upload_folder = app.config['UPLOAD_FOLDER']
+    max_slides = app.config['PPTX_IMPORT_MAX_SLIDES']
+    presentation_id = str(uuid.uuid4())
+
+    if os.path.getsize(source_path) <= app.config['PPTX_IMPORT_SYNC_MAX_SIZE']:
+        try:
+            parsed = parse_pptx(source_path, upload_folder, max_slides)
+        except PptxImportError as e:
+            return {'message': str(e)}, 400
+        _insert_parsed(app, presentation_id, title, user_id, parsed)
+        db.session.commit()
+        return presentation_summary(presentation_id), 201
+
+    job = MediaJob(kind='import', status='processing', result_url=url_for('presentations.get_presentation_by_id', presentation_id=presentation_id), user_id=user_id)
+    db.session.add(job)
+    db.session.commit()
+    future = submit_import(app, parse_pptx, source_path, upload_folder, max_slides)
+    future.add_done_callback(partial(_finish_import, app, job.id, presentation_id, title, user_id))
+    return {'job_id': job.id, 'presentation_id': presentation_id, 'url': job.result_url, 'status': 'processing'}, 202
\ No newline at end of file
@@ -0,0 +1,242 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import threading
+from collections import Counter
+from datetime import datetime
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from .extensions import db
+from .auth_tokens import decode_access_token, TokenError
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_ARG = '_profile'
+CAPTURE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _frame_name(code, root, cache):
+    name = cache.get(code)
+    if name is None:
+        path = code.co_filename
+        if path.startswith(root):
+            path = os.path.relpath(path, root)
+        elif 'site-packages' in path:
+            path = path.split('site-packages' + os.sep, 1)[-1]
+        name = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(';', ',')
+        cache[code] = name
+    return name
+
+
+class StackSampler(threading.Thread):
+    """Снимает стек потока запроса раз в interval секунд и считает одинаковые стеки."""
+
+    def __init__(self, thread_id, interval, root):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self.samples = 0
+        self._names = {}
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame.f_code, self.root, self._names))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfiler:
+    """Профилирование отдельных запросов администратора по заголовку X-Profile или ?_profile=1.
+
+    Снимок (стеки и SQL-запросы) сохраняется в JSON-файл, список снимков смотрит /api/admin/profiles.
+    """
+
+    def __init__(self, interval=0.005, max_captures=50, max_statements=500):
+        self.enabled = True
+        self.interval = interval
+        self.max_captures = max_captures
+        self.max_statements = max_statements
+        self.directory = None
+        self.root = ''
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('PROFILER_ENABLED', True)
+        self.interval = app.config.get('PROFILER_INTERVAL_MS', self.interval * 1000) / 1000.0
+        self.max_captures = app.config.get('PROFILER_MAX_CAPTURES', self.max_captures)
+        self.max_statements = app.config.get('PROFILER_MAX_STATEMENTS', self.max_statements)
+        self.directory = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.root = os.path.dirname(app.root_path) + os.sep
+        app.extensions['profiler'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        with app.app_context():
+            if not event.contains(db.engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def _requested(self):
+        flag = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_ARG)
+        if flag not in ('1', 'true'):
+            return None
+        authorization = request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer '):
+            return None
+        try:
+            user = decode_access_token(authorization[len('Bearer '):])
+        except (TokenError, KeyError):
+            return None
+        # Запросы не-администраторов выполняются как обычно, без профиля
+        return user if user.is_admin else None
+
+    def _start(self):
+        user = self._requested()
+        if user is None:
+            return
+        sampler = StackSampler(threading.get_ident(), self.interval, self.root)
+        g.profile_capture = {
+            'user_id': user.id,
+            'started': time.perf_counter(),
+            'sampler': sampler,
+            'sql': [],
+            'sql_dropped': 0,
+        }
+        sampler.start()
+
+    def _finish(self, response):
+        capture = g.pop('profile_capture', None)
+        if capture is None:
+            return response
+        capture['sampler'].stop()
+        duration = time.perf_counter() - capture['started']
+        try:
+            capture_id = self._save(capture, duration, response.status_code)
+            response.headers['X-Profile-Id'] = capture_id
+        except OSError as e:
+            print(f"Не удалось сохранить профиль запроса {request.path}: {e}")
+        return response
+
+    def _teardown(self, error=None):
+        capture = g.pop('profile_capture', None)
+        if capture is not None:
+            capture['sampler'].stop()
+
+    def _save(self, capture, duration, status):
+        sampler = capture['sampler']
+        capture_id = uuid.uuid4().hex
+        record = {
+            'id': capture_id,
+            'created_at': datetime.utcnow().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.url_rule.rule if request.url_rule is not None else None,
+            'status': status,
+            'user_id': capture['user_id'],
+            'duration_ms': round(duration * 1000, 2),
+            'interval_ms': round(self.interval * 1000, 2),
+            'samples': sampler.samples,
+            'sql_count': len(capture['sql']) + capture['sql_dropped'],
+            'sql_ms': round(sum(query['duration_ms'] for query in capture['sql']), 2),
+            'sql_dropped': capture['sql_dropped'],
+            'sql': capture['sql'],
+            'stacks': dict(sampler.stacks.most_common()),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(capture_id)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        self._prune()
+        return capture_id
+
+    def _path(self, capture_id):
+        return os.path.join(self.directory, f"{capture_id}.json")
+
+    def _files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        files = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith('.json') and CAPTURE_ID_RE.match(name[:-5])
+        ]
+        return sorted(files, key=os.path.getmtime, reverse=True)
+
+    def _prune(self):
+        with self._lock:
+            for path in self._files()[self.max_captures:]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def load(self, capture_id):
+        if not CAPTURE_ID_RE.match(capture_id):
+            return None
+        try:
+            with open(self._path(capture_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list_captures(self):
+        summaries = []
+        for path in self._files():
+            record = self.load(os.path.basename(path)[:-5])
+            if record is not None:
+                summaries.append({key: value for key, value in record.items() if key not in ('sql', 'stacks')})
+        return summaries
+
+    def delete(self, capture_id):
+        if not CAPTURE_ID_RE.match(capture_id) or not os.path.exists(self._path(capture_id)):
+            return False
+        os.remove(self._path(capture_id))
+        return True
+
+
+def collapsed_stacks(record):
+    """Стеки в формате "кадр;кадр;кадр число" для flamegraph.pl и speedscope."""
+    return ''.join(f"{stack} {count}\n" for stack, count in record['stacks'].items())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['profiler_query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('profiler_query_started', None)
+    if started is None or not has_request_context():
+        return
+    capture = g.get('profile_capture')
+    if capture is None:
+        return
+    if len(capture['sql']) >= request_profiler.max_statements:
+        capture['sql_dropped'] += 1
+        return
+    # Параметры не сохраняем: в них бывают пароли и токены
+    capture['sql'].append({
+        'statement': statement,
+        'executemany': executemany,
+        'offset_ms': round((started - capture['started']) * 1000, 2),
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+    })
+
+
+request_profiler = RequestProfiler()
\ No newline at end of file
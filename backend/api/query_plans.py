@@ -0,0 +1,102 @@
+import re
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, select, func, literal_column
+from .extensions import db
+from .media_gc import referenced_media_statement
+from .models import User, UserSession, SystemPrompt, Presentation, Slide, SlideElement, MediaJob, MEDIA_ELEMENT_FILTER
+
+FULL_SCAN_RE = re.compile(r'^SCAN (\w+)\b(?! USING (COVERING )?INDEX| VIRTUAL TABLE INDEX)')
+CTE_NAME_RE = re.compile(r'(?:\bWITH|,)\s*(\w+)\s+AS\s*\(', re.IGNORECASE)
+SAMPLE_ID = '00000000-0000-0000-0000-000000000000'
+SAMPLE_URL = '/static/uploads/sample.png'
+
+
+def hot_queries():
+    return {
+        'login: user by email': select(User).where(User.email == 'user@example.com'),
+        'refresh: session with user': select(UserSession, User).join(User, User.id == UserSession.user_id).where(
+            UserSession.id == SAMPLE_ID
+        ),
+        'login: user sessions cleanup': select(UserSession.id).where(UserSession.user_id == 1),
+        'ai: active system prompt': select(SystemPrompt).where(
+            SystemPrompt.name == 'generate_presentation', SystemPrompt.is_active == True
+        ),
+        'get_presentations: dashboard listing': select(Presentation).where(
+            Presentation.user_id == 1, Presentation.is_template == False
+        ).order_by(Presentation.updated_at.desc()),
+        'get_presentations: first slide': select(Slide).where(
+            Slide.presentation_id == SAMPLE_ID, Slide.slide_number == 1
+        ),
+        'get_presentation_by_id: ordered slides': select(Slide).where(
+            Slide.presentation_id == SAMPLE_ID
+        ).order_by(Slide.slide_number),
+        'serializers: deck elements': select(SlideElement.id, SlideElement.slide_id).where(
+            SlideElement.slide_id.in_([1, 2, 3])
+        ).order_by(SlideElement.slide_id, literal_column('slide_element.rowid')),
+        'serializers: first slides': select(Slide.id, Slide.presentation_id).where(
+            Slide.presentation_id.in_([SAMPLE_ID]), Slide.slide_number == 1
+        ).order_by(Slide.presentation_id, Slide.slide_number),
+        'slide_order: ids in order': select(Slide.id).where(
+            Slide.presentation_id == SAMPLE_ID
+        ).order_by(Slide.slide_number),
+        'slide_order: slide count': select(func.count(Slide.id)).where(Slide.presentation_id == SAMPLE_ID),
+        'templates: catalog': select(Presentation).where(Presentation.is_template == True),
+        'admin: template catalog': select(Presentation).where(
+            Presentation.is_template == True
+        ).order_by(Presentation.created_at.desc()),
+        'deck_clone: deck rows': select(Slide.id, SlideElement.id)
+            .select_from(Slide)
+            .outerjoin(SlideElement, SlideElement.slide_id == Slide.id)
+            .where(Slide.presentation_id == SAMPLE_ID)
+            .order_by(Slide.slide_number, Slide.id, literal_column('slide_element.rowid')),
+        'media_jobs: job by url': select(MediaJob).where(
+            MediaJob.result_url == SAMPLE_URL
+        ).order_by(MediaJob.created_at.desc()),
+        'blob_store: element references': select(func.count(SlideElement.id)).where(
+            db.text(MEDIA_ELEMENT_FILTER), SlideElement.content == SAMPLE_URL
+        ),
+        'media_gc: referenced media': referenced_media_statement(),
+        'blob_store: background references': select(func.count(Slide.id)).where(Slide.background_image == SAMPLE_URL),
+        'blob_store: preview references': select(func.count(Presentation.id)).where(
+            Presentation.preview_image == SAMPLE_URL
+        ),
+    }
+
+
+def full_table_scans(plan, sql):
+    """Строки плана с полным просмотром таблицы; просмотр результата CTE (WITH hits AS ...) таблицу не читает."""
+    ctes = set(CTE_NAME_RE.findall(sql))
+    return [line for line in plan if (match := FULL_SCAN_RE.match(line)) and match.group(1) not in ctes]
+
+
+def explain_query_plans(queries=None):
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    results = []
+    with engine.connect() as conn:
+        for name, statement in (queries or hot_queries()).items():
+            sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+            plan = [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+            results.append((name, plan, full_table_scans(plan, sql)))
+    engine.dispose()
+    return results
+
+
+@click.command(name='check-query-plans')
+@click.option('--verbose', is_flag=True, help='Печатать план для каждого запроса.')
+@with_appcontext
+def check_query_plans(verbose):
+    """Проверяет, что горячие запросы не делают полный просмотр таблиц (SQLite EXPLAIN QUERY PLAN)."""
+    failed = 0
+    for name, plan, full_scans in explain_query_plans():
+        status = 'FAIL' if full_scans else 'ok'
+        print(f"[{status}] {name}")
+        if verbose or full_scans:
+            for line in plan:
+                print(f"    {line}")
+        failed += bool(full_scans)
+
+    if failed:
+        raise click.ClickException(f"Полный просмотр таблиц в запросах: {failed}")
+    print("Все запросы используют индексы.")
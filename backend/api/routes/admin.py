@@ -1,9 +1,12 @@
-from flask import Blueprint, jsonify, request, current_app, g, url_for
-import os
-import uuid
+from flask import Blueprint, Response, jsonify, request, current_app, g
 from ..models import Presentation, Slide, User, SystemPrompt
 from ..extensions import db
 from .decorators import token_required, admin_required
+from .presentations import bulk_export_response
+from ..uploads import save_file_storage, store_template_preview
+from ..template_catalog import template_catalog
+from ..serializers import project, ADMIN_TEMPLATE_FIELDS, admin_template_listing, user_listing, prompt_listing
+from ..profiler import request_profiler, collapsed_stacks
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -11,33 +14,20 @@ admin_bp = Blueprint('admin', __name__)
 @token_required
 @admin_required
 def get_all_templates():
-    templates = Presentation.query.filter_by(is_template=True).order_by(Presentation.created_at.desc()).all()
-    output = []
-    for t in templates:
-        output.append({
-            'id': t.id,
-            'title': t.title,
-            'created_at': t.created_at.isoformat(),
-            'preview_image': t.preview_image
-        })
-    return jsonify(output)
+    return template_catalog.response('admin', admin_template_listing)
 
 @admin_bp.route('/admin/templates', methods=['POST'])
 @token_required
 @admin_required
 def create_template():
-    new_template = Presentation(title="Новый шаблон", owner=g.current_user, is_template=True)
+    new_template = Presentation(title="Новый шаблон", user_id=g.current_user.id, is_template=True)
     db.session.add(new_template)
     db.session.flush()
     first_slide = Slide(slide_number=1, presentation_id=new_template.id)
     db.session.add(first_slide)
     db.session.commit()
-    return jsonify({
-        'id': new_template.id,
-        'title': new_template.title,
-        'created_at': new_template.created_at.isoformat(),
-        'preview_image': new_template.preview_image
-    }), 201
+    template_catalog.invalidate()
+    return jsonify(project(Presentation, ADMIN_TEMPLATE_FIELDS, Presentation.id == new_template.id)[0]), 201
 
 @admin_bp.route('/admin/templates/<string:template_id>', methods=['PUT'])
 @token_required
@@ -48,6 +38,7 @@ def update_template(template_id):
     if 'title' in data:
         template.title = data['title']
     db.session.commit()
+    template_catalog.invalidate()
     return jsonify({'message': 'Шаблон обновлен'}), 200
 
 @admin_bp.route('/admin/templates/<string:template_id>', methods=['DELETE'])
@@ -57,6 +48,7 @@ def delete_template(template_id):
     template = Presentation.query.filter_by(id=template_id, is_template=True).first_or_404()
     db.session.delete(template)
     db.session.commit()
+    template_catalog.invalidate()
     return jsonify({'message': 'Шаблон успешно удален'}), 200
 
 @admin_bp.route('/admin/templates/<string:template_id>/upload-preview', methods=['POST'])
@@ -72,36 +64,15 @@ def upload_template_preview(template_id):
         return jsonify({'message': 'Файл не выбран'}), 400
     
     template = Presentation.query.filter_by(id=template_id, is_template=True).first_or_404()
-    
-    _root, extension = os.path.splitext(file.filename)
-    filename = f"template-preview-{uuid.uuid4()}{extension}"
-    
-    upload_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'template_previews')
-    os.makedirs(upload_folder, exist_ok=True)
-    
-    save_path = os.path.join(upload_folder, filename)
-    file.save(save_path)
-    
-    file_url = url_for('static', filename=f'uploads/template_previews/{filename}', _external=False)
-    template.preview_image = file_url
-    db.session.commit()
-    
-    return jsonify({'url': file_url}), 200
+    temp_path, extension, digest = save_file_storage(file)
+    payload, status_code = store_template_preview(temp_path, extension, digest, template)
+    return jsonify(payload), status_code
 
 @admin_bp.route('/admin/users', methods=['GET'])
 @token_required
 @admin_required
 def get_all_users():
-    users = User.query.order_by(User.id).all()
-    output = []
-    for user in users:
-        output.append({
-            'id': user.id,
-            'email': user.email,
-            'is_admin': user.is_admin,
-            'can_use_ai': user.can_use_ai
-        })
-    return jsonify(output)
+    return jsonify(user_listing())
 
 @admin_bp.route('/admin/users/<int:user_id>', methods=['PUT'])
 @token_required
@@ -116,22 +87,18 @@ def update_user_access(user_id):
     db.session.commit()
     return jsonify({'message': f'Доступ для пользователя {user.email} обновлен'}), 200
 
+@admin_bp.route('/admin/users/<int:user_id>/export/zip', methods=['GET'])
+@token_required
+@admin_required
+def export_user_presentations(user_id):
+    User.query.get_or_404(user_id)
+    return bulk_export_response((Presentation.user_id == user_id,), f"user-{user_id}-presentations.zip")
+
 @admin_bp.route('/admin/prompts', methods=['GET'])
 @token_required
 @admin_required
 def get_all_prompts():
-    prompts = SystemPrompt.query.order_by(SystemPrompt.id).all()
-    output = []
-    for p in prompts:
-        output.append({
-            'id': p.id,
-            'name': p.name,
-            'description': p.description,
-            'prompt_text': p.prompt_text,
-            'is_active': p.is_active,
-            'updated_at': p.updated_at.isoformat()
-        })
-    return jsonify(output)
+    return jsonify(prompt_listing())
 
 @admin_bp.route('/admin/prompts/<int:prompt_id>', methods=['PUT'])
 @token_required
@@ -146,4 +113,40 @@ def update_prompt(prompt_id):
         prompt.is_active = data['is_active']
     
     db.session.commit()
-    return jsonify({'message': f'Промпт "{prompt.name}" обновлен'}), 200
\ No newline at end of file
+    return jsonify({'message': f'Промпт "{prompt.name}" обновлен'}), 200
+
+@admin_bp.route('/admin/profiles', methods=['GET'])
+@token_required
+@admin_required
+def get_profiles():
+    return jsonify(request_profiler.list_captures())
+
+@admin_bp.route('/admin/profiles/<string:capture_id>', methods=['GET'])
+@token_required
+@admin_required
+def get_profile(capture_id):
+    record = request_profiler.load(capture_id)
+    if record is None:
+        return jsonify({'message': 'Профиль не найден'}), 404
+    return jsonify(record)
+
+@admin_bp.route('/admin/profiles/<string:capture_id>/collapsed', methods=['GET'])
+@token_required
+@admin_required
+def download_profile_collapsed(capture_id):
+    record = request_profiler.load(capture_id)
+    if record is None:
+        return jsonify({'message': 'Профиль не найден'}), 404
+    return Response(
+        collapsed_stacks(record),
+        mimetype='text/plain; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename=profile-{capture_id}.folded'}
+    )
+
+@admin_bp.route('/admin/profiles/<string:capture_id>', methods=['DELETE'])
+@token_required
+@admin_required
+def delete_profile(capture_id):
+    if not request_profiler.delete(capture_id):
+        return jsonify({'message': 'Профиль не найден'}), 404
+    return jsonify({'message': 'Профиль удален'}), 200
\ No newline at end of file
@@ -1,14 +1,16 @@
 from flask import request, jsonify, Blueprint, current_app, g
-from gigachat import GigaChat
 import ssl
-import requests
 import time
 import json
 import base64
 import os
 from ..models import Presentation, Slide, SlideElement, SystemPrompt
 from ..extensions import db
-from .decorators import token_required
+from .decorators import token_required, ai_access_required
+from ..ai_scheduler import ai_scheduler
+from ..capabilities import require
+from ..metrics import timed_http, external_request_duration
+from ..slide_layout import layout_slide
 
 ai_bp = Blueprint('ai', __name__)
 
@@ -22,7 +24,7 @@ class FusionBrainAPI:
         }
 
     def get_pipeline(self) -> str:
-        response = requests.get(self.URL + 'key/api/v1/pipelines', headers=self.AUTH_HEADERS, timeout=30)
+        response = timed_http('fusionbrain', 'GET', self.URL + 'key/api/v1/pipelines', headers=self.AUTH_HEADERS, timeout=30)
         response.raise_for_status()
         data = response.json()
         return data[0]['id']
@@ -42,7 +44,7 @@ class FusionBrainAPI:
             'pipeline_id': (None, pipeline),
             'params': (None, json.dumps(params), 'application/json')
         }
-        response = requests.post(self.URL + 'key/api/v1/pipeline/run', headers=self.AUTH_HEADERS, files=data, timeout=30)
+        response = timed_http('fusionbrain', 'POST', self.URL + 'key/api/v1/pipeline/run', headers=self.AUTH_HEADERS, files=data, timeout=30)
         response.raise_for_status()
         data = response.json()
         return data['uuid']
@@ -50,7 +52,7 @@ class FusionBrainAPI:
     def check_generation(self, request_id: str, attempts: int = 30, delay: int = 10):
         while attempts > 0:
             try:
-                response = requests.get(self.URL + 'key/api/v1/pipeline/status/' + request_id, 
+                response = timed_http('fusionbrain', 'GET', self.URL + 'key/api/v1/pipeline/status/' + request_id,
                                       headers=self.AUTH_HEADERS, timeout=30)
                 response.raise_for_status()
                 data = response.json()
@@ -90,23 +92,23 @@ class FusionBrainAPI:
             return None
 
 
-def upload_to_telegram(image_path, bot_token, chat_id):
-    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
+def upload_to_telegram(image_path, bot_token, chat_id, api_url='https://api.telegram.org'):
+    url = f"{api_url}/bot{bot_token}/sendPhoto"
     
     try:
         with open(image_path, "rb") as image_file:
             files = {"photo": image_file}
             data = {"chat_id": chat_id}
-            response = requests.post(url, files=files, data=data, timeout=30)
+            response = timed_http('telegram', 'POST', url, files=files, data=data, timeout=30)
         
         if response.status_code == 200:
             file_id = response.json()['result']['photo'][-1]['file_id']
-            file_info_url = f"https://api.telegram.org/bot{bot_token}/getFile"
-            file_info_response = requests.post(file_info_url, data={"file_id": file_id})
+            file_info_url = f"{api_url}/bot{bot_token}/getFile"
+            file_info_response = timed_http('telegram', 'POST', file_info_url, data={"file_id": file_id})
             
             if file_info_response.status_code == 200:
                 file_path = file_info_response.json()['result']['file_path']
-                return f"https://api.telegram.org/file/bot{bot_token}/{file_path}"
+                return f"{api_url}/file/bot{bot_token}/{file_path}"
             else:
                 print("❌ Не удалось получить информацию о файле")
                 return None
@@ -120,10 +122,13 @@ def upload_to_telegram(image_path, bot_token, chat_id):
 
 
 def generate_image_url(prompt: str):
+    import requests
     FUSIONBRAIN_API_KEY = current_app.config.get("KANDINSKY_API_KEY")
     FUSIONBRAIN_SECRET_KEY = current_app.config.get("KANDINSKY_SECRET_KEY")
     TELEGRAM_BOT_TOKEN = current_app.config.get("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHAT_ID = current_app.config.get("TELEGRAM_CHAT_ID")
+    TELEGRAM_API_URL = current_app.config.get("TELEGRAM_API_URL", "https://api.telegram.org")
+    poll_interval = current_app.config.get("FUSIONBRAIN_POLL_INTERVAL", 5)
 
     if not FUSIONBRAIN_API_KEY or not FUSIONBRAIN_SECRET_KEY:
         print("❌ FusionBrain API keys not configured")
@@ -134,7 +139,7 @@ def generate_image_url(prompt: str):
         return None
     
     api = FusionBrainAPI(
-        'https://api-key.fusionbrain.ai/',
+        current_app.config.get('FUSIONBRAIN_API_URL', 'https://api-key.fusionbrain.ai/'),
         FUSIONBRAIN_API_KEY,
         FUSIONBRAIN_SECRET_KEY
     )
@@ -143,7 +148,7 @@ def generate_image_url(prompt: str):
         pipeline_id = api.get_pipeline()
         task_id = api.generate(prompt, pipeline_id)
         for attempt in range(20):
-            time.sleep(5)
+            time.sleep(poll_interval)
             
             images = api.check_generation(task_id)
             
@@ -153,7 +158,7 @@ def generate_image_url(prompt: str):
                     saved_file = api.save_image(images[0], temp_filename)
                     
                     if saved_file:
-                        telegram_url = upload_to_telegram(saved_file, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+                        telegram_url = upload_to_telegram(saved_file, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_URL)
                         try:
                             os.remove(saved_file)
                         except:
@@ -183,6 +188,25 @@ def generate_image_url(prompt: str):
         return None
 
 
+def _gigachat_client():
+    require('gigachat')
+    from gigachat import GigaChat
+
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    # Адреса переопределяются для локальных заглушек (benchmarks/stub_servers.py)
+    urls = {
+        key: current_app.config[name]
+        for key, name in (('base_url', 'GIGACHAT_BASE_URL'), ('auth_url', 'GIGACHAT_AUTH_URL'))
+        if current_app.config.get(name)
+    }
+    return GigaChat(credentials=current_app.config.get("GIGACHAT_CREDENTIALS"), ssl_context=ssl_context, **urls)
+
+def _chat(giga, prompt):
+    with external_request_duration.time(service='gigachat'):
+        return giga.chat(prompt)
+
 def parse_slides_from_text(input_text):
     slides_data = []
     slide_chunks = input_text.strip().split("Слайд ")
@@ -217,12 +241,16 @@ def parse_slides_from_text(input_text):
     return slides_data
 
 
+@ai_bp.route('/ai/queue', methods=['GET'])
+@token_required
+def get_ai_queue_status():
+    return jsonify(ai_scheduler.status(g.current_user.id)), 200
+
+
 @ai_bp.route('/presentations/generate-ai', methods=['POST'])
 @token_required
+@ai_access_required
 def generate_ai_presentation():
-    if not g.current_user.can_use_ai:
-        return jsonify({'message': 'Доступ к функциям ИИ ограничен'}), 403
-
     data = request.get_json()
     user_prompt = data.get('prompt')
     if not user_prompt:
@@ -242,24 +270,17 @@ def generate_ai_presentation():
                 "Запрещаю использовать Markdown разметку. "
             )
 
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        with GigaChat(
-            credentials=current_app.config.get("GIGACHAT_CREDENTIALS"),
-            ssl_context=ssl_context
-        ) as giga:
+        with _gigachat_client() as giga:
             full_prompt = f"{system_prompt}\nТема презентации: {user_prompt}"
             
-            response = giga.chat(full_prompt)
+            response = _chat(giga, full_prompt)
             generated_text = response.choices[0].message.content
 
         slides_content = parse_slides_from_text(generated_text)
         if not slides_content or len(slides_content) < 2:
             return jsonify({'message': 'Не удалось сгенерировать корректную структуру презентации. Попробуйте другую тему.'}), 500
 
-        new_presentation = Presentation(title=user_prompt, owner=g.current_user)
+        new_presentation = Presentation(title=user_prompt, user_id=g.current_user.id)
         db.session.add(new_presentation)
         db.session.flush()
 
@@ -269,17 +290,11 @@ def generate_ai_presentation():
             db.session.add(new_slide)
             db.session.flush()
 
-            title_element = SlideElement(slide_id=new_slide.id, element_type='TEXT', content=content['title'], pos_x=80, pos_y=60, width=1120, height=120, font_size=48)
-            db.session.add(title_element)
-
+            layout = layout_slide(content['title'], content['text'], with_image=bool(image_url))
+            db.session.add(SlideElement(slide_id=new_slide.id, element_type='TEXT', content=content['title'], **layout['title']))
+            db.session.add(SlideElement(slide_id=new_slide.id, element_type='TEXT', content=content['text'], **layout['text']))
             if image_url:
-                text_element = SlideElement(slide_id=new_slide.id, element_type='TEXT', content=content['text'], pos_x=80, pos_y=200, width=580, height=460, font_size=24)
-                image_element = SlideElement(slide_id=new_slide.id, element_type='IMAGE', content=image_url, pos_x=680, pos_y=200, width=520, height=293)
-                db.session.add(text_element)
-                db.session.add(image_element)
-            else:
-                text_element = SlideElement(slide_id=new_slide.id, element_type='TEXT', content=content['text'], pos_x=80, pos_y=200, width=1120, height=460, font_size=24)
-                db.session.add(text_element)
+                db.session.add(SlideElement(slide_id=new_slide.id, element_type='IMAGE', content=image_url, **layout['image']))
 
         db.session.commit()
 
@@ -293,10 +308,8 @@ def generate_ai_presentation():
 
 @ai_bp.route('/ai/process-text', methods=['POST'])
 @token_required
+@ai_access_required
 def process_text():
-    if not g.current_user.can_use_ai:
-        return jsonify({'message': 'Доступ к функциям ИИ ограничен'}), 403
-
     data = request.get_json()
     text = data.get('text')
     command = data.get('command')
@@ -311,15 +324,11 @@ def process_text():
         else:
             system_prompt = "Ты — редактор-помощник. Выполни следующую команду для текста: '{command}'. Ответь только измененным текстом, без лишних слов и форматирования."
 
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        with GigaChat(credentials=current_app.config.get("GIGACHAT_CREDENTIALS"), ssl_context=ssl_context) as giga:
+        with _gigachat_client() as giga:
             final_system_prompt = system_prompt.replace('{command}', command)
             full_prompt = f"{final_system_prompt}\n\nТекст для обработки:\n\"{text}\""
             
-            response = giga.chat(full_prompt)
+            response = _chat(giga, full_prompt)
             result_text = response.choices[0].message.content
             return jsonify({'result': result_text})
 
@@ -329,10 +338,8 @@ def process_text():
 
 @ai_bp.route('/ai/suggest-image', methods=['POST'])
 @token_required
+@ai_access_required
 def suggest_image():
-    if not g.current_user.can_use_ai:
-        return jsonify({'message': 'Доступ к функциям ИИ ограничен'}), 403
-
     data = request.get_json()
     slide_text = data.get('slide_text')
     if not slide_text:
@@ -350,13 +357,9 @@ def suggest_image():
             )
 
         image_prompt = ""
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        with GigaChat(credentials=current_app.config.get("GIGACHAT_CREDENTIALS"), ssl_context=ssl_context) as giga:
+        with _gigachat_client() as giga:
             full_prompt = f"{system_prompt}\n\nТекст со слайда:\n\"{slide_text}\""
-            response = giga.chat(full_prompt)
+            response = _chat(giga, full_prompt)
             image_prompt = response.choices[0].message.content.strip()
 
         if not image_prompt:
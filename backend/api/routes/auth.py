@@ -1,9 +1,9 @@
 from flask import request, jsonify, Blueprint, current_app
-from datetime import datetime, timedelta, timezone
-import jwt
 import re
 from ..models import User
-from ..extensions import db, bcrypt
+from ..extensions import db
+from ..passwords import password_hasher, PasswordHasherBusy
+from ..auth_tokens import start_session, refresh_session, revoke_session, TokenError
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -25,7 +25,10 @@ def register():
     if User.query.filter_by(email=email).first():
         return jsonify({'message': 'Пользователь с таким email уже существует'}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    try:
+        hashed_password = password_hasher.hash_password(password)
+    except PasswordHasherBusy:
+        return jsonify({'message': 'Сервер перегружен, попробуйте позже'}), 503
     new_user = User(email=email, password_hash=hashed_password)
     
     db.session.add(new_user)
@@ -44,19 +47,51 @@ def login():
 
     user = User.query.filter_by(email=email).first()
 
-    if user and bcrypt.check_password_hash(user.password_hash, password):
-        token = jwt.encode({
-            'user_id': user.id,
-            'exp': datetime.now(timezone.utc) + timedelta(hours=24)
-        }, current_app.config['SECRET_KEY'], algorithm="HS256")
+    try:
+        password_ok = user is not None and password_hasher.check_password(user.password_hash, password)
+        if password_ok and password_hasher.needs_rehash(user.password_hash):
+            user.password_hash = password_hasher.hash_password(password)
+            db.session.commit()
+    except PasswordHasherBusy:
+        return jsonify({'message': 'Сервер перегружен, попробуйте позже'}), 503
 
+    if password_ok:
+        token, refresh_token = start_session(user)
+        db.session.commit()
         return jsonify({
             'token': token,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'is_admin': user.is_admin
-            }
+            'refresh_token': refresh_token,
+            'user': _user_payload(user)
         }), 200
     
-    return jsonify({'message': 'Неверный email или пароль'}), 401
\ No newline at end of file
+    return jsonify({'message': 'Неверный email или пароль'}), 401
+
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if not refresh_token:
+        return jsonify({'message': 'Refresh-токен отсутствует'}), 401
+    try:
+        (token, new_refresh_token), user = refresh_session(refresh_token)
+    except TokenError as e:
+        print(f"Refresh error: {e}")
+        return jsonify({'message': 'Сессия истекла, войдите снова'}), 401
+    return jsonify({
+        'token': token,
+        'refresh_token': new_refresh_token,
+        'user': _user_payload(user)
+    }), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+def logout():
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if refresh_token:
+        revoke_session(refresh_token)
+    return jsonify({'message': 'Сессия завершена'}), 200
+
+def _user_payload(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'is_admin': user.is_admin
+    }
\ No newline at end of file
@@ -1,8 +1,8 @@
 from functools import wraps
 from flask import request, jsonify, g
-import jwt
-from flask import current_app
-from ..models import User
+from ..auth_tokens import decode_access_token, TokenError
+from ..ai_scheduler import ai_scheduler, AiQueueFull, AiQueueTimeout
+from ..capabilities import require
 
 def token_required(f):
     @wraps(f)
@@ -13,11 +13,8 @@ def token_required(f):
         if not token:
             return jsonify({'message': 'Токен аутентификации отсутствует'}), 401
         try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            g.current_user = User.query.get(data['user_id'])
-            if not g.current_user:
-                return jsonify({'message': 'Пользователь не найден'}), 401
-        except Exception as e:
+            g.current_user = decode_access_token(token)
+        except (TokenError, KeyError) as e:
             print(f"Token error: {e}")
             return jsonify({'message': 'Недействительный токен'}), 401
         return f(*args, **kwargs)
@@ -29,4 +26,25 @@ def admin_required(f):
         if not g.current_user or not g.current_user.is_admin:
             return jsonify({"message": "Требуются права администратора"}), 403
         return f(*args, **kwargs)
+    return decorated_function
+
+def ai_access_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not g.current_user.can_use_ai:
+            return jsonify({'message': 'Доступ к функциям ИИ ограничен'}), 403
+        require('gigachat')
+        try:
+            ticket = ai_scheduler.acquire(g.current_user.id)
+        except AiQueueFull:
+            return jsonify({'message': 'Слишком много запросов к ИИ. Дождитесь завершения предыдущих.'}), 429
+        except AiQueueTimeout as e:
+            return jsonify({
+                'message': 'Сервис ИИ перегружен, попробуйте позже',
+                'queue_position': e.position
+            }), 429
+        try:
+            return f(*args, **kwargs)
+        finally:
+            ai_scheduler.release(ticket)
     return decorated_function
\ No newline at end of file
@@ -1,9 +1,11 @@
-from flask import request, jsonify, Blueprint, g, current_app
+from flask import request, jsonify, Blueprint, g
 from ..models import SlideElement, Slide, Presentation
 from ..extensions import db
 from .decorators import token_required
+from ..media_jobs import media_status_for_url
+from ..blob_store import MEDIA_ELEMENT_TYPES, release_media
+from ..serializers import serialize_element
 import re
-import os
 
 elements_bp = Blueprint('elements', __name__)
 
@@ -37,32 +39,18 @@ def add_element_to_slide(slide_id):
         content=data.get('content', 'Новый текст')
     )
     
-    response_data = {}
-
     if element_type == 'YOUTUBE_VIDEO':
         youtube_id = get_youtube_id(data.get('content'))
         if not youtube_id:
             return jsonify({'message': 'Некорректная ссылка на YouTube'}), 400
         new_element.content = youtube_id
-        response_data['thumbnailUrl'] = f"https://img.youtube.com/vi/{youtube_id}/0.jpg"
+    elif element_type == 'UPLOADED_VIDEO':
+        new_element.status = media_status_for_url(new_element.content)
 
     db.session.add(new_element)
     db.session.commit()
-    
-    response_data.update({
-        'id': new_element.id,
-        'element_type': new_element.element_type,
-        'pos_x': new_element.pos_x,
-        'pos_y': new_element.pos_y,
-        'width': new_element.width,
-        'height': new_element.height,
-        'content': new_element.content,
-        'font_size': new_element.font_size,
-        'autoplay': new_element.autoplay,
-        'muted': new_element.muted,
-    })
-    
-    return jsonify(response_data), 201
+
+    return jsonify(serialize_element(new_element)), 201
 
 @elements_bp.route('/elements/<string:element_id>', methods=['PUT'])
 @token_required
@@ -88,6 +76,23 @@ def update_element(element_id):
     db.session.commit()
     return jsonify({'message': 'Элемент обновлен'}), 200
 
+@elements_bp.route('/elements/<string:element_id>/status', methods=['GET'])
+@token_required
+def get_element_status(element_id):
+    element = SlideElement.query.get_or_404(element_id)
+    slide = Slide.query.get_or_404(element.slide_id)
+    presentation = Presentation.query.get_or_404(slide.presentation_id)
+    if presentation.user_id != g.current_user.id:
+        return jsonify({'message': 'Доступ запрещен'}), 403
+
+    if element.status == 'processing':
+        status = media_status_for_url(element.content)
+        if status != element.status:
+            element.status = status
+            db.session.commit()
+
+    return jsonify({'id': element.id, 'status': element.status}), 200
+
 @elements_bp.route('/elements/<string:element_id>', methods=['DELETE'])
 @token_required
 def delete_element(element_id):
@@ -97,15 +102,10 @@ def delete_element(element_id):
     if presentation.user_id != g.current_user.id:
         return jsonify({'message': 'Доступ запрещен'}), 403
 
-    if element.element_type in ['IMAGE', 'UPLOADED_VIDEO'] and element.content:
-        try:
-            filename = element.content.split('/')[-1]
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            if os.path.exists(filepath):
-                os.remove(filepath)
-        except Exception as e:
-            print(f"Error deleting file for element {element_id}: {e}")
-            
+    media_url = element.content if element.element_type in MEDIA_ELEMENT_TYPES else None
     db.session.delete(element)
     db.session.commit()
+
+    if media_url:
+        release_media(media_url)
     return jsonify({'message': 'Элемент удален'}), 204
\ No newline at end of file
@@ -1,42 +1,40 @@
-from flask import request, jsonify, Blueprint, current_app, g, send_file, url_for
+from flask import request, jsonify, Blueprint, current_app, g, send_file
 import io
 import os
-import requests
-from pptx import Presentation as PptxPresentation
-from pptx.dml.color import RGBColor
 from .decorators import token_required
-from pptx.util import Inches, Pt
 import uuid
-from PIL import Image
-import ffmpeg
-import win32com.client
-import pythoncom
-from ..models import Presentation, Slide
+from ..models import Presentation, Slide, MediaJob
+from ..uploads import save_file_storage, store_image, store_video, store_audio, incoming_path
+from ..blob_store import save_stream_hashed
+from ..pptx_import import import_pptx, PPTX_EXTENSION
+from ..media_previews import export_poster_path
+from ..serializers import serialize_deck_slides, serialize_slide, presentation_summary, presentation_summaries
 from ..extensions import db
+from ..deck_clone import clone_presentation
+from ..template_catalog import template_catalog
+from ..capabilities import require, is_available
+from ..metrics import export_duration
+from ..deck_export import AssetCache, archive_names, zip_response
+from ..slide_renderer import slide_renderer, pngs_to_zip, pngs_to_pdf
 
 presentations_bp = Blueprint('presentations', __name__)
 
 PIXELS_PER_INCH = 80.0
-SERVER_BASE_URL = 'http://127.0.0.1:5000'
+PPTX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
 
 def px_to_inches(px):
     return px / PIXELS_PER_INCH
 
-def _download_image_from_url(image_url):
-    if image_url.startswith('/'):
-        image_url = f"{SERVER_BASE_URL}{image_url}"
-    try:
-        response = requests.get(image_url, stream=True, timeout=30)
-        response.raise_for_status()
-        image_data = io.BytesIO(response.content)
-        image_data.seek(0)
-        return image_data
-    except Exception as e:
-        print(f"Ошибка загрузки изображения {image_url}: {e}")
-        return None
+def _create_pptx_from_data(presentation_id, assets=None):
+    require('pptx')
+    require('imaging')
+    from pptx import Presentation as PptxPresentation
+    from pptx.dml.color import RGBColor
+    from pptx.util import Inches, Pt
+    from PIL import Image
 
-def _create_pptx_from_data(presentation_id):
     presentation_data = Presentation.query.get_or_404(presentation_id)
+    assets = assets or AssetCache()
     
     prs = PptxPresentation()
     prs.slide_width = Inches(16)
@@ -49,7 +47,7 @@ def _create_pptx_from_data(presentation_id):
 
         if slide_data.background_image:
             try:
-                image_stream = _download_image_from_url(slide_data.background_image)
+                image_stream = assets.image(slide_data.background_image)
                 if image_stream:
                     slide.background.fill.picture(image_stream)
             except Exception as e:
@@ -82,7 +80,7 @@ def _create_pptx_from_data(presentation_id):
             
             elif element.element_type == 'IMAGE' and element.content:
                 try:
-                    image_stream = _download_image_from_url(element.content)
+                    image_stream = assets.image(element.content)
                     if not image_stream:
                         continue
                     
@@ -119,7 +117,7 @@ def _create_pptx_from_data(presentation_id):
                     f"https://img.youtube.com/vi/{element.content}/0.jpg"
                 ]
                 for url in thumbnail_urls:
-                    image_stream = _download_image_from_url(url)
+                    image_stream = assets.image(url)
                     if image_stream:
                         break
                 
@@ -136,11 +134,12 @@ def _create_pptx_from_data(presentation_id):
                     filename = element.content.split('/')[-1]
                     file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
                     
+                    poster_path = export_poster_path(file_path, element.element_type)
                     if element.element_type == 'UPLOADED_VIDEO':
-                        poster_path = os.path.join(current_app.root_path, 'static', 'video_poster.png')
+                        poster_path = poster_path or os.path.join(current_app.root_path, 'static', 'video_poster.png')
                         mime_type = 'video/mp4'
                     else:
-                        poster_path = os.path.join(current_app.root_path, 'static', 'audio_poster.png')
+                        poster_path = poster_path or os.path.join(current_app.root_path, 'static', 'audio_poster.png')
                         mime_type = 'audio/mpeg'
 
                     if os.path.exists(file_path) and os.path.exists(poster_path):
@@ -165,12 +164,82 @@ def download_presentation_pptx(presentation_id):
     presentation = Presentation.query.get_or_404(presentation_id)
     if presentation.user_id != g.current_user.id: return jsonify({'message': 'Доступ запрещен'}), 403
     
-    prs, title = _create_pptx_from_data(presentation_id)
-    
-    file_stream = io.BytesIO()
-    prs.save(file_stream)
+    with export_duration.time(format='pptx'):
+        prs, title = _create_pptx_from_data(presentation_id)
+        file_stream = io.BytesIO()
+        prs.save(file_stream)
     file_stream.seek(0)
-    return send_file(file_stream, as_attachment=True, download_name=f"{title}.pptx", mimetype='application/vnd.openxmlformats-officedocument.presentationml.presentation')
+    return send_file(file_stream, as_attachment=True, download_name=f"{title}.pptx", mimetype=PPTX_MIMETYPE)
+
+def _build_pptx(presentation_id, assets):
+    return _create_pptx_from_data(presentation_id, assets)[0]
+
+def bulk_export_response(criteria, download_name):
+    """Потоковый ZIP с PPTX всех презентаций, подходящих под criteria."""
+    require('pptx')
+    require('imaging')
+    decks = db.session.execute(
+        db.select(Presentation.id, Presentation.title).where(*criteria).order_by(Presentation.updated_at.desc())
+    ).all()
+    names = archive_names(title for _, title in decks)
+    decks = [(presentation_id, name) for (presentation_id, _), name in zip(decks, names)]
+    return zip_response(current_app._get_current_object(), decks, _build_pptx, download_name)
+
+@presentations_bp.route('/presentations/export/zip', methods=['GET'])
+@token_required
+def export_presentations_zip():
+    # ?ids=a,b,c — выбранные презентации, без параметра — все презентации пользователя
+    criteria = [Presentation.user_id == g.current_user.id, Presentation.is_template == False]
+    ids = [presentation_id for presentation_id in request.args.get('ids', '').split(',') if presentation_id]
+    if ids:
+        found = db.session.query(db.func.count(Presentation.id)).filter(*criteria, Presentation.id.in_(ids)).scalar()
+        if found != len(set(ids)):
+            return jsonify({'message': 'Презентация не найдена'}), 404
+        criteria.append(Presentation.id.in_(ids))
+    return bulk_export_response(criteria, 'presentations.zip')
+
+@presentations_bp.route('/presentations/<string:presentation_id>/download/png', methods=['GET'])
+@token_required
+def download_slide_png(presentation_id):
+    presentation = Presentation.query.get_or_404(presentation_id)
+    if presentation.user_id != g.current_user.id:
+        return jsonify({'message': 'Доступ запрещен'}), 403
+
+    slide_number = request.args.get('slide', 1, type=int)
+    slide_id = db.session.query(Slide.id).filter_by(presentation_id=presentation_id, slide_number=slide_number).scalar()
+    if slide_id is None:
+        return jsonify({'message': 'Слайд не найден'}), 404
+
+    scale = slide_renderer.scale(request.args.get('scale'))
+    with export_duration.time(format='png'):
+        png = slide_renderer.render_png([serialize_slide(slide_id)], scale)[0]
+    # download=0 отдает картинку inline, для превью
+    return send_file(
+        io.BytesIO(png), mimetype='image/png',
+        as_attachment=request.args.get('download', '1') == '1',
+        download_name=f"{presentation.title}-{slide_number}.png"
+    )
+
+@presentations_bp.route('/presentations/<string:presentation_id>/download/zip', methods=['GET'])
+@token_required
+def download_presentation_zip(presentation_id):
+    presentation = Presentation.query.get_or_404(presentation_id)
+    if presentation.user_id != g.current_user.id:
+        return jsonify({'message': 'Доступ запрещен'}), 403
+
+    scale = slide_renderer.scale(request.args.get('scale'))
+    with export_duration.time(format='zip'):
+        archive = pngs_to_zip(slide_renderer.render_png(serialize_deck_slides(presentation_id), scale))
+    return send_file(archive, as_attachment=True, download_name=f"{presentation.title}.zip", mimetype='application/zip')
+
+def _send_rendered_pdf(presentation):
+    scale = slide_renderer.scale(request.args.get('scale'))
+    with export_duration.time(format='pdf_image'):
+        pngs = slide_renderer.render_png(serialize_deck_slides(presentation.id), scale)
+        if not pngs:
+            return jsonify({'message': 'В презентации нет слайдов'}), 400
+        pdf_stream = pngs_to_pdf(pngs, scale)
+    return send_file(pdf_stream, as_attachment=True, download_name=f"{presentation.title}.pdf", mimetype='application/pdf')
 
 @presentations_bp.route('/presentations/<string:presentation_id>/download/pdf', methods=['GET'])
 @token_required
@@ -179,6 +248,14 @@ def download_presentation_pdf(presentation_id):
     if presentation.user_id != g.current_user.id:
         return jsonify({'message': 'Доступ запрещен'}), 403
 
+    # Без PowerPoint (или по ?mode=image) PDF собирается из отрендеренных слайдов
+    if request.args.get('mode') == 'image' or not is_available('powerpoint'):
+        return _send_rendered_pdf(presentation)
+
+    require('powerpoint')
+    import pythoncom
+    import win32com.client
+
     prs, title = _create_pptx_from_data(presentation_id)
     
     instance_path = current_app.instance_path
@@ -195,13 +272,14 @@ def download_presentation_pdf(presentation_id):
     pdf_stream = None
 
     try:
-        prs.save(pptx_path)
+        with export_duration.time(format='pdf'):
+            prs.save(pptx_path)
 
-        pythoncom.CoInitializeEx(0)
-        powerpoint = win32com.client.Dispatch("PowerPoint.Application")
-        pres = powerpoint.Presentations.Open(pptx_path, WithWindow=False)
-        
-        pres.SaveAs(pdf_path, 32)
+            pythoncom.CoInitializeEx(0)
+            powerpoint = win32com.client.Dispatch("PowerPoint.Application")
+            pres = powerpoint.Presentations.Open(pptx_path, WithWindow=False)
+
+            pres.SaveAs(pdf_path, 32)
         print(f"Successfully converted {pptx_path} to {pdf_path}")
 
         with open(pdf_path, 'rb') as f:
@@ -220,50 +298,38 @@ def download_presentation_pdf(presentation_id):
         if os.path.exists(pptx_path): os.remove(pptx_path)
         if os.path.exists(pdf_path): os.remove(pdf_path)
 
-def _serialize_slide(slide):
-    if not slide:
-        return None
-    
-    elements_output = []
-    for e in slide.elements:
-        element_data = {
-            'id': e.id, 'element_type': e.element_type, 'pos_x': e.pos_x,
-            'pos_y': e.pos_y, 'width': e.width, 'height': e.height,
-            'content': e.content, 'font_size': e.font_size
-        }
-        if e.element_type == 'YOUTUBE_VIDEO':
-            element_data['thumbnailUrl'] = f"https://img.youtube.com/vi/{e.content}/0.jpg"
-        elements_output.append(element_data)
-        
-    return {
-        'id': slide.id, 
-        'slide_number': slide.slide_number,
-        'background_color': slide.background_color, 
-        'background_image': slide.background_image,
-        'elements': elements_output
-    }
-
 @presentations_bp.route('/presentations', methods=['POST'])
 @token_required
 def create_presentation():
     data = request.get_json()
     title = data.get('title', 'Новая презентация')
-    new_presentation = Presentation(title=title, owner=g.current_user)
+    new_presentation = Presentation(title=title, user_id=g.current_user.id)
     db.session.add(new_presentation)
     db.session.flush()
 
     first_slide = Slide(slide_number=1, presentation_id=new_presentation.id)
     db.session.add(first_slide)
     db.session.commit()
-    
-    first_slide_data = _serialize_slide(first_slide)
-    
-    return jsonify({
-        'id': new_presentation.id,
-        'title': new_presentation.title,
-        'updated_at': new_presentation.updated_at.isoformat(),
-        'first_slide': first_slide_data
-    }), 201
+
+    return jsonify(presentation_summary(new_presentation.id)), 201
+
+@presentations_bp.route('/presentations/import', methods=['POST'])
+@token_required
+def import_presentation():
+    # Тело запроса пишется на диск потоком: либо multipart-поле file, либо сам .pptx с его MIME-типом
+    if request.mimetype == PPTX_MIMETYPE:
+        temp_path = incoming_path(PPTX_EXTENSION)
+        save_stream_hashed(request.stream, temp_path)
+        title = request.args.get('title')
+    else:
+        file = request.files.get('file')
+        if file is None or file.filename == '':
+            return jsonify({'message': 'Файл не выбран'}), 400
+        temp_path, _extension, _digest = save_file_storage(file)
+        title = request.form.get('title') or os.path.splitext(file.filename)[0]
+
+    payload, status_code = import_pptx(temp_path, title, g.current_user.id)
+    return jsonify(payload), status_code
 
 @presentations_bp.route('/presentations/<string:presentation_id>', methods=['GET'])
 @token_required
@@ -272,35 +338,40 @@ def get_presentation_by_id(presentation_id):
     if presentation.user_id != g.current_user.id:
         return jsonify({'message': 'Доступ запрещен'}), 403
 
-    slides = Slide.query.filter_by(presentation_id=presentation.id).order_by(Slide.slide_number).all()
-    slides_output = [_serialize_slide(s) for s in slides]
+    slides_output = serialize_deck_slides(presentation.id)
 
     return jsonify({'id': presentation.id, 'title': presentation.title, 'slides': slides_output}), 200
 
 @presentations_bp.route('/presentations', methods=['GET'])
 @token_required
 def get_presentations():
-    presentations = Presentation.query.filter_by(user_id=g.current_user.id, is_template=False).order_by(Presentation.updated_at.desc()).all()
-    output = []
-    for p in presentations:
-        first_slide = Slide.query.filter_by(presentation_id=p.id, slide_number=1).first()
-        first_slide_data = _serialize_slide(first_slide)
-        
-        output.append({
-            'id': p.id,
-            'title': p.title,
-            'updated_at': p.updated_at.isoformat(),
-            'first_slide': first_slide_data
-        })
+    output = presentation_summaries(
+        Presentation.user_id == g.current_user.id, Presentation.is_template == False,
+        order_by=(Presentation.updated_at.desc(),)
+    )
     return jsonify(output), 200
 
+@presentations_bp.route('/presentations/<string:presentation_id>/duplicate', methods=['POST'])
+@token_required
+def duplicate_presentation(presentation_id):
+    presentation = Presentation.query.get_or_404(presentation_id)
+    if presentation.user_id != g.current_user.id: return jsonify({'message': 'Доступ запрещен'}), 403
+
+    new_presentation_id = clone_presentation(presentation.id, g.current_user.id, f"{presentation.title} (копия)"[:150])
+    db.session.commit()
+
+    return jsonify(presentation_summary(new_presentation_id)), 201
+
 @presentations_bp.route('/presentations/<string:presentation_id>', methods=['DELETE'])
 @token_required
 def delete_presentation(presentation_id):
     presentation = Presentation.query.get_or_404(presentation_id)
     if presentation.user_id != g.current_user.id: return jsonify({'message': 'Доступ запрещен'}), 403
+    is_template = presentation.is_template
     db.session.delete(presentation)
     db.session.commit()
+    if is_template:
+        template_catalog.invalidate()
     return jsonify({'message': 'Презентация успешно удалена'}), 200
 
 @presentations_bp.route('/presentations/<string:presentation_id>', methods=['PUT'])
@@ -311,16 +382,10 @@ def update_presentation(presentation_id):
     data = request.get_json()
     if 'title' in data: presentation.title = data['title']
     db.session.commit()
-    
-    first_slide = Slide.query.filter_by(presentation_id=presentation.id, slide_number=1).first()
-    first_slide_data = _serialize_slide(first_slide)
+    if presentation.is_template:
+        template_catalog.invalidate()
 
-    return jsonify({
-        'id': presentation.id,
-        'title': presentation.title,
-        'updated_at': presentation.updated_at.isoformat(),
-        'first_slide': first_slide_data
-    }), 200
+    return jsonify(presentation_summary(presentation.id)), 200
 
 @presentations_bp.route('/upload/image', methods=['POST'])
 @token_required
@@ -330,14 +395,9 @@ def upload_image():
     file = request.files['file']
     if file.filename == '':
         return jsonify({'message': 'Файл не выбран'}), 400
-    if file:
-        _root, extension = os.path.splitext(file.filename)
-        filename = f"{uuid.uuid4()}{extension}"
-        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
-        save_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(save_path)
-        file_url = url_for('static', filename=f'uploads/{filename}', _external=False)
-        return jsonify({'url': file_url}), 200
+    temp_path, extension, digest = save_file_storage(file)
+    payload, status_code = store_image(temp_path, extension, digest)
+    return jsonify(payload), status_code
 
 @presentations_bp.route('/upload/video', methods=['POST'])
 @token_required
@@ -347,26 +407,23 @@ def upload_video():
     file = request.files['file']
     if file.filename == '':
         return jsonify({'message': 'Файл не выбран'}), 400
-    if file:
-        _root, extension = os.path.splitext(file.filename)
-        temp_filename = f"{uuid.uuid4()}{extension}"
-        final_filename = f"{uuid.uuid4()}.mp4"
-        temp_path = os.path.join(current_app.config['UPLOAD_FOLDER'], temp_filename)
-        final_path = os.path.join(current_app.config['UPLOAD_FOLDER'], final_filename)
-        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
-        file.save(temp_path)
-        try:
-            print(f"Starting conversion from {temp_path} to {final_path}")
-            ffmpeg.input(temp_path).output(final_path, vcodec='libx264', acodec='aac', strict='experimental').run(capture_stdout=True, capture_stderr=True)
-            print("Conversion successful")
-            os.remove(temp_path)
-            file_url = url_for('static', filename=f'uploads/{final_filename}', _external=False)
-            return jsonify({'url': file_url}), 200
-        except ffmpeg.Error as e:
-            os.remove(temp_path)
-            print("FFmpeg Error:")
-            print(e.stderr.decode())
-            return jsonify({'message': 'Не удалось обработать видеофайл'}), 500
+    temp_path, _extension, digest = save_file_storage(file)
+    payload, status_code = store_video(temp_path, digest, g.current_user.id)
+    return jsonify(payload), status_code
+
+@presentations_bp.route('/media/jobs/<string:job_id>', methods=['GET'])
+@token_required
+def get_media_job(job_id):
+    job = MediaJob.query.get_or_404(job_id)
+    if job.user_id != g.current_user.id:
+        return jsonify({'message': 'Доступ запрещен'}), 403
+    return jsonify({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'url': job.result_url,
+        'error': job.error
+    }), 200
 
 @presentations_bp.route('/upload/audio', methods=['POST'])
 @token_required
@@ -376,11 +433,6 @@ def upload_audio():
     file = request.files['file']
     if file.filename == '':
         return jsonify({'message': 'Файл не выбран'}), 400
-    if file:
-        _root, extension = os.path.splitext(file.filename)
-        filename = f"{uuid.uuid4()}{extension}"
-        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
-        save_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(save_path)
-        file_url = url_for('static', filename=f'uploads/{filename}', _external=False)
-        return jsonify({'url': file_url}), 200
\ No newline at end of file
+    temp_path, extension, digest = save_file_storage(file)
+    payload, status_code = store_audio(temp_path, extension, digest)
+    return jsonify(payload), status_code
\ No newline at end of file
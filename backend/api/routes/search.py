@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify, request, g
+from .decorators import token_required
+from ..search import search_index
+
+search_bp = Blueprint('search', __name__)
+
+MAX_PER_PAGE = 50
+
+@search_bp.route('/search', methods=['GET'])
+@token_required
+def search_presentations():
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'message': 'Пустой поисковый запрос'}), 400
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(MAX_PER_PAGE, max(1, request.args.get('per_page', 20, type=int)))
+
+    total, results = search_index.search(g.current_user.id, query, page, per_page)
+    return jsonify({'query': query, 'page': page, 'per_page': per_page, 'total': total, 'results': results})
\ No newline at end of file
@@ -1,10 +1,15 @@
 from flask import request, jsonify, Blueprint, g
+from sqlalchemy.exc import IntegrityError
 from ..models import Presentation, Slide
 from ..extensions import db
 from .decorators import token_required
+from .. import slide_order
+from ..serializers import serialize_slide
 
 slides_bp = Blueprint('slides', __name__)
 
+INSERT_SLIDE_ATTEMPTS = 3
+
 @slides_bp.route('/presentations/<string:presentation_id>/slides/reorder', methods=['PUT'])
 @token_required
 def reorder_slides(presentation_id):
@@ -18,15 +23,10 @@ def reorder_slides(presentation_id):
     if not slide_ids or not isinstance(slide_ids, list):
         return jsonify({'message': 'Требуется массив ID слайдов'}), 400
 
-    slides = Slide.query.filter_by(presentation_id=presentation_id).all()
-    slide_map = {slide.id: slide for slide in slides}
-
-    if len(slide_ids) != len(slides) or not all(sid in slide_map for sid in slide_ids):
-        return jsonify({'message': 'Некорректный набор ID слайдов'}), 400
-
-    for index, slide_id in enumerate(slide_ids):
-        slide_map[slide_id].slide_number = index + 1
-    
+    try:
+        slide_order.reorder_slides(presentation_id, slide_ids)
+    except slide_order.SlideOrderError as e:
+        return jsonify({'message': str(e)}), 400
     db.session.commit()
 
     return jsonify({'message': 'Порядок слайдов обновлен'}), 200
@@ -38,21 +38,41 @@ def add_slide(presentation_id):
     if presentation.user_id != g.current_user.id:
         return jsonify({'message': 'Доступ запрещен'}), 403
 
-    max_slide_number = db.session.query(db.func.max(Slide.slide_number)).filter_by(presentation_id=presentation.id).scalar() or 0
-    
-    new_slide = Slide(
-        slide_number=max_slide_number + 1,
-        presentation_id=presentation.id
-    )
-    db.session.add(new_slide)
+    data = request.get_json(silent=True) or {}
+    position = data.get('position')
+    if position is not None and not isinstance(position, int):
+        return jsonify({'message': 'Некорректная позиция слайда'}), 400
+
+    # Параллельное добавление слайда могло занять тот же номер (уникальный индекс): пересчитываем и пробуем снова
+    for _attempt in range(INSERT_SLIDE_ATTEMPTS):
+        try:
+            new_slide = slide_order.insert_slide(presentation.id, position)
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+    else:
+        return jsonify({'message': 'Слайды презентации одновременно изменяются, повторите попытку'}), 409
+
+    return jsonify(serialize_slide(new_slide.id)), 201
+
+@slides_bp.route('/slides/<int:slide_id>/position', methods=['PUT'])
+@token_required
+def move_slide(slide_id):
+    slide = Slide.query.get_or_404(slide_id)
+    presentation = Presentation.query.get_or_404(slide.presentation_id)
+    if presentation.user_id != g.current_user.id:
+        return jsonify({'message': 'Доступ запрещен'}), 403
+
+    data = request.get_json()
+    position = data.get('position')
+    if not isinstance(position, int):
+        return jsonify({'message': 'Некорректная позиция слайда'}), 400
+
+    slide_order.move_slide(slide, position)
     db.session.commit()
 
-    return jsonify({
-        'id': new_slide.id,
-        'slide_number': new_slide.slide_number,
-        'background_color': new_slide.background_color,
-        'elements': []
-    }), 201
+    return jsonify({'slide_ids': slide_order.slide_ids_in_order(presentation.id)}), 200
 
 @slides_bp.route('/slides/<int:slide_id>', methods=['DELETE'])
 @token_required
@@ -63,10 +83,10 @@ def delete_slide(slide_id):
     if presentation.user_id != g.current_user.id:
         return jsonify({'message': 'Доступ запрещен'}), 403
     
-    if Slide.query.filter_by(presentation_id=presentation.id).count() <= 1:
+    if slide_order.slide_count(presentation.id) <= 1:
         return jsonify({'message': 'Нельзя удалить последний слайд'}), 400
 
-    db.session.delete(slide)
+    slide_order.delete_slide(slide)
     db.session.commit()
 
     return jsonify({'message': 'Слайд успешно удален'}), 204
@@ -90,16 +110,4 @@ def update_slide(slide_id):
 
     db.session.commit()
 
-    elements_output = [{
-        'id': e.id, 'element_type': e.element_type, 'pos_x': e.pos_x,
-        'pos_y': e.pos_y, 'width': e.width, 'height': e.height,
-        'content': e.content, 'font_size': e.font_size
-    } for e in slide.elements]
-
-    return jsonify({
-        'id': slide.id, 
-        'slide_number': slide.slide_number,
-        'background_color': slide.background_color, 
-        'background_image': slide.background_image,
-        'elements': elements_output
-    }), 200
\ No newline at end of file
+    return jsonify(serialize_slide(slide.id)), 200
\ No newline at end of file
@@ -0,0 +1,114 @@
+import re
+from flask import request, jsonify, Blueprint, current_app, g
+from ..models import Presentation
+from ..uploads import (
+    UPLOAD_KINDS, UploadSessionError, create_upload_session, load_upload_session,
+    append_upload_chunk, finalize_upload_session, discard_upload_session, gc_upload_sessions,
+    store_upload
+)
+from .decorators import token_required
+
+uploads_bp = Blueprint('uploads', __name__)
+
+SHA256_RE = re.compile(r'[0-9a-f]{64}')
+
+
+def _session_error_response(e):
+    payload = {'message': e.message}
+    payload.update(e.payload)
+    return jsonify(payload), e.status_code
+
+
+def _session_status(meta):
+    return {
+        'upload_id': meta['id'],
+        'kind': meta['kind'],
+        'size': meta['size'],
+        'received': meta['received'],
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE'],
+    }
+
+
+@uploads_bp.route('/uploads', methods=['POST'])
+@token_required
+def init_upload():
+    data = request.get_json()
+    kind = data.get('kind')
+    filename = data.get('filename') or ''
+    size = data.get('size')
+    sha256 = data.get('sha256')
+    template_id = data.get('template_id')
+
+    if kind not in UPLOAD_KINDS:
+        return jsonify({'message': 'Некорректный тип загрузки'}), 400
+    if not filename:
+        return jsonify({'message': 'Файл не выбран'}), 400
+    if not isinstance(size, int) or size <= 0 or size > current_app.config['UPLOAD_MAX_SIZE']:
+        return jsonify({'message': 'Некорректный размер файла'}), 400
+    if not isinstance(sha256, str) or not SHA256_RE.fullmatch(sha256.lower()):
+        return jsonify({'message': 'Требуется контрольная сумма SHA-256'}), 400
+
+    if kind == 'template_preview':
+        if not g.current_user.is_admin:
+            return jsonify({"message": "Требуются права администратора"}), 403
+        Presentation.query.filter_by(id=template_id, is_template=True).first_or_404()
+
+    gc_upload_sessions(current_app.config['UPLOAD_SESSION_TTL'])
+    meta = create_upload_session(g.current_user.id, kind, filename, size, sha256, template_id)
+    meta['received'] = 0
+    return jsonify(_session_status(meta)), 201
+
+
+@uploads_bp.route('/uploads/<string:upload_id>', methods=['GET'])
+@token_required
+def get_upload_status(upload_id):
+    try:
+        meta = load_upload_session(upload_id, g.current_user.id)
+    except UploadSessionError as e:
+        return _session_error_response(e)
+    return jsonify(_session_status(meta)), 200
+
+
+@uploads_bp.route('/uploads/<string:upload_id>', methods=['PUT'])
+@token_required
+def append_upload(upload_id):
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'message': 'Требуется смещение фрагмента'}), 400
+    try:
+        meta = load_upload_session(upload_id, g.current_user.id)
+        meta['received'] = append_upload_chunk(
+            meta, offset, request.stream, current_app.config['UPLOAD_CHUNK_MAX_SIZE']
+        )
+    except UploadSessionError as e:
+        return _session_error_response(e)
+    return jsonify(_session_status(meta)), 200
+
+
+@uploads_bp.route('/uploads/<string:upload_id>/complete', methods=['POST'])
+@token_required
+def complete_upload(upload_id):
+    try:
+        meta = load_upload_session(upload_id, g.current_user.id)
+        template = None
+        if meta['kind'] == 'template_preview':
+            template = Presentation.query.filter_by(id=meta['template_id'], is_template=True).first_or_404()
+        source_path, digest = finalize_upload_session(meta)
+    except UploadSessionError as e:
+        return _session_error_response(e)
+
+    payload, status_code = store_upload(
+        meta['kind'], source_path, meta['extension'], digest, g.current_user.id, template, meta.get('filename')
+    )
+    return jsonify(payload), status_code
+
+
+@uploads_bp.route('/uploads/<string:upload_id>', methods=['DELETE'])
+@token_required
+def cancel_upload(upload_id):
+    try:
+        load_upload_session(upload_id, g.current_user.id)
+    except UploadSessionError as e:
+        return _session_error_response(e)
+    discard_upload_session(upload_id)
+    return jsonify({'message': 'Загрузка отменена'}), 200
@@ -0,0 +1,381 @@
+import re
+import math
+import html
+import unicodedata
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import event, select, delete, insert, text, func, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from .extensions import db
+from .models import Presentation, Slide, SlideElement, SearchDocument, SearchPosting
+
+FTS_TABLE = 'search_fts'
+TOKEN_RE = re.compile(r'\w+')
+MAX_QUERY_TERMS = 8
+MAX_TERM_LENGTH = 64
+SNIPPET_WORDS = 16
+MARK_START = '\x02'
+MARK_END = '\x03'
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def normalize(value):
+    # Нижний регистр без диакритики (ё -> е, й -> и). В FTS5 пишется уже нормализованный текст:
+    # unicode61 снимает диакритику только с латиницы, а индекс и запрос должны совпадать
+    decomposed = unicodedata.normalize('NFKD', value.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(value):
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(normalize(value or ''))]
+
+
+def highlight(snippet):
+    """Экранирует сниппет и превращает служебные маркеры в <mark>."""
+    return html.escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _document_rows(session, *criteria, titles=True, elements=True, element_ids=None):
+    rows = []
+    if titles:
+        for presentation_id, title, user_id in session.execute(
+            select(Presentation.id, Presentation.title, Presentation.user_id).where(*criteria)
+        ):
+            rows.append({
+                'doc_key': f"p:{presentation_id}", 'presentation_id': presentation_id,
+                'slide_id': None, 'user_id': user_id, 'body': title or '',
+            })
+    if not elements:
+        return rows
+    element_query = (
+        select(SlideElement.id, SlideElement.content, Slide.id, Presentation.id, Presentation.user_id)
+        .join(Slide, Slide.id == SlideElement.slide_id)
+        .join(Presentation, Presentation.id == Slide.presentation_id)
+        .where(SlideElement.element_type == 'TEXT', *criteria)
+    )
+    if element_ids is not None:
+        element_query = element_query.where(SlideElement.id.in_(element_ids))
+    for element_id, content, slide_id, presentation_id, user_id in session.execute(element_query):
+        if content and content.strip():
+            rows.append({
+                'doc_key': f"e:{element_id}", 'presentation_id': presentation_id,
+                'slide_id': slide_id, 'user_id': user_id, 'body': content,
+            })
+    return rows
+
+
+class _Fts5Backend:
+    name = 'fts5'
+
+    def ensure(self, session):
+        session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ))
+
+    def add(self, session, documents):
+        session.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, body) VALUES (:id, :body)"),
+            [{'id': document['id'], 'body': normalize(document['body'])} for document in documents]
+        )
+
+    def remove(self, session, document_ids):
+        session.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), [{'id': document_id} for document_id in document_ids]
+        )
+
+    def clear(self, session):
+        session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+
+    def search(self, session, terms, user_id, limit, offset):
+        # Термы уже состоят только из \w, поэтому кавычки внутри невозможны
+        match = ' '.join(f'"{term}"*' for term in terms)
+        rows = session.execute(text(f"""
+            WITH hits AS (
+                SELECT d.id AS document_id, d.presentation_id, d.slide_id, bm25({FTS_TABLE}) AS rank
+                FROM {FTS_TABLE} JOIN search_document d ON d.id = {FTS_TABLE}.rowid
+                WHERE {FTS_TABLE} MATCH :match AND d.user_id = :user_id
+            ), best AS (
+                SELECT document_id, presentation_id, slide_id, rank,
+                       ROW_NUMBER() OVER (PARTITION BY presentation_id, slide_id ORDER BY rank) AS position
+                FROM hits
+            )
+            SELECT best.presentation_id, p.title, best.slide_id, s.slide_number, best.rank, d.body,
+                   COUNT(*) OVER () AS total
+            FROM best
+            JOIN presentation p ON p.id = best.presentation_id
+            JOIN search_document d ON d.id = best.document_id
+            LEFT JOIN slide s ON s.id = best.slide_id
+            WHERE best.position = 1 AND p.is_template = :is_template
+            ORDER BY best.rank, p.updated_at DESC
+            LIMIT :limit OFFSET :offset
+        """), {
+            'match': match, 'user_id': user_id, 'is_template': False, 'limit': limit, 'offset': offset
+        }).all()
+        total = rows[0].total if rows else 0
+        # bm25() в FTS5 отрицательный: чем меньше, тем релевантнее. Индекс хранит нормализованный текст,
+        # поэтому сниппет строится по исходному тексту документа, а не функцией snippet()
+        return total, [
+            (row.presentation_id, row.title, row.slide_id, row.slide_number, -row.rank, _snippet(row.body, terms))
+            for row in rows
+        ]
+
+
+class _InvertedIndexBackend:
+    """Переносимый индекс на обычных таблицах: термы с частотами и BM25 на стороне Python."""
+    name = 'inverted'
+
+    def ensure(self, session):
+        pass
+
+    def add(self, session, documents):
+        postings = []
+        for document in documents:
+            frequencies = {}
+            for term in tokenize(document['body']):
+                frequencies[term] = frequencies.get(term, 0) + 1
+            postings.extend(
+                {'term': term, 'document_id': document['id'], 'frequency': count} for term, count in frequencies.items()
+            )
+        if postings:
+            session.execute(insert(SearchPosting), postings)
+
+    def remove(self, session, document_ids):
+        session.execute(delete(SearchPosting).where(SearchPosting.document_id.in_(document_ids)))
+
+    def clear(self, session):
+        session.execute(delete(SearchPosting))
+
+    def _matches(self, session, term, user_id):
+        # Диапазон вместо LIKE, чтобы префиксный поиск шел по первичному ключу в любой СУБД
+        return session.execute(
+            select(SearchPosting.document_id, func.sum(SearchPosting.frequency))
+            .join(SearchDocument, SearchDocument.id == SearchPosting.document_id)
+            .where(
+                SearchPosting.term >= term, SearchPosting.term < term + '\uffff',
+                SearchDocument.user_id == user_id
+            )
+            .group_by(SearchPosting.document_id)
+        ).all()
+
+    def search(self, session, terms, user_id, limit, offset):
+        matches = [dict(self._matches(session, term, user_id)) for term in terms]
+        candidates = set.intersection(*(set(match) for match in matches)) if matches else set()
+        if not candidates:
+            return 0, []
+
+        total_documents, average_length = session.execute(
+            select(func.count(SearchDocument.id), func.avg(SearchDocument.length)).where(SearchDocument.user_id == user_id)
+        ).one()
+        average_length = float(average_length or 1)
+        documents = {
+            row.id: row for row in session.execute(
+                select(SearchDocument.id, SearchDocument.presentation_id, SearchDocument.slide_id,
+                       SearchDocument.body, SearchDocument.length)
+                .where(SearchDocument.id.in_(candidates))
+            )
+        }
+
+        best = {}
+        for document_id, document in documents.items():
+            score = 0.0
+            for match in matches:
+                df = len(match)
+                idf = math.log(1 + (total_documents - df + 0.5) / (df + 0.5))
+                tf = match[document_id]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * document.length / average_length)
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            key = (document.presentation_id, document.slide_id)
+            if key not in best or score > best[key][0]:
+                best[key] = (score, document.body)
+
+        presentations = {
+            row.id: row for row in session.execute(
+                select(Presentation.id, Presentation.title, Presentation.updated_at)
+                .where(Presentation.id.in_({key[0] for key in best}), Presentation.is_template == False)
+            )
+        }
+        slide_numbers = dict(session.execute(
+            select(Slide.id, Slide.slide_number).where(Slide.id.in_({key[1] for key in best if key[1] is not None}))
+        ).all())
+        ranked = sorted(
+            (key for key in best if key[0] in presentations),
+            key=lambda key: (-best[key][0], -presentations[key[0]].updated_at.timestamp())
+        )
+        return len(ranked), [
+            (
+                presentation_id, presentations[presentation_id].title, slide_id, slide_numbers.get(slide_id),
+                best[(presentation_id, slide_id)][0], _snippet(best[(presentation_id, slide_id)][1], terms)
+            )
+            for presentation_id, slide_id in ranked[offset:offset + limit]
+        ]
+
+
+def _snippet(body, terms):
+    words = list(TOKEN_RE.finditer(body))
+    hits = [index for index, word in enumerate(words) if normalize(word.group()).startswith(tuple(terms))]
+    if not hits:
+        return body[:200]
+    start = max(0, hits[0] - SNIPPET_WORDS // 4)
+    end = min(len(words), start + SNIPPET_WORDS)
+    parts = []
+    cursor = words[start].start()
+    for index in range(start, end):
+        word = words[index]
+        parts.append(body[cursor:word.start()])
+        parts.append(f"{MARK_START}{word.group()}{MARK_END}" if index in hits else word.group())
+        cursor = word.end()
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(words) else body[cursor:]
+    return prefix + ''.join(parts) + suffix
+
+
+class SearchIndex:
+    """Полнотекстовый индекс по заголовкам презентаций и TEXT-элементам.
+
+    В SQLite с FTS5 используется виртуальная таблица search_fts, в остальных СУБД — таблица термов.
+    Индекс обновляется в той же транзакции, что и изменения элементов и заголовков (after_flush).
+    """
+
+    def __init__(self):
+        self.backend_name = 'auto'
+        self._backends = {}
+
+    def init_app(self, app):
+        self.backend_name = app.config.get('SEARCH_BACKEND', self.backend_name)
+        app.extensions['search_index'] = self
+        app.cli.add_command(search_reindex_command)
+        if not event.contains(Session, 'after_flush', _after_flush):
+            event.listen(Session, 'after_flush', _after_flush)
+
+    def backend(self, session):
+        bind = session.get_bind()
+        key = str(bind.url)
+        backend = self._backends.get(key)
+        if backend is None:
+            use_fts = self.backend_name == 'fts5' or (
+                self.backend_name == 'auto' and bind.dialect.name == 'sqlite' and _sqlite_has_fts5(session)
+            )
+            backend = _Fts5Backend() if use_fts else _InvertedIndexBackend()
+            backend.ensure(session)
+            self._backends[key] = backend
+        return backend
+
+    def _remove(self, session, *criteria):
+        document_ids = session.scalars(select(SearchDocument.id).where(*criteria)).all()
+        if document_ids:
+            self.backend(session).remove(session, document_ids)
+            session.execute(delete(SearchDocument).where(SearchDocument.id.in_(document_ids)))
+
+    def _add(self, session, rows):
+        if not rows:
+            return
+        for row in rows:
+            row['length'] = len(tokenize(row['body']))
+        document_ids = session.scalars(
+            insert(SearchDocument).returning(SearchDocument.id, sort_by_parameter_order=True), rows
+        ).all()
+        self.backend(session).add(session, [
+            {'id': document_id, 'body': row['body']} for document_id, row in zip(document_ids, rows)
+        ])
+
+    def index_presentation(self, presentation_id):
+        """Полная переиндексация одной презентации (для вставок мимо ORM, например клонирования)."""
+        session = db.session
+        self._remove(session, SearchDocument.presentation_id == presentation_id)
+        self._add(session, _document_rows(session, Presentation.id == presentation_id))
+
+    def apply_changes(self, session, changes):
+        if changes['presentations_removed']:
+            self._remove(session, SearchDocument.presentation_id.in_(changes['presentations_removed']))
+        if changes['slides_removed']:
+            self._remove(session, SearchDocument.slide_id.in_(changes['slides_removed']))
+        removed_keys = [f"p:{presentation_id}" for presentation_id in changes['titles']]
+        removed_keys += [f"e:{element_id}" for element_id in changes['elements'] | changes['elements_removed']]
+        if removed_keys:
+            self._remove(session, SearchDocument.doc_key.in_(removed_keys))
+        rows = []
+        if changes['titles']:
+            rows += _document_rows(session, Presentation.id.in_(changes['titles']), elements=False)
+        if changes['elements']:
+            rows += _document_rows(session, titles=False, element_ids=changes['elements'])
+        self._add(session, rows)
+
+    def rebuild(self):
+        session = db.session
+        backend = self.backend(session)
+        backend.clear(session)
+        session.execute(delete(SearchDocument))
+        rows = _document_rows(session)
+        self._add(session, rows)
+        session.commit()
+        return len(rows)
+
+    def search(self, user_id, query, page=1, per_page=20):
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return 0, []
+        session = db.session
+        total, rows = self.backend(session).search(session, terms, user_id, per_page, (page - 1) * per_page)
+        return total, [{
+            'presentation_id': presentation_id,
+            'presentation_title': title,
+            'slide_id': slide_id,
+            'slide_number': slide_number,
+            'score': round(score, 4),
+            'snippet': highlight(snippet or ''),
+        } for presentation_id, title, slide_id, slide_number, score, snippet in rows]
+
+
+def _sqlite_has_fts5(session):
+    return any(row[0] == 'ENABLE_FTS5' for row in session.execute(text('PRAGMA compile_options')))
+
+
+def _changed(obj, *names):
+    state = sa_inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+def _after_flush(session, flush_context):
+    changes = {
+        'titles': set(), 'elements': set(),
+        'presentations_removed': set(), 'slides_removed': set(), 'elements_removed': set(),
+    }
+    for obj in session.new:
+        if isinstance(obj, Presentation):
+            changes['titles'].add(obj.id)
+        elif isinstance(obj, SlideElement):
+            changes['elements'].add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Presentation) and _changed(obj, 'title'):
+            changes['titles'].add(obj.id)
+        elif isinstance(obj, SlideElement) and _changed(obj, 'content', 'element_type', 'slide_id'):
+            changes['elements'].add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Presentation):
+            changes['presentations_removed'].add(obj.id)
+        elif isinstance(obj, Slide):
+            changes['slides_removed'].add(obj.id)
+        elif isinstance(obj, SlideElement):
+            changes['elements_removed'].add(obj.id)
+    changes['titles'] -= changes['presentations_removed']
+    changes['elements'] -= changes['elements_removed']
+    if any(changes.values()):
+        search_index.apply_changes(session, changes)
+
+
+def migration_include_object(obj, name, type_, reflected, compare_to):
+    # Виртуальная таблица FTS5 и ее служебные таблицы создаются вне моделей: миграции их не трогают
+    return not (type_ == 'table' and name.startswith(FTS_TABLE))
+
+
+@click.command(name='search-reindex')
+@with_appcontext
+def search_reindex_command():
+    """Перестраивает полнотекстовый индекс по всем презентациям."""
+    count = search_index.rebuild()
+    print(f"Проиндексировано документов: {count} ({search_index.backend(db.session).name})")
+
+
+search_index = SearchIndex()
\ No newline at end of file
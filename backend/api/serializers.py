@@ -0,0 +1,137 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, literal_column
+from .extensions import db
+from .models import Presentation, Slide, SlideElement, User, SystemPrompt
+from .media_previews import media_preview_urls
+from .image_variants import image_variant_urls
+
+# Поля ответа API: сериализуем кортежи колонок, не собирая ORM-объекты
+ELEMENT_FIELDS = (
+    'id', 'element_type', 'pos_x', 'pos_y', 'width', 'height', 'content',
+    'font_size', 'autoplay', 'muted', 'status'
+)
+SLIDE_FIELDS = ('id', 'slide_number', 'background_color', 'background_image')
+PRESENTATION_FIELDS = ('id', 'title', 'updated_at')
+TEMPLATE_FIELDS = ('id', 'title', 'preview_image')
+ADMIN_TEMPLATE_FIELDS = ('id', 'title', 'created_at', 'preview_image')
+USER_FIELDS = ('id', 'email', 'is_admin', 'can_use_ai')
+PROMPT_FIELDS = ('id', 'name', 'description', 'prompt_text', 'is_active', 'updated_at')
+MEDIA_PREVIEW_TYPES = ('UPLOADED_VIDEO', 'AUDIO')
+
+
+def columns(model, fields):
+    return [getattr(model, name) for name in fields]
+
+
+def element_order_columns():
+    # Порядок элементов определяет их наложение; в SQLite это порядок вставки (rowid)
+    if db.engine.dialect.name == 'sqlite':
+        return (literal_column('slide_element.rowid'),)
+    return ()
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def row_dict(fields, row):
+    return {name: _value(value) for name, value in zip(fields, row)}
+
+
+def project(model, fields, *criteria, order_by=()):
+    query = select(*columns(model, fields)).where(*criteria).order_by(*order_by)
+    return [row_dict(fields, row) for row in db.session.execute(query)]
+
+
+def element_dict(row, upload_folder=None):
+    data = dict(zip(ELEMENT_FIELDS, row))
+    if data['element_type'] == 'YOUTUBE_VIDEO':
+        data['thumbnailUrl'] = f"https://img.youtube.com/vi/{data['content']}/0.jpg"
+    elif data['element_type'] == 'IMAGE':
+        data.update(image_variant_urls(data['content'], upload_folder or current_app.config['UPLOAD_FOLDER']))
+    elif data['element_type'] in MEDIA_PREVIEW_TYPES:
+        data.update(media_preview_urls(
+            data['content'], data['element_type'], upload_folder or current_app.config['UPLOAD_FOLDER']
+        ))
+    return data
+
+
+def serialize_element(element):
+    return element_dict(tuple(getattr(element, name) for name in ELEMENT_FIELDS))
+
+
+def _slides_with_elements(*criteria):
+    """Слайды с элементами двумя запросами: [(presentation_id, slide), ...] по порядку."""
+    slides = {}
+    owners = []
+    slide_query = (
+        select(*columns(Slide, SLIDE_FIELDS), Slide.presentation_id)
+        .where(*criteria)
+        .order_by(Slide.presentation_id, Slide.slide_number)
+    )
+    for row in db.session.execute(slide_query):
+        slide = dict(zip(SLIDE_FIELDS, row))
+        slide['elements'] = []
+        slides[slide['id']] = slide
+        owners.append((row[-1], slide))
+    if not slides:
+        return owners
+
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    element_query = (
+        select(*columns(SlideElement, ELEMENT_FIELDS), SlideElement.slide_id)
+        .where(SlideElement.slide_id.in_(list(slides)))
+        .order_by(SlideElement.slide_id, *element_order_columns())
+    )
+    for row in db.session.execute(element_query):
+        slides[row[-1]]['elements'].append(element_dict(row[:-1], upload_folder))
+    return owners
+
+
+def serialize_slide(slide_id):
+    slides = _slides_with_elements(Slide.id == slide_id)
+    return slides[0][1] if slides else None
+
+
+def serialize_deck_slides(presentation_id):
+    return [slide for _, slide in _slides_with_elements(Slide.presentation_id == presentation_id)]
+
+
+def first_slides(presentation_ids):
+    if not presentation_ids:
+        return {}
+    return dict(_slides_with_elements(Slide.presentation_id.in_(presentation_ids), Slide.slide_number == 1))
+
+
+def presentation_summaries(*criteria, order_by=()):
+    summaries = project(Presentation, PRESENTATION_FIELDS, *criteria, order_by=order_by)
+    slides = first_slides([p['id'] for p in summaries])
+    for summary in summaries:
+        summary['first_slide'] = slides.get(summary['id'])
+    return summaries
+
+
+def presentation_summary(presentation_id):
+    summaries = presentation_summaries(Presentation.id == presentation_id)
+    return summaries[0] if summaries else None
+
+
+def user_listing():
+    return project(User, USER_FIELDS, order_by=(User.id,))
+
+
+def prompt_listing():
+    return project(SystemPrompt, PROMPT_FIELDS, order_by=(SystemPrompt.id,))
+
+
+def template_listing():
+    return project(Presentation, TEMPLATE_FIELDS, Presentation.is_template == True)
+
+
+def admin_template_listing():
+    return project(
+        Presentation, ADMIN_TEMPLATE_FIELDS, Presentation.is_template == True,
+        order_by=(Presentation.created_at.desc(),)
+    )
+
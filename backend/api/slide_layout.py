@@ -0,0 +1,106 @@
+import math
+from functools import lru_cache
+from .capabilities import is_available
+from .slide_renderer import SLIDE_WIDTH, SLIDE_HEIGHT, TEXT_PADDING, LINE_HEIGHT, _font, slide_renderer
+
+MARGIN_X = 80
+TITLE_TOP = 60
+TITLE_MAX_HEIGHT = 160
+SECTION_GAP = 20
+BOTTOM_MARGIN = 60
+COLUMN_GAP = 20
+IMAGE_WIDTH = 520
+IMAGE_HEIGHT = 293
+TITLE_FONT_SIZES = (24, 48)
+BODY_FONT_SIZES = (14, 32)
+# Ширины слов меряются один раз в опорном кегле и масштабируются линейно
+REFERENCE_FONT_SIZE = 100
+# Запас на кернинг, хинтинг и расхождения метрик шрифта с браузером
+FIT_MARGIN = 0.95
+
+# Прежняя раскладка с фиксированными координатами: используется, если Pillow недоступен
+FIXED_LAYOUT = {
+    'title': {'pos_x': 80, 'pos_y': 60, 'width': 1120, 'height': 120, 'font_size': 48},
+    'text': {'pos_x': 80, 'pos_y': 200, 'width': 1120, 'height': 460, 'font_size': 24},
+    'text_with_image': {'pos_x': 80, 'pos_y': 200, 'width': 580, 'height': 460, 'font_size': 24},
+    'image': {'pos_x': 680, 'pos_y': 200, 'width': 520, 'height': 293},
+}
+
+
+@lru_cache(maxsize=16384)
+def _reference_width(font_path, text):
+    return _font(font_path, REFERENCE_FONT_SIZE).getlength(text)
+
+
+def _text_width(font_path, size, text):
+    return _reference_width(font_path, text) * size / REFERENCE_FONT_SIZE
+
+
+def _line_count(paragraphs, font_path, size, width):
+    """Число строк при переносе по словам, как в рендере и редакторе (pre-wrap, break-word)."""
+    space = _text_width(font_path, size, ' ')
+    lines = 0
+    for words in paragraphs:
+        lines += 1
+        current = 0.0
+        for word in words:
+            word_width = _text_width(font_path, size, word)
+            if current and current + space + word_width > width:
+                lines += 1
+                current = 0.0
+            if word_width > width:
+                lines += math.ceil(word_width / width) - 1
+                current = word_width % width
+            else:
+                current = current + space + word_width if current else word_width
+    return lines
+
+
+def _box_height(lines, size):
+    return 2 * TEXT_PADDING + math.ceil(lines * size * LINE_HEIGHT)
+
+
+def fit_text(text, width, max_height, sizes, font_path):
+    """Наибольший кегль из диапазона sizes, при котором текст помещается в блок; возвращает (кегль, высота)."""
+    paragraphs = [paragraph.split() for paragraph in (text or '').split('\n')]
+    inner_width = max(1.0, (width - 2 * TEXT_PADDING) * FIT_MARGIN)
+    low, high = sizes
+    best = low
+    while low <= high:
+        size = (low + high) // 2
+        if _box_height(_line_count(paragraphs, font_path, size, inner_width), size) <= max_height:
+            best = size
+            low = size + 1
+        else:
+            high = size - 1
+    return best, min(max_height, _box_height(_line_count(paragraphs, font_path, best, inner_width), best))
+
+
+def layout_slide(title, text, with_image):
+    """Координаты и кегли заголовка, текста и (если есть) картинки для сгенерированного слайда."""
+    if not is_available('imaging'):
+        return {
+            'title': dict(FIXED_LAYOUT['title']),
+            'text': dict(FIXED_LAYOUT['text_with_image' if with_image else 'text']),
+            'image': dict(FIXED_LAYOUT['image']) if with_image else None,
+        }
+
+    font_path = slide_renderer.font_path
+    content_width = SLIDE_WIDTH - 2 * MARGIN_X
+    title_size, title_height = fit_text(title, content_width, TITLE_MAX_HEIGHT, TITLE_FONT_SIZES, font_path)
+
+    body_top = TITLE_TOP + title_height + SECTION_GAP
+    body_height = SLIDE_HEIGHT - BOTTOM_MARGIN - body_top
+    text_width = content_width - IMAGE_WIDTH - COLUMN_GAP if with_image else content_width
+    body_size, text_height = fit_text(text, text_width, body_height, BODY_FONT_SIZES, font_path)
+
+    return {
+        'title': {'pos_x': MARGIN_X, 'pos_y': TITLE_TOP, 'width': content_width, 'height': title_height, 'font_size': title_size},
+        'text': {'pos_x': MARGIN_X, 'pos_y': body_top, 'width': text_width, 'height': text_height, 'font_size': body_size},
+        'image': {
+            'pos_x': MARGIN_X + text_width + COLUMN_GAP,
+            'pos_y': body_top,
+            'width': IMAGE_WIDTH,
+            'height': min(IMAGE_HEIGHT, body_height),
+        } if with_image else None,
+    }
\ No newline at end of file
@@ -0,0 +1,97 @@
+from sqlalchemy import update, case, select, func
+from .extensions import db
+from .models import Slide
+
+
+class SlideOrderError(Exception):
+    pass
+
+
+def slide_ids_in_order(presentation_id):
+    return db.session.scalars(
+        select(Slide.id).where(Slide.presentation_id == presentation_id).order_by(Slide.slide_number)
+    ).all()
+
+
+def _apply_order(presentation_id, slide_ids):
+    # Уникальный индекс (presentation_id, slide_number) проверяется построчно,
+    # поэтому сначала уводим номера в отрицательную область, а затем одним
+    # UPDATE ... CASE выставляем итоговые значения.
+    db.session.execute(
+        update(Slide)
+        .where(Slide.presentation_id == presentation_id)
+        .values(slide_number=-Slide.slide_number)
+        .execution_options(synchronize_session=False)
+    )
+    if slide_ids:
+        db.session.execute(
+            update(Slide)
+            .where(Slide.presentation_id == presentation_id)
+            .values(slide_number=case(
+                {slide_id: index + 1 for index, slide_id in enumerate(slide_ids)},
+                value=Slide.id
+            ))
+            .execution_options(synchronize_session=False)
+        )
+    db.session.expire_all()
+
+
+def reorder_slides(presentation_id, slide_ids):
+    current_ids = slide_ids_in_order(presentation_id)
+    if len(slide_ids) != len(current_ids) or set(slide_ids) != set(current_ids):
+        raise SlideOrderError('Некорректный набор ID слайдов')
+    if list(slide_ids) != current_ids:
+        _apply_order(presentation_id, slide_ids)
+
+
+def _shift_slides(presentation_id, from_number, delta):
+    db.session.execute(
+        update(Slide)
+        .where(Slide.presentation_id == presentation_id, Slide.slide_number >= from_number)
+        .values(slide_number=-(Slide.slide_number + delta))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(Slide)
+        .where(Slide.presentation_id == presentation_id, Slide.slide_number < 0)
+        .values(slide_number=-Slide.slide_number)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.expire_all()
+
+
+def slide_count(presentation_id):
+    return db.session.scalar(
+        select(func.count(Slide.id)).where(Slide.presentation_id == presentation_id)
+    )
+
+
+def insert_slide(presentation_id, position=None, **slide_fields):
+    count = slide_count(presentation_id)
+    if position is None or position > count + 1:
+        position = count + 1
+    position = max(1, position)
+
+    if position <= count:
+        _shift_slides(presentation_id, position, 1)
+
+    new_slide = Slide(slide_number=position, presentation_id=presentation_id, **slide_fields)
+    db.session.add(new_slide)
+    db.session.flush()
+    return new_slide
+
+
+def move_slide(slide, position):
+    slide_ids = slide_ids_in_order(slide.presentation_id)
+    position = min(max(1, position), len(slide_ids))
+    slide_ids.remove(slide.id)
+    slide_ids.insert(position - 1, slide.id)
+    _apply_order(slide.presentation_id, slide_ids)
+
+
+def delete_slide(slide):
+    presentation_id = slide.presentation_id
+    slide_number = slide.slide_number
+    db.session.delete(slide)
+    db.session.flush()
+    _shift_slides(presentation_id, slide_number + 1, -1)
@@ -0,0 +1,333 @@
+import io
+import os
+import atexit
+import zipfile
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from .capabilities import require
+from .media_previews import export_poster_path
+
+# Координаты элементов заданы в пикселях холста редактора 1280x720
+SLIDE_WIDTH = 1280
+SLIDE_HEIGHT = 720
+PIXELS_PER_INCH = 80.0
+TEXT_PADDING = 8
+LINE_HEIGHT = 1.2
+TEXT_COLOR = (0, 0, 0, 255)
+PLACEHOLDER_COLOR = (40, 40, 40, 255)
+MIN_SCALE = 0.1
+MAX_SCALE = 4.0
+IMAGE_CACHE_SIZE = 64 * 1024 * 1024
+REMOTE_IMAGE_TIMEOUT = 10
+FONT_CANDIDATES = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+    'C:/Windows/Fonts/arial.ttf',
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    '/Library/Fonts/Arial.ttf',
+)
+
+
+def default_font_path():
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=64)
+def _font(path, size):
+    from PIL import ImageFont
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size)
+
+
+def _local_path(url, settings):
+    path = url.split('?', 1)[0]
+    if path.startswith('/static/uploads/'):
+        root, relative = settings['upload_folder'], path[len('/static/uploads/'):]
+    elif path.startswith('/static/'):
+        root, relative = settings['static_folder'], path[len('/static/'):]
+    else:
+        return None
+    root = os.path.abspath(root)
+    candidate = os.path.abspath(os.path.join(root, relative))
+    return candidate if candidate.startswith(root + os.sep) else None
+
+
+class _ImageCache:
+    """LRU декодированных изображений с лимитом по байтам; живет в процессе-воркере между слайдами."""
+
+    def __init__(self, max_size=IMAGE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        size = image.width * image.height * len(image.getbands())
+        with self._lock:
+            if size > self.max_size or key in self._entries:
+                return
+            self._entries[key] = image
+            self._size += size
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.width * evicted.height * len(evicted.getbands())
+
+
+_image_cache = _ImageCache()
+
+
+def _decode_image(source, scale):
+    from PIL import Image
+    if source.startswith(('http://', 'https://')):
+        import requests
+        response = requests.get(source, timeout=REMOTE_IMAGE_TIMEOUT)
+        response.raise_for_status()
+        stream = io.BytesIO(response.content)
+    else:
+        stream = open(source, 'rb')
+    with stream, Image.open(stream) as image:
+        # Больше слайда в текущем масштабе картинка на холсте не бывает
+        image.thumbnail((round(SLIDE_WIDTH * scale), round(SLIDE_HEIGHT * scale)))
+        return image.convert('RGBA')
+
+
+def _load_image(source, scale, settings):
+    """Декодированное изображение по локальному пути или URL в масштабе рендера."""
+    key = (source, scale)
+    image = _image_cache.get(key)
+    if image is not None:
+        return image
+    try:
+        image = _decode_image(source, scale)
+    except Exception as e:
+        # Ошибки не кешируются: после сетевой ошибки следующий слайд попробует снова
+        print(f"Не удалось загрузить изображение для рендера {source}: {e}")
+        return None
+    _image_cache.max_size = settings['image_cache_size']
+    _image_cache.put(key, image)
+    return image
+
+
+def _resolve_image(url, scale, settings):
+    if not url:
+        return None
+    if url.startswith(('http://', 'https://')):
+        return _load_image(url, scale, settings)
+    path = _local_path(url, settings)
+    return _load_image(path, scale, settings) if path and os.path.exists(path) else None
+
+
+def _fit(image, width, height, mode):
+    """contain / cover / fill как object-fit в превью слайда."""
+    from PIL import Image, ImageOps
+    if mode == 'fill':
+        return image.resize((width, height), Image.LANCZOS)
+    if mode == 'cover':
+        return ImageOps.fit(image, (width, height), Image.LANCZOS)
+    ratio = min(width / image.width, height / image.height)
+    size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def _paste(canvas, image, box, mode):
+    left, top, width, height = box
+    if width <= 0 or height <= 0:
+        return
+    fitted = _fit(image, width, height, mode)
+    canvas.paste(fitted, (left + (width - fitted.width) // 2, top + (height - fitted.height) // 2), fitted)
+
+
+def _draw_placeholder(canvas, box):
+    from PIL import ImageDraw
+    left, top, width, height = box
+    draw = ImageDraw.Draw(canvas)
+    draw.rectangle((left, top, left + width, top + height), fill=PLACEHOLDER_COLOR)
+    size = min(width, height) // 4
+    cx, cy = left + width // 2, top + height // 2
+    draw.polygon([(cx - size // 2, cy - size // 2), (cx - size // 2, cy + size // 2), (cx + size // 2, cy)], fill=(255, 255, 255, 255))
+
+
+def _wrap(draw, text, font, width):
+    # white-space: pre-wrap + word-break: break-word
+    lines = []
+    for paragraph in text.split('\n'):
+        line = ''
+        for word in paragraph.split(' '):
+            candidate = f"{line} {word}" if line else word
+            if draw.textlength(candidate, font=font) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            line = ''
+            for char in word:
+                if line and draw.textlength(line + char, font=font) > width:
+                    lines.append(line)
+                    line = ''
+                line += char
+        lines.append(line)
+    return lines
+
+
+def _draw_text(canvas, box, text, font_size, scale, font_path):
+    from PIL import Image, ImageDraw
+    left, top, width, height = box
+    if width <= 0 or height <= 0 or not text:
+        return
+    font = _font(font_path, max(1, round(font_size * scale)))
+    padding = round(TEXT_PADDING * scale)
+    line_height = font_size * scale * LINE_HEIGHT
+    # Отдельный слой размером с блок обрезает текст по его границам (overflow: hidden)
+    layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    y = padding
+    for line in _wrap(draw, text, font, width - 2 * padding):
+        if y >= height:
+            break
+        draw.text((padding, y), line, font=font, fill=TEXT_COLOR)
+        y += line_height
+    canvas.paste(layer, (left, top), layer)
+
+
+def _hex_color(value):
+    value = (value or '#FFFFFF').lstrip('#')
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4)) + (255,)
+    except ValueError:
+        return (255, 255, 255, 255)
+
+
+def render_slide(slide, scale, settings):
+    from PIL import Image
+    size = (round(SLIDE_WIDTH * scale), round(SLIDE_HEIGHT * scale))
+    canvas = Image.new('RGBA', size, _hex_color(slide.get('background_color')))
+    background = _resolve_image(slide.get('background_image'), scale, settings)
+    if background is not None:
+        _paste(canvas, background, (0, 0, *size), 'cover')
+
+    for element in slide['elements']:
+        box = tuple(round(element[name] * scale) for name in ('pos_x', 'pos_y', 'width', 'height'))
+        element_type = element['element_type']
+        content = element.get('content')
+        if element_type == 'TEXT':
+            _draw_text(canvas, box, content, element.get('font_size') or 24, scale, settings['font_path'])
+            continue
+        image, mode = None, 'contain'
+        if element_type == 'IMAGE':
+            image = _resolve_image(content, scale, settings)
+        elif element_type == 'YOUTUBE_VIDEO' and content:
+            image, mode = _load_image(f"https://img.youtube.com/vi/{content}/0.jpg", scale, settings), 'cover'
+        elif element_type in ('UPLOADED_VIDEO', 'AUDIO') and content:
+            media_path = _local_path(content, settings)
+            poster = export_poster_path(media_path, element_type) if media_path else None
+            image = _load_image(poster, scale, settings) if poster else None
+            mode = 'cover' if element_type == 'UPLOADED_VIDEO' else 'fill'
+        if image is not None:
+            _paste(canvas, image, box, mode)
+        elif element_type != 'IMAGE':
+            _draw_placeholder(canvas, box)
+    return canvas.convert('RGB')
+
+
+def render_slide_png(slide, scale, settings):
+    buffer = io.BytesIO()
+    render_slide(slide, scale, settings).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def clamp_scale(value, default=1.0):
+    try:
+        scale = float(value) if value is not None else default
+    except (TypeError, ValueError):
+        scale = default
+    return min(MAX_SCALE, max(MIN_SCALE, scale))
+
+
+class SlideRenderer:
+    """Растеризация слайдов в PNG; слайды презентации рендерятся параллельно в пуле процессов."""
+
+    def __init__(self, workers=2, timeout=300):
+        self.workers = workers
+        self.timeout = timeout
+        self.default_scale = 1.0
+        self.font_path = None
+        self.image_cache_size = IMAGE_CACHE_SIZE
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.workers = app.config.get('SLIDE_RENDER_WORKERS', self.workers)
+        self.timeout = app.config.get('SLIDE_RENDER_TIMEOUT', self.timeout)
+        self.default_scale = app.config.get('SLIDE_RENDER_SCALE', self.default_scale)
+        self.font_path = app.config.get('SLIDE_RENDER_FONT') or default_font_path()
+        self.image_cache_size = app.config.get('SLIDE_RENDER_IMAGE_CACHE_SIZE', self.image_cache_size)
+        app.extensions['slide_renderer'] = self
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+            return self._pool
+
+    def _settings(self):
+        return {
+            'upload_folder': current_app.config['UPLOAD_FOLDER'],
+            'static_folder': current_app.static_folder,
+            'font_path': self.font_path,
+            'image_cache_size': self.image_cache_size,
+        }
+
+    def scale(self, value):
+        return clamp_scale(value, self.default_scale)
+
+    def render_png(self, slides, scale):
+        require('imaging')
+        settings = self._settings()
+        if self.workers <= 1 or len(slides) < 2:
+            return [render_slide_png(slide, scale, settings) for slide in slides]
+        chunksize = max(1, len(slides) // (self.workers * 4))
+        return list(self._get_pool().map(
+            render_slide_png, slides, repeat(scale), repeat(settings), timeout=self.timeout, chunksize=chunksize
+        ))
+
+
+def pngs_to_zip(pngs):
+    buffer = io.BytesIO()
+    # PNG уже сжат, поэтому архив без компрессии
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for number, png in enumerate(pngs, start=1):
+            archive.writestr(f"slide-{number:03d}.png", png)
+    buffer.seek(0)
+    return buffer
+
+
+def pngs_to_pdf(pngs, scale):
+    from PIL import Image
+    pages = [Image.open(io.BytesIO(png)).convert('RGB') for png in pngs]
+    buffer = io.BytesIO()
+    # Та же геометрия страницы, что и в PPTX: 16x9 дюймов
+    pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:], resolution=PIXELS_PER_INCH * scale)
+    buffer.seek(0)
+    return buffer
+
+
+slide_renderer = SlideRenderer()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import time
+import hashlib
+import threading
+from flask import current_app, request
+
+
+class _CatalogEntry:
+    __slots__ = ('version', 'body', 'etag', 'built_at')
+
+    def __init__(self, version, body, etag, built_at):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.built_at = built_at
+
+
+class TemplateCatalog:
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries = {}
+
+    def init_app(self, app):
+        self.ttl = app.config.get('TEMPLATE_CATALOG_TTL', self.ttl)
+        app.extensions['template_catalog'] = self
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def _is_fresh(self, entry):
+        return (
+            entry is not None
+            and entry.version == self._version
+            and time.monotonic() - entry.built_at < self.ttl
+        )
+
+    def get(self, variant, builder):
+        entry = self._entries.get(variant)
+        if self._is_fresh(entry):
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(variant)
+            if self._is_fresh(entry):
+                return entry
+            version = self._version
+            body = current_app.json.dumps(builder()).encode('utf-8')
+            # ETag считается от содержимого, поэтому совпадает во всех воркерах
+            etag = hashlib.sha1(body).hexdigest()
+            entry = _CatalogEntry(version, body, etag, time.monotonic())
+            self._entries[variant] = entry
+            return entry
+
+    def response(self, variant, builder):
+        entry = self.get(variant, builder)
+        if request.if_none_match.contains_weak(entry.etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(entry.body, mimetype='application/json')
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['X-Catalog-Version'] = str(entry.version)
+        return response
+
+
+template_catalog = TemplateCatalog()
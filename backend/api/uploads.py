@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from flask import current_app, url_for
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+from .extensions import db
+from .models import MediaJob
+from .media_jobs import PENDING_STATUSES, probe_media, can_stream_copy, submit_transcode, submit_previews, submit_image_variants
+from .image_variants import manifest_path
+from .template_catalog import template_catalog
+from .blob_store import save_stream_hashed, hash_file, blob_name, commit_blob
+from .capabilities import is_available, BackendUnavailable
+from .pptx_import import import_pptx
+
+UPLOAD_KINDS = ('image', 'video', 'audio', 'template_preview', 'pptx')
+INCOMING_DIR = '.incoming'
+SESSIONS_DIR = '.chunked'
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _upload_folder(*parts):
+    folder = os.path.join(current_app.config['UPLOAD_FOLDER'], *parts)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def _static_url(relative_path):
+    return url_for('media', filename=relative_path, _external=False)
+
+
+def incoming_path(extension=''):
+    return os.path.join(_upload_folder(INCOMING_DIR), f"{uuid.uuid4()}{extension}")
+
+
+def save_file_storage(file):
+    _root, extension = os.path.splitext(file.filename)
+    temp_path = incoming_path(extension)
+    digest = save_stream_hashed(file.stream, temp_path)
+    return temp_path, extension, digest
+
+
+def store_image(source_path, extension, digest):
+    filename, created = commit_blob(source_path, digest, extension)
+    image_path = os.path.join(_upload_folder(), filename)
+    # Повторно загруженный файл без манифеста: прошлая генерация вариантов не удалась
+    if created or not os.path.exists(manifest_path(image_path)):
+        submit_image_variants(current_app._get_current_object(), image_path)
+    return {'url': _static_url(filename)}, 200
+
+
+def store_video(source_path, digest, user_id):
+    # Имя итогового файла считается от исходника: повторная загрузка того же видео не перекодируется
+    final_filename = blob_name(digest, '.mp4')
+    final_path = os.path.join(_upload_folder(), final_filename)
+    file_url = _static_url(final_filename)
+
+    pending_job = MediaJob.query.filter(
+        MediaJob.result_url == file_url, MediaJob.status.in_(PENDING_STATUSES)
+    ).first()
+    if pending_job:
+        os.remove(source_path)
+        return {'url': file_url, 'job_id': pending_job.id, 'status': 'processing'}, 202
+    if os.path.exists(final_path):
+        os.remove(source_path)
+        return {'url': file_url, 'status': 'ready'}, 200
+
+    if not is_available('media'):
+        os.remove(source_path)
+        raise BackendUnavailable('media')
+
+    probe = probe_media(source_path)
+    if not probe:
+        os.remove(source_path)
+        return {'message': 'Не удалось обработать видеофайл'}, 400
+
+    job = submit_transcode(
+        current_app._get_current_object(), source_path, final_path, file_url,
+        stream_copy=can_stream_copy(probe), user_id=user_id
+    )
+    return {'url': file_url, 'job_id': job.id, 'status': 'processing'}, 202
+
+
+def store_audio(source_path, extension, digest):
+    filename, created = commit_blob(source_path, digest, extension)
+    if created:
+        submit_previews(current_app._get_current_object(), os.path.join(_upload_folder(), filename), 'AUDIO')
+    return {'url': _static_url(filename)}, 200
+
+
+def store_template_preview(source_path, extension, digest, template):
+    filename, _created = commit_blob(source_path, digest, extension, 'template_previews')
+    file_url = _static_url(f'template_previews/{filename}')
+    template.preview_image = file_url
+    db.session.commit()
+    template_catalog.invalidate()
+    return {'url': file_url}, 200
+
+
+def store_upload(kind, source_path, extension, digest, user_id, template=None, filename=None):
+    if kind == 'image':
+        return store_image(source_path, extension, digest)
+    if kind == 'video':
+        return store_video(source_path, digest, user_id)
+    if kind == 'audio':
+        return store_audio(source_path, extension, digest)
+    if kind == 'template_preview':
+        return store_template_preview(source_path, extension, digest, template)
+    if kind == 'pptx':
+        return import_pptx(source_path, os.path.splitext(filename or '')[0], user_id)
+    raise ValueError(f"Unknown upload kind: {kind}")
+
+
+class UploadSessionError(Exception):
+    def __init__(self, message, status_code=400, payload=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.payload = payload or {}
+
+
+def _session_paths(upload_id):
+    folder = _upload_folder(SESSIONS_DIR)
+    return os.path.join(folder, f"{upload_id}.json"), os.path.join(folder, f"{upload_id}.part")
+
+
+def create_upload_session(user_id, kind, filename, size, sha256, template_id=None):
+    _root, extension = os.path.splitext(filename)
+    upload_id = str(uuid.uuid4())
+    meta_path, part_path = _session_paths(upload_id)
+    meta = {
+        'id': upload_id,
+        'user_id': user_id,
+        'kind': kind,
+        'filename': filename,
+        'extension': extension,
+        'size': size,
+        'sha256': sha256.lower(),
+        'template_id': template_id,
+        'created_at': time.time(),
+    }
+    open(part_path, 'wb').close()
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def load_upload_session(upload_id, user_id):
+    try:
+        uuid.UUID(upload_id)
+    except ValueError:
+        raise UploadSessionError('Сессия загрузки не найдена', 404)
+    meta_path, part_path = _session_paths(upload_id)
+    if not os.path.exists(meta_path) or not os.path.exists(part_path):
+        raise UploadSessionError('Сессия загрузки не найдена', 404)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['user_id'] != user_id:
+        raise UploadSessionError('Доступ запрещен', 403)
+    meta['received'] = os.path.getsize(part_path)
+    return meta
+
+
+# Без fcntl (Windows) дозапись сериализуется только внутри процесса
+_append_lock = threading.Lock()
+
+
+@contextmanager
+def _exclusive(f):
+    if fcntl is None:
+        with _append_lock:
+            yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def append_upload_chunk(meta, offset, stream, max_chunk_size):
+    _meta_path, part_path = _session_paths(meta['id'])
+    with open(part_path, 'ab') as f, _exclusive(f):
+        # Повторный или параллельный PUT с тем же смещением проверяется под блокировкой по фактическому размеру
+        received = os.fstat(f.fileno()).st_size
+        if offset != received:
+            raise UploadSessionError('Неверное смещение фрагмента', 409, {'received': received})
+
+        written = 0
+        while True:
+            block = stream.read(COPY_BUFFER_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > max_chunk_size or received + written > meta['size']:
+                f.truncate(received)
+                raise UploadSessionError('Фрагмент превышает допустимый размер', 413, {'received': received})
+            f.write(block)
+    return received + written
+
+
+def finalize_upload_session(meta):
+    meta_path, part_path = _session_paths(meta['id'])
+    if meta['received'] != meta['size']:
+        raise UploadSessionError('Файл загружен не полностью', 409, {'received': meta['received']})
+
+    if hash_file(part_path) != meta['sha256']:
+        discard_upload_session(meta['id'])
+        raise UploadSessionError('Контрольная сумма файла не совпадает', 422)
+
+    source_path = incoming_path(meta['extension'])
+    os.replace(part_path, source_path)
+    os.remove(meta_path)
+    return source_path, meta['sha256']
+
+
+def discard_upload_session(upload_id):
+    for path in _session_paths(upload_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def gc_upload_sessions(max_age):
+    folder = _upload_folder(SESSIONS_DIR)
+    cutoff = time.time() - max_age
+    last_activity = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            upload_id, extension = os.path.splitext(entry.name)
+            if extension not in ('.json', '.part'):
+                continue
+            mtime = entry.stat().st_mtime
+            last_activity[upload_id] = max(mtime, last_activity.get(upload_id, 0))
+
+    removed = 0
+    for upload_id, mtime in last_activity.items():
+        if mtime < cutoff:
+            discard_upload_session(upload_id)
+            removed += 1
+    return removed
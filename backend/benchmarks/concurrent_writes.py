@@ -0,0 +1,118 @@
+"""Сравнение конкурентной записи в SQLite с профилем БД и без него.
+
+Запуск из папки backend:
+
+    python benchmarks/concurrent_writes.py --threads 8 --writes 200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from api import create_app
+from api.config import Config
+from api.extensions import db
+from api.models import User, Presentation, Slide, SlideElement
+
+
+def make_config(database_path, tuned):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+        SQLITE_TUNING = tuned
+        TESTING = True
+
+    if not tuned:
+        BenchmarkConfig.SQLALCHEMY_ENGINE_OPTIONS = {}
+    return BenchmarkConfig
+
+
+def seed(threads):
+    user = User(email='bench@example.com', password_hash='x' * 60)
+    presentation = Presentation(title='Benchmark', owner=user)
+    slide = Slide(slide_number=1, presentation=presentation)
+    elements = [SlideElement(element_type='TEXT', content='bench', slide=slide) for _ in range(threads)]
+    db.session.add_all([user, presentation, slide, *elements])
+    db.session.commit()
+    return [e.id for e in elements]
+
+
+def run(tuned, threads, writes):
+    workdir = tempfile.mkdtemp(prefix='bench-writes-')
+    app = create_app(make_config(os.path.join(workdir, 'bench.db'), tuned))
+    with app.app_context():
+        db.create_all()
+        element_ids = seed(threads)
+
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(element_id):
+        local_errors = 0
+        local_latencies = []
+        with app.app_context():
+            barrier.wait()
+            for i in range(writes):
+                started = time.perf_counter()
+                try:
+                    element = db.session.get(SlideElement, element_id)
+                    element.pos_x = i
+                    element.content = f"bench {i}"
+                    db.session.commit()
+                    local_latencies.append(time.perf_counter() - started)
+                except OperationalError:
+                    db.session.rollback()
+                    local_errors += 1
+        with lock:
+            errors.append(local_errors)
+            latencies.extend(local_latencies)
+
+    pool = [threading.Thread(target=worker, args=(element_id,)) for element_id in element_ids]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    with app.app_context():
+        db.engine.dispose()
+    return {
+        'profile': 'tuned' if tuned else 'default',
+        'threads': threads,
+        'writes': len(latencies),
+        'errors': sum(errors),
+        'seconds': round(elapsed, 3),
+        'writes_per_sec': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='Вывести результаты в JSON')
+    args = parser.parse_args()
+
+    results = [run(False, args.threads, args.writes), run(True, args.threads, args.writes)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for r in results:
+        print(f"{r['profile']:>8}: {r['writes_per_sec']:>8} writes/s, errors={r['errors']}, "
+              f"p50={r['p50_ms']}ms p99={r['p99_ms']}ms ({r['writes']} writes in {r['seconds']}s)")
+
+
+if __name__ == '__main__':
+    main()
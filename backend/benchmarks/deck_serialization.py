@@ -0,0 +1,116 @@
+"""Сериализация большой презентации: ORM-объекты + json против проекций колонок + orjson.
+
+Запуск из папки backend:
+
+    python benchmarks/deck_serialization.py --slides 200 --elements 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+from api import create_app
+from api.config import Config
+from api.extensions import db
+from api.models import User, Presentation, Slide, SlideElement
+from api.serializers import serialize_deck_slides
+from api.json_provider import OrjsonProvider, orjson
+
+
+def make_config(workdir):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        UPLOAD_FOLDER = workdir
+        TESTING = True
+    return BenchmarkConfig
+
+
+def seed(slides, elements):
+    user = User(email='bench@example.com', password_hash='x' * 60)
+    presentation = Presentation(title='Benchmark', owner=user)
+    db.session.add_all([user, presentation])
+    db.session.flush()
+    for number in range(1, slides + 1):
+        slide = Slide(slide_number=number, presentation_id=presentation.id)
+        db.session.add(slide)
+        db.session.flush()
+        db.session.add_all([
+            SlideElement(element_type='TEXT', content=f'Текст элемента {i} на слайде {number}', slide_id=slide.id)
+            for i in range(elements)
+        ])
+    db.session.commit()
+    return presentation.id
+
+
+def legacy_payload(presentation_id):
+    # Так ответ собирался раньше: гидрация ORM-объектов и словари вручную
+    output = []
+    for slide in Slide.query.filter_by(presentation_id=presentation_id).order_by(Slide.slide_number).all():
+        output.append({
+            'id': slide.id,
+            'slide_number': slide.slide_number,
+            'background_color': slide.background_color,
+            'background_image': slide.background_image,
+            'elements': [{
+                'id': e.id, 'element_type': e.element_type, 'pos_x': e.pos_x,
+                'pos_y': e.pos_y, 'width': e.width, 'height': e.height,
+                'content': e.content, 'font_size': e.font_size, 'status': e.status
+            } for e in slide.elements]
+        })
+    return output
+
+
+def measure(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.expire_all()
+        db.session.expunge_all()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--slides', type=int, default=200)
+    parser.add_argument('--elements', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='Вывести результаты в JSON')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-serialize-')
+    app = create_app(make_config(workdir))
+    with app.app_context():
+        db.create_all()
+        presentation_id = seed(args.slides, args.elements)
+        default_json = DefaultJSONProvider(app)
+        fast_json = OrjsonProvider(app) if orjson is not None else default_json
+
+        results = {
+            'slides': args.slides,
+            'elements_per_slide': args.elements,
+            'legacy_seconds': measure(lambda: default_json.dumps(legacy_payload(presentation_id)), args.repeat),
+            'projection_seconds': measure(lambda: default_json.dumps(serialize_deck_slides(presentation_id)), args.repeat),
+            'projection_orjson_seconds': measure(lambda: fast_json.dumps(serialize_deck_slides(presentation_id)), args.repeat),
+        }
+        results['speedup'] = round(results['legacy_seconds'] / results['projection_orjson_seconds'], 2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Презентация: {args.slides} слайдов x {args.elements} элементов")
+    print(f"  ORM + json:            {results['legacy_seconds'] * 1000:8.1f} ms")
+    print(f"  проекции + json:       {results['projection_seconds'] * 1000:8.1f} ms")
+    print(f"  проекции + orjson:     {results['projection_orjson_seconds'] * 1000:8.1f} ms")
+    print(f"  ускорение:             x{results['speedup']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Пропускная способность /api/login: bcrypt в потоке запроса против пула процессов.
+
+Запуск из папки backend:
+
+    python benchmarks/login_throughput.py --clients 16 --logins 8 --rounds 12
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import create_app
+from api.config import Config
+from api.extensions import db
+from api.models import User
+from api.passwords import password_hasher
+
+PASSWORD = 'benchmark-password'
+
+
+def make_config(workdir, workers, rounds):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        BCRYPT_LOG_ROUNDS = rounds
+        PASSWORD_HASH_WORKERS = workers
+        TESTING = True
+    return BenchmarkConfig
+
+
+def run(workers, clients, logins, rounds):
+    workdir = tempfile.mkdtemp(prefix='bench-login-')
+    app = create_app(make_config(workdir, workers, rounds))
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(email=f"user{i}@example.com", password_hash=password_hasher.hash_password(PASSWORD))
+            for i in range(clients)
+        ])
+        db.session.commit()
+
+    barrier = threading.Barrier(clients + 1)
+    statuses = []
+    lock = threading.Lock()
+
+    def client_worker(index):
+        client = app.test_client()
+        local = []
+        barrier.wait()
+        for _ in range(logins):
+            response = client.post('/api/login', json={'email': f"user{index}@example.com", 'password': PASSWORD})
+            local.append(response.status_code)
+        with lock:
+            statuses.extend(local)
+
+    threads = [threading.Thread(target=client_worker, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ok = statuses.count(200)
+    return {
+        'mode': f"pool x{workers}" if workers else 'inline',
+        'cpu_count': os.cpu_count(),
+        'rounds': rounds,
+        'logins': len(statuses),
+        'ok': ok,
+        'seconds': round(elapsed, 3),
+        'logins_per_sec': round(ok / elapsed, 1) if elapsed else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--json', action='store_true', help='Вывести результаты в JSON')
+    args = parser.parse_args()
+
+    results = [
+        run(0, args.clients, args.logins, args.rounds),
+        run(args.workers, args.clients, args.logins, args.rounds),
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for r in results:
+        print(f"{r['mode']:>10}: {r['logins_per_sec']:>7} logins/s ({r['ok']}/{r['logins']} ok in {r['seconds']}s, "
+              f"cost={r['rounds']}, cpus={r['cpu_count']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Время запуска приложения и CLI по данным `python -X importtime`.
+
+Запуск из папки backend:
+
+    python benchmarks/startup_time.py --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import api': [sys.executable, '-c', 'import api'],
+    'create_app()': [sys.executable, '-c', 'from api import create_app; create_app()'],
+    'flask make-admin --help': [sys.executable, '-m', 'flask', '--app', 'run', 'make-admin', '--help'],
+}
+HEAVY_MODULES = ('pptx', 'PIL', 'numpy', 'ffmpeg', 'gigachat', 'httpx', 'requests', 'win32com', 'pythoncom')
+
+
+def parse_importtime(stderr):
+    """Возвращает (суммарное время импорта в мкс, {пакет: мкс} для всех загруженных пакетов)."""
+    total = 0
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Модули верхнего уровня в выводе importtime идут без отступа
+        if not name.startswith('  '):
+            total += int(cumulative)
+        name = name.strip()
+        if '.' not in name:
+            packages[name] = max(packages.get(name, 0), int(cumulative))
+    return total, packages
+
+
+def run_scenario(command, repeat):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    wall_times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, check=True)
+        wall_times.append(time.perf_counter() - started)
+
+    traced = subprocess.run(
+        [command[0], '-X', 'importtime', *command[1:]],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    import_total, packages = parse_importtime(traced.stderr)
+    third_party = {name: us for name, us in packages.items() if name not in ('api', 'run', 'site', 'encodings')}
+    heaviest = sorted(third_party.items(), key=lambda item: item[1], reverse=True)[:8]
+    return {
+        'wall_seconds': round(statistics.median(wall_times), 3),
+        'import_seconds': round(import_total / 1e6, 3),
+        'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in packages],
+        'heaviest_imports': [{'module': name, 'seconds': round(us / 1e6, 3)} for name, us in heaviest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='Вывести результаты в JSON')
+    args = parser.parse_args()
+
+    results = {name: run_scenario(command, args.repeat) for name, command in SCENARIOS.items()}
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    for name, result in results.items():
+        print(f"{name}: {result['wall_seconds'] * 1000:.0f} ms (импорт {result['import_seconds'] * 1000:.0f} ms)")
+        print(f"    тяжелые модули: {', '.join(result['heavy_modules_loaded']) or 'нет'}")
+        for item in result['heaviest_imports'][:5]:
+            print(f"    {item['module']:<28} {item['seconds'] * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""Локальные заглушки внешних сервисов для бенчмарков: хостинг картинок, FusionBrain, Telegram и GigaChat.
+
+Все сервисы обслуживает один HTTP-сервер на 127.0.0.1 со случайным портом:
+
+    with StubServers(latency_ms=20) as stubs:
+        config = make_config(workdir, stubs)
+
+Ответы повторяют формат настоящих API ровно настолько, насколько его разбирает api/routes/ai_generator.py.
+"""
+import io
+import re
+import json
+import time
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+STUB_SLIDE_COUNT = 5
+STUB_IMAGE_SIZE = (1280, 720)
+
+
+def make_image(size=STUB_IMAGE_SIZE, color=(52, 101, 164), image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def stub_deck_text(slides=STUB_SLIDE_COUNT):
+    # Тот же формат, который ожидает parse_slides_from_text
+    return '\n'.join(
+        f"Слайд {number}\n"
+        f"Название слайда: Раздел {number}\n"
+        f"Текст слайда: Синтетический текст слайда {number} для замера генерации.\n"
+        f"Картинка слайда: яркая иллюстрация номер {number}"
+        for number in range(1, slides + 1)
+    )
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, body, content_type='application/json', status=200):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method):
+        stubs = self.server.stubs
+        body = self._read_body() if method == 'POST' else b''
+        stubs.record(self.path)
+        if stubs.latency:
+            time.sleep(stubs.latency)
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.fullmatch(self.path.split('?', 1)[0])
+            if route_method == method and match:
+                return handler(self, stubs, body, *match.groups())
+        self._send({'message': 'not found'}, status=404)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+
+def _image(handler, stubs, body, name):
+    handler._send(stubs.jpeg if name.endswith('.jpg') else stubs.png, 'image/jpeg' if name.endswith('.jpg') else 'image/png')
+
+
+def _fusionbrain_pipelines(handler, stubs, body):
+    handler._send([{'id': 'stub-pipeline', 'name': 'Kandinsky', 'status': 'ACTIVE'}])
+
+
+def _fusionbrain_run(handler, stubs, body):
+    handler._send({'uuid': 'stub-task', 'status': 'INITIAL'}, status=201)
+
+
+def _fusionbrain_status(handler, stubs, body, task_id):
+    handler._send({'uuid': task_id, 'status': 'DONE', 'result': {'files': [stubs.jpeg_base64]}})
+
+
+def _telegram_send_photo(handler, stubs, body, token):
+    handler._send({'ok': True, 'result': {'photo': [{'file_id': 'stub-file'}]}})
+
+
+def _telegram_get_file(handler, stubs, body, token):
+    handler._send({'ok': True, 'result': {'file_id': 'stub-file', 'file_path': 'photos/stub.jpg'}})
+
+
+def _gigachat_oauth(handler, stubs, body):
+    handler._send({'access_token': 'stub-token', 'expires_at': int((time.time() + 3600) * 1000)})
+
+
+def _gigachat_chat(handler, stubs, body):
+    handler._send({
+        'choices': [{
+            'message': {'role': 'assistant', 'content': stubs.chat_reply},
+            'index': 0,
+            'finish_reason': 'stop',
+        }],
+        'created': int(time.time()),
+        'model': 'GigaChat',
+        'object': 'chat.completion',
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 200, 'total_tokens': 300},
+    })
+
+
+ROUTES = (
+    ('GET', re.compile(r'/images/([\w.-]+)'), _image),
+    ('GET', re.compile(r'/fusionbrain/key/api/v1/pipelines'), _fusionbrain_pipelines),
+    ('POST', re.compile(r'/fusionbrain/key/api/v1/pipeline/run'), _fusionbrain_run),
+    ('GET', re.compile(r'/fusionbrain/key/api/v1/pipeline/status/([\w-]+)'), _fusionbrain_status),
+    ('POST', re.compile(r'/telegram/bot([^/]+)/sendPhoto'), _telegram_send_photo),
+    ('POST', re.compile(r'/telegram/bot([^/]+)/getFile'), _telegram_get_file),
+    ('GET', re.compile(r'/telegram/file/bot[^/]+/([\w./-]+)'), _image),
+    ('POST', re.compile(r'/gigachat/oauth'), _gigachat_oauth),
+    ('POST', re.compile(r'/gigachat/api/v1/chat/completions'), _gigachat_chat),
+)
+
+
+class StubServers:
+    def __init__(self, latency_ms=0, chat_reply=None):
+        self.latency = latency_ms / 1000.0
+        self.chat_reply = chat_reply or stub_deck_text()
+        self.png = make_image()
+        self.jpeg = make_image(image_format='JPEG')
+        self.jpeg_base64 = base64.b64encode(self.jpeg).decode('ascii')
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def record(self, path):
+        service = path.strip('/').split('/', 1)[0]
+        with self._lock:
+            self.requests[service] = self.requests.get(service, 0) + 1
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def image_url(self, name):
+        return f"{self.base_url}/images/{name}"
+
+    def config_overrides(self):
+        return {
+            'FUSIONBRAIN_API_URL': f"{self.base_url}/fusionbrain/",
+            'FUSIONBRAIN_POLL_INTERVAL': 0,
+            'KANDINSKY_API_KEY': 'stub-key',
+            'KANDINSKY_SECRET_KEY': 'stub-secret',
+            'TELEGRAM_API_URL': f"{self.base_url}/telegram",
+            'TELEGRAM_BOT_TOKEN': 'stub-bot',
+            'TELEGRAM_CHAT_ID': 'stub-chat',
+            'GIGACHAT_BASE_URL': f"{self.base_url}/gigachat/api/v1",
+            'GIGACHAT_AUTH_URL': f"{self.base_url}/gigachat/oauth",
+            'GIGACHAT_CREDENTIALS': base64.b64encode(b'stub:stub').decode('ascii'),
+        }
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stubs = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='benchmark-stubs', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,301 @@
+"""Набор бенчмарков горячих путей бэкенда на синтетических данных.
+
+Поднимает приложение через create_app с отдельной sqlite-базой, генерирует пользователей,
+презентации и медиа (synthetic.py), а внешние сервисы (картинки, FusionBrain, Telegram, GigaChat)
+подменяет локальными заглушками (stub_servers.py). Результаты пишутся в JSON вместе с коммитом,
+чтобы сравнивать прогоны между коммитами.
+
+Запуск из папки backend:
+
+    python benchmarks/suite.py --output results/base.json
+    python benchmarks/suite.py --output results/new.json --compare results/base.json
+    python benchmarks/suite.py --only pptx_export --slides 100 --stub-latency 20
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3
+from sqlalchemy import event
+from api import create_app
+from api.extensions import db
+from api.routes.presentations import _create_pptx_from_data
+from stub_servers import StubServers
+from synthetic import SyntheticData, make_config, auth_headers
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def decorator(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return decorator
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+class BenchmarkContext:
+    def __init__(self, app, args, stubs):
+        self.app = app
+        self.args = args
+        self.stubs = stubs
+        self.client = app.test_client()
+
+    def call(self, method, url, expected=200, **kwargs):
+        response = self.client.open(url, method=method, headers=self.headers, **kwargs)
+        if response.status_code != expected:
+            raise BenchmarkError(f"{method} {url}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+        return response
+
+    def seed(self):
+        args = self.args
+        data = SyntheticData(self.app.config['UPLOAD_FOLDER'], self.stubs)
+        data.generate_media()
+        data.generate_users(args.users)
+        owner = data.generate_users(1)[0]
+        self.deck_id = data.generate_deck(owner.id, args.slides, args.elements, title='Большая презентация')
+        data.generate_decks(owner.id, args.decks - 1, args.listing_slides, args.elements)
+        self.template_id = data.generate_deck(owner.id, args.slides, args.elements, title='Шаблон', is_template=True)
+        self.headers = auth_headers(owner)
+        db.session.commit()
+        self.element_ids = self.call('GET', f'/api/presentations/{self.deck_id}').get_json()['slides'][0]['elements']
+
+
+@scenario('get_presentation_by_id')
+def get_presentation_by_id(ctx):
+    return lambda: ctx.call('GET', f'/api/presentations/{ctx.deck_id}'), None
+
+
+@scenario('get_presentations')
+def get_presentations(ctx):
+    return lambda: ctx.call('GET', '/api/presentations'), None
+
+
+@scenario('bulk_element_updates')
+def bulk_element_updates(ctx):
+    # Так редактор сохраняет перетаскивание группы: по PUT на каждый элемент слайда
+    def run():
+        for offset, element in enumerate(ctx.element_ids):
+            ctx.call('PUT', f"/api/elements/{element['id']}", json={
+                'pos_x': element['pos_x'] + offset % 2, 'pos_y': element['pos_y'], 'width': element['width']
+            })
+    return run, None
+
+
+@scenario('template_clone')
+def template_clone(ctx):
+    def run():
+        return ctx.call('POST', '/api/presentations/from-template', expected=201, json={'template_id': ctx.template_id})
+
+    def cleanup(response):
+        ctx.call('DELETE', f"/api/presentations/{response.get_json()['id']}")
+    return run, cleanup
+
+
+@scenario('pptx_export')
+def pptx_export(ctx):
+    def run():
+        with ctx.app.test_request_context():
+            prs, _title = _create_pptx_from_data(ctx.deck_id)
+            prs.save(BytesIO())
+    return run, None
+
+
+@scenario('bulk_export')
+def bulk_export(ctx):
+    # Архив всех презентаций владельца; ответ потоковый, поэтому читаем его целиком
+    return lambda: ctx.call('GET', '/api/presentations/export/zip').get_data(), None
+
+
+@scenario('ai_process_text')
+def ai_process_text(ctx):
+    return lambda: ctx.call('POST', '/api/ai/process-text', json={
+        'text': 'Синтетический текст слайда для обработки.', 'command': 'сократи'
+    }), None
+
+
+@scenario('ai_generate_presentation')
+def ai_generate_presentation(ctx):
+    def run():
+        return ctx.call('POST', '/api/presentations/generate-ai', expected=201, json={'prompt': 'Синтетическая тема'})
+
+    def cleanup(response):
+        ctx.call('DELETE', f"/api/presentations/{response.get_json()['id']}")
+    return run, cleanup
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(ctx, counter, name, repeat, warmup):
+    run, cleanup = SCENARIOS[name](ctx)
+    for _ in range(warmup):
+        result = run()
+        if cleanup:
+            cleanup(result)
+
+    samples = []
+    queries = []
+    for _ in range(repeat):
+        counter.count = 0
+        started = time.perf_counter()
+        result = run()
+        samples.append(time.perf_counter() - started)
+        queries.append(counter.count)
+        if cleanup:
+            cleanup(result)
+
+    return {
+        'runs': repeat,
+        'min_ms': round(min(samples) * 1000, 3),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p95_ms': round(_percentile(samples, 0.95) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+        'db_queries': int(statistics.median(queries)),
+    }
+
+
+def git_revision():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=backend_dir, capture_output=True, text=True
+        ).stdout.strip()
+        return {'commit': commit, 'dirty': bool(dirty)}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def run_suite(args):
+    workdir = tempfile.mkdtemp(prefix='bench-suite-')
+    try:
+        with StubServers(latency_ms=args.stub_latency) as stubs:
+            app = create_app(make_config(workdir, stubs))
+            with app.app_context():
+                db.create_all()
+                counter = QueryCounter(db.engine)
+                ctx = BenchmarkContext(app, args, stubs)
+                ctx.seed()
+                results = {}
+                for name in args.only or SCENARIOS:
+                    print(f"  {name}...")
+                    results[name] = measure(ctx, counter, name, args.repeat, args.warmup)
+                    db.session.remove()
+            stub_requests = dict(stubs.requests)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'meta': {
+            **git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sqlite': sqlite3.sqlite_version,
+            'params': {
+                name: getattr(args, name)
+                for name in ('users', 'decks', 'slides', 'listing_slides', 'elements', 'repeat', 'warmup', 'stub_latency')
+            },
+            'stub_requests': stub_requests,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Печатает сравнение медиан и возвращает список регрессировавших сценариев."""
+    if current['meta']['params'] != baseline['meta']['params']:
+        print("Внимание: параметры прогонов различаются, сравнение может быть некорректным")
+    print(f"Сравнение с {baseline['meta'].get('commit') or 'baseline'}:")
+    regressions = []
+    for name, result in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            print(f"  {name:28} новый сценарий")
+            continue
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        status = ''
+        if ratio > threshold:
+            status = 'РЕГРЕССИЯ'
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            status = 'ускорение'
+        queries = '' if result['db_queries'] == base['db_queries'] else f" SQL {base['db_queries']} -> {result['db_queries']}"
+        print(f"  {name:28} {base['median_ms']:9.1f} -> {result['median_ms']:9.1f} ms  x{ratio:.2f} {status}{queries}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50, help='Дополнительные пользователи в базе')
+    parser.add_argument('--decks', type=int, default=50, help='Презентаций у пользователя бенчмарка')
+    parser.add_argument('--slides', type=int, default=50, help='Слайдов в большой презентации и шаблоне')
+    parser.add_argument('--listing-slides', type=int, default=5, help='Слайдов в остальных презентациях')
+    parser.add_argument('--elements', type=int, default=20, help='Элементов на слайде')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--stub-latency', type=float, default=0, help='Задержка ответа заглушек, мс')
+    parser.add_argument('--only', action='append', choices=list(SCENARIOS), help='Запустить только указанные сценарии')
+    parser.add_argument('--output', help='Сохранить результаты в JSON-файл')
+    parser.add_argument('--compare', help='JSON-файл предыдущего прогона для сравнения')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Порог регрессии по медиане')
+    parser.add_argument('--json', action='store_true', help='Вывести результаты в JSON')
+    args = parser.parse_args()
+
+    # print() из кода приложения не должен попадать в JSON на stdout
+    with redirect_stdout(sys.stderr):
+        results = run_suite(args)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(f"Коммит {results['meta']['commit']}{' (есть изменения)' if results['meta']['dirty'] else ''}, "
+              f"{args.slides} слайдов x {args.elements} элементов, повторов: {args.repeat}")
+        for name, result in results['scenarios'].items():
+            print(f"  {name:28} median {result['median_ms']:9.1f} ms  p95 {result['p95_ms']:9.1f} ms  SQL {result['db_queries']}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Генератор синтетических данных для бенчмарков: пользователи, презентации и медиафайлы.
+
+Данные детерминированы (фиксированный seed), поэтому прогоны на разных коммитах сравнимы.
+Картинки ссылаются на локальную заглушку (stub_servers.py), аудио и видео лежат в UPLOAD_FOLDER
+вместе с постерами, так что экспорт в PPTX работает без сети. YouTube-элементы не генерируются:
+их эскизы всегда грузятся с img.youtube.com.
+"""
+import os
+import uuid
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from api.config import Config
+from api.extensions import db
+from api.models import User, Presentation, Slide, SlideElement
+from api.passwords import _hash_password
+from api.auth_tokens import start_session
+from stub_servers import make_image
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+MEDIA_FILE_SIZE = 256 * 1024
+SEED = 1337
+
+WORDS = (
+    'презентация', 'слайд', 'данные', 'рост', 'выручка', 'команда', 'продукт', 'рынок', 'план',
+    'квартал', 'клиенты', 'метрика', 'запуск', 'стратегия', 'результат', 'анализ', 'прогноз',
+)
+
+
+def make_config(workdir, stubs=None, **overrides):
+    upload_folder = os.path.join(workdir, 'uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+    attributes = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'UPLOAD_FOLDER': upload_folder,
+        'TESTING': True,
+        'STRUCTURED_LOGS': False,
+        'BCRYPT_LOG_ROUNDS': 4,
+        'TEMPLATE_CATALOG_TTL': 0,
+    }
+    if stubs is not None:
+        attributes.update(stubs.config_overrides())
+    attributes.update(overrides)
+    return type('BenchmarkConfig', (Config,), attributes)
+
+
+class SyntheticData:
+    def __init__(self, upload_folder, stubs, seed=SEED):
+        self.upload_folder = upload_folder
+        self.stubs = stubs
+        self.random = random.Random(seed)
+        self.audio_urls = []
+        self.video_urls = []
+        self._password_hash = None
+
+    def _sentence(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def generate_media(self, count=4):
+        """Аудио- и видеофайлы с готовыми постерами, как после фоновой обработки."""
+        poster = make_image((800, 200))
+        for index in range(count):
+            for kind, extension, poster_suffix, urls in (
+                ('audio', '.mp3', '.poster.png', self.audio_urls),
+                ('video', '.mp4', '.poster.jpg', self.video_urls),
+            ):
+                name = f"bench-{kind}-{index}"
+                with open(os.path.join(self.upload_folder, name + extension), 'wb') as f:
+                    f.write(self.random.randbytes(MEDIA_FILE_SIZE))
+                with open(os.path.join(self.upload_folder, name + poster_suffix), 'wb') as f:
+                    f.write(poster if kind == 'audio' else make_image((1280, 720), image_format='JPEG'))
+                urls.append(f"/static/uploads/{name}{extension}")
+
+    def generate_users(self, count, can_use_ai=True):
+        if self._password_hash is None:
+            self._password_hash = _hash_password(BENCHMARK_PASSWORD, 4)
+        users = [
+            User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", password_hash=self._password_hash, can_use_ai=can_use_ai)
+            for _ in range(count)
+        ]
+        db.session.add_all(users)
+        db.session.flush()
+        return users
+
+    def _element(self, slide_number, index):
+        kind = index % 10
+        row = {
+            'pos_x': self.random.randint(0, 1000),
+            'pos_y': self.random.randint(0, 560),
+            'width': self.random.randint(120, 600),
+            'height': self.random.randint(60, 300),
+            'font_size': 24,
+            'autoplay': False,
+            'muted': False,
+            'status': 'ready',
+        }
+        if kind == 4:
+            row.update(element_type='IMAGE', content=self.stubs.image_url(f"slide-{slide_number}-{index}.png"))
+        elif kind == 9 and self.audio_urls:
+            media = self.audio_urls if slide_number % 2 else self.video_urls
+            row.update(
+                element_type='AUDIO' if slide_number % 2 else 'UPLOADED_VIDEO',
+                content=media[slide_number % len(media)]
+            )
+        else:
+            row.update(element_type='TEXT', content=self._sentence(self.random.randint(4, 40)))
+        return row
+
+    def generate_deck(self, user_id, slides, elements, title=None, is_template=False, updated_at=None):
+        presentation_id = str(uuid.uuid4())
+        updated_at = updated_at or datetime.utcnow()
+        db.session.execute(insert(Presentation).values(
+            id=presentation_id, title=title or self._sentence(3), user_id=user_id,
+            is_template=is_template, created_at=updated_at, updated_at=updated_at
+        ))
+        slide_rows = [{
+            'slide_number': number,
+            'presentation_id': presentation_id,
+            'background_color': '#FFFFFF',
+            'background_image': self.stubs.image_url(f"background-{number}.png") if number % 4 == 0 else None,
+        } for number in range(1, slides + 1)]
+        slide_ids = db.session.scalars(
+            insert(Slide).returning(Slide.id, sort_by_parameter_order=True), slide_rows
+        ).all()
+        element_rows = [
+            {'id': str(uuid.uuid4()), 'slide_id': slide_id, **self._element(number, index)}
+            for number, slide_id in enumerate(slide_ids, start=1)
+            for index in range(elements)
+        ]
+        if element_rows:
+            db.session.execute(insert(SlideElement), element_rows)
+        return presentation_id
+
+    def generate_decks(self, user_id, count, slides, elements):
+        now = datetime.utcnow()
+        return [
+            self.generate_deck(user_id, slides, elements, updated_at=now - timedelta(minutes=index))
+            for index in range(count)
+        ]
+
+
+def auth_headers(user):
+    access_token, _refresh_token = start_session(user)
+    return {'Authorization': f'Bearer {access_token}'}
@@ -0,0 +1,41 @@
+import pytest
+from api import create_app
+from api.config import Config
+from api.extensions import db
+
+
+def make_app(tmp_path, **overrides):
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        PROFILER_DIR = str(tmp_path / 'profiles')
+        BCRYPT_LOG_ROUNDS = 4
+        PASSWORD_HASH_WORKERS = 0
+        SLIDE_RENDER_WORKERS = 1
+        BULK_EXPORT_WORKERS = 1
+        STRUCTURED_LOGS = False
+
+    for name, value in overrides.items():
+        setattr(TestConfig, name, value)
+    return create_app(TestConfig)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def login(client, email, password='secret1'):
+    client.post('/api/register', json={'email': email, 'password': password})
+    response = client.post('/api/login', json={'email': email, 'password': password})
+    return response.get_json()
+
+
+def auth_headers(client, email='user@example.com'):
+    return {'Authorization': f"Bearer {login(client, email)['token']}"}
@@ -0,0 +1,97 @@
+import re
+from flask import has_request_context, request
+from sqlalchemy import event
+from api.extensions import db
+from api.models import User
+from api.query_plans import explain_query_plans, full_table_scans
+from conftest import login
+
+READ_SQL_RE = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+# Списки для админки читают таблицу целиком намеренно
+FULL_LISTING_ENDPOINTS = {'admin.get_all_users', 'admin.get_all_prompts'}
+
+
+def _exercise_routes(app):
+    client = app.test_client()
+
+    def call(method, url, expected=200, **kwargs):
+        # Маршрут, который вернул ошибку, не выполнил свои запросы, и план их не проверит
+        response = client.open(url, method=method, **kwargs)
+        assert response.status_code == expected, (
+            f"{method} {url}: {response.status_code} {response.get_data(as_text=True)[:200]}"
+        )
+        return response
+
+    login(client, 'admin@example.com')
+    User.query.filter_by(email='admin@example.com').one().is_admin = True
+    db.session.commit()
+    admin = {'Authorization': f"Bearer {login(client, 'admin@example.com')['token']}"}
+    session = login(client, 'user@example.com')
+    headers = {'Authorization': f"Bearer {session['token']}"}
+    refresh_token = call('POST', '/api/refresh', json={'refresh_token': session['refresh_token']}).get_json()['refresh_token']
+
+    template_id = call('POST', '/api/admin/templates', 201, headers=admin).get_json()['id']
+    call('PUT', f'/api/admin/templates/{template_id}', headers=admin, json={'title': 'Шаблон'})
+    call('GET', '/api/admin/templates', headers=admin)
+    call('GET', '/api/admin/users', headers=admin)
+    call('GET', '/api/admin/prompts', headers=admin)
+    call('GET', '/api/templates', headers=headers)
+
+    presentation_id = call('POST', '/api/presentations', 201, headers=headers, json={'title': 'Отчет'}).get_json()['id']
+    call('PUT', f'/api/presentations/{presentation_id}', headers=headers, json={'title': 'Годовой отчет'})
+    slide = call('POST', f'/api/presentations/{presentation_id}/slides', 201, headers=headers).get_json()
+    call('PUT', f"/api/slides/{slide['id']}", headers=headers, json={'background_color': '#FFEEDD'})
+    slide_ids = call('PUT', f"/api/slides/{slide['id']}/position", headers=headers, json={'position': 1}).get_json()['slide_ids']
+    call('PUT', f'/api/presentations/{presentation_id}/slides/reorder', headers=headers, json={'slide_ids': slide_ids[::-1]})
+    element = call(
+        'POST', f"/api/slides/{slide['id']}/elements", 201, headers=headers, json={'element_type': 'TEXT', 'content': 'Выручка'}
+    ).get_json()
+    call(
+        'POST', f"/api/slides/{slide['id']}/elements", 201, headers=headers,
+        json={'element_type': 'IMAGE', 'content': '/static/uploads/missing.png'}
+    )
+    call('PUT', f"/api/elements/{element['id']}", headers=headers, json={'content': 'Прибыль', 'pos_x': 10})
+    call('GET', f"/api/elements/{element['id']}/status", headers=headers)
+
+    call('GET', '/api/presentations', headers=headers)
+    call('GET', f'/api/presentations/{presentation_id}', headers=headers)
+    call('GET', '/api/search', headers=headers, query_string={'q': 'прибыль'})
+    call('POST', f'/api/presentations/{presentation_id}/duplicate', 201, headers=headers)
+    call('POST', '/api/presentations/from-template', 201, headers=headers, json={'template_id': template_id})
+    call('GET', f'/api/presentations/{presentation_id}/download/pptx', headers=headers)
+    call('GET', '/api/presentations/export/zip', headers=headers).get_data()
+
+    call('DELETE', f"/api/elements/{element['id']}", 204, headers=headers)
+    call('DELETE', f"/api/slides/{slide['id']}", 204, headers=headers)
+    call('DELETE', f'/api/presentations/{presentation_id}', headers=headers)
+    call('POST', '/api/logout', headers=headers, json={'refresh_token': refresh_token})
+
+
+def test_hot_queries_use_indexes():
+    failures = {name: full_scans for name, _plan, full_scans in explain_query_plans() if full_scans}
+    assert not failures
+
+
+def test_route_queries_use_indexes(app):
+    statements = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        endpoint = request.endpoint if has_request_context() else None
+        if not executemany and READ_SQL_RE.match(statement) and endpoint not in FULL_LISTING_ENDPOINTS:
+            statements.setdefault(statement, (endpoint, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        _exercise_routes(app)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert statements
+    failures = {}
+    with db.engine.connect() as conn:
+        for statement, (endpoint, parameters) in statements.items():
+            plan = [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            full_scans = full_table_scans(plan, statement)
+            if full_scans:
+                failures[f"{endpoint}: {statement}"] = full_scans
+    assert not failures
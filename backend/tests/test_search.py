@@ -0,0 +1,39 @@
+import pytest
+from api.extensions import db
+from api.search import search_index
+from conftest import make_app, auth_headers
+
+
+@pytest.fixture(params=['fts5', 'inverted'])
+def client(request, tmp_path):
+    app = make_app(tmp_path, SEARCH_BACKEND=request.param)
+    with app.app_context():
+        db.create_all()
+        assert search_index.backend(db.session).name == request.param
+        yield app.test_client()
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _search(client, headers, query):
+    response = client.get('/api/search', headers=headers, query_string={'q': query})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_cyrillic_diacritics_match_on_every_backend(client):
+    headers = auth_headers(client)
+    response = client.post('/api/presentations', headers=headers, json={'title': 'Новый учебный год'})
+    assert response.status_code == 201
+    slide_id = client.get(f"/api/presentations/{response.get_json()['id']}", headers=headers).get_json()['slides'][0]['id']
+    response = client.post(f'/api/slides/{slide_id}/elements', headers=headers, json={
+        'element_type': 'TEXT', 'content': 'Мой йогурт и ещё немного текста'
+    })
+    assert response.status_code == 201
+
+    for query in ('новый', 'мой', 'йогурт', 'ЙОГ', 'еще', 'ещё'):
+        assert _search(client, headers, query)['total'] == 1, query
+    # Сниппет цитирует исходный текст, без нормализации
+    snippet = _search(client, headers, 'еще')['results'][0]['snippet']
+    assert '<mark>ещё</mark>' in snippet and snippet.count('<mark>') == 1
+    assert 'йогурт' in snippet
@@ -0,0 +1,46 @@
+from api import slide_order
+from conftest import auth_headers
+
+
+def _deck(client, headers):
+    response = client.post('/api/presentations', headers=headers, json={'title': 'Слайды'})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def _stale_count(monkeypatch, stale_calls):
+    # Имитирует параллельный запрос: счетчик прочитан до того, как другой запрос добавил слайд
+    real_count = slide_order.slide_count
+    calls = {'count': 0}
+
+    def slide_count(presentation_id):
+        calls['count'] += 1
+        count = real_count(presentation_id)
+        return count - 1 if calls['count'] <= stale_calls else count
+    monkeypatch.setattr(slide_order, 'slide_count', slide_count)
+
+
+def test_add_slide_retries_after_number_conflict(app, monkeypatch):
+    client = app.test_client()
+    headers = auth_headers(client)
+    presentation_id = _deck(client, headers)
+    _stale_count(monkeypatch, stale_calls=1)
+
+    response = client.post(f'/api/presentations/{presentation_id}/slides', headers=headers)
+    assert response.status_code == 201
+    assert response.get_json()['slide_number'] == 2
+    slides = client.get(f'/api/presentations/{presentation_id}', headers=headers).get_json()['slides']
+    assert [slide['slide_number'] for slide in slides] == [1, 2]
+
+
+def test_add_slide_returns_conflict_when_retries_exhausted(app, monkeypatch):
+    client = app.test_client()
+    headers = auth_headers(client)
+    presentation_id = _deck(client, headers)
+    _stale_count(monkeypatch, stale_calls=100)
+
+    response = client.post(f'/api/presentations/{presentation_id}/slides', headers=headers)
+    assert response.status_code == 409
+    monkeypatch.undo()
+    slides = client.get(f'/api/presentations/{presentation_id}', headers=headers).get_json()['slides']
+    assert len(slides) == 1
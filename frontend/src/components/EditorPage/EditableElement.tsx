@@ -131,9 +131,20 @@ export const EditableElement: React.FC<EditableElementProps> = ({
             ></iframe>
         );
       case 'UPLOADED_VIDEO':
+        if (element.status === 'processing' || element.status === 'failed') {
+          return (
+            <Box sx={{ width: '100%', height: '100%', display: 'flex', alignItems: 'center', justifyContent: 'center', bgcolor: 'grey.900', color: 'grey.100' }}>
+              <Typography variant="body2">
+                {element.status === 'processing' ? 'Видео обрабатывается...' : 'Не удалось обработать видео'}
+              </Typography>
+            </Box>
+          );
+        }
         return (
             <video
                 src={src}
+                poster={element.posterUrl ? `${API_BASE_URL}${element.posterUrl}` : undefined}
+                preload={element.posterUrl ? 'none' : 'metadata'}
                 width="100%"
                 height="100%"
                 controls
@@ -9,7 +9,6 @@ import AudioFileIcon from '@mui/icons-material/AudioFile';
 import PictureAsPdfIcon from '@mui/icons-material/PictureAsPdf';
 import AutoAwesomeIcon from '@mui/icons-material/AutoAwesome';
 import PaletteIcon from '@mui/icons-material/Palette';
-import { useAuth } from '../../context/AuthContext';
 import apiClient from '../../services/apiService';
 import { useNotification } from '../../context/NotificationContext';
 import { SlideElement } from '../../hooks/usePresentation';
@@ -30,25 +29,22 @@ export const EditorToolbar: React.FC<EditorToolbarProps> = ({
   title, presentationId, onRenameClick, onAddElement, onAddVideoClick, 
   activePanel, onActivePanelChange 
 }) => {
-  const { token } = useAuth();
   const { showNotification } = useNotification();
   const imageFileInputRef = useRef<HTMLInputElement>(null);
   const audioFileInputRef = useRef<HTMLInputElement>(null);
 
   const handleDownload = (format: 'pptx' | 'pdf') => {
-    const url = `http://127.0.0.1:5000/api/presentations/${presentationId}/download/${format}`;
     const filename = `${title}.${format}`;
 
-    fetch(url, {
-      headers: { 'Authorization': `Bearer ${token}` }
+    // Через apiClient, чтобы истекший access-токен обновился автоматически
+    apiClient.get(`/presentations/${presentationId}/download/${format}`, { responseType: 'blob' })
+    .catch(async error => {
+        const data = error.response?.data;
+        const payload = data instanceof Blob ? JSON.parse(await data.text()) : data;
+        throw new Error(payload?.message || `Ошибка ${error.response?.status}`);
     })
-    .then(res => {
-        if (!res.ok) {
-            return res.json().then(err => { throw new Error(err.message || `Ошибка ${res.status}`) });
-        }
-        return res.blob();
-    })
-    .then(blob => {
+    .then(response => {
+      const blob = response.data;
       const href = window.URL.createObjectURL(blob);
       const link = document.createElement('a');
       link.href = href;
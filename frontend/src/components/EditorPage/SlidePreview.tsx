@@ -10,6 +10,10 @@ const ElementPreview: React.FC<{ element: SlideElement }> = ({ element }) => {
     const [loadingThumb, setLoadingThumb] = useState(false);
 
     useEffect(() => {
+        if (element.posterUrl) {
+            setThumb(`${API_BASE_URL}${element.posterUrl}`);
+            return;
+        }
         if (element.element_type === 'UPLOADED_VIDEO' && element.content && !thumb) {
             setLoadingThumb(true);
             const video = document.createElement('video');
@@ -31,7 +35,7 @@ const ElementPreview: React.FC<{ element: SlideElement }> = ({ element }) => {
                 setLoadingThumb(false);
             }
         }
-    }, [element.content, element.element_type, thumb]);
+    }, [element.content, element.element_type, element.posterUrl, thumb]);
 
     let content;
 
@@ -81,7 +85,11 @@ const ElementPreview: React.FC<{ element: SlideElement }> = ({ element }) => {
         case 'AUDIO':
             content = (
                  <Box sx={{ width: '100%', height: '100%', display: 'flex', alignItems: 'center', justifyContent: 'center', bgcolor: 'grey.200', borderRadius: 1 }}>
-                    <MusicNoteIcon sx={{ fontSize: '2.5rem', color: 'text.secondary' }} />
+                    {thumb ? (
+                        <img src={thumb} alt="audio waveform" style={{ width: '100%', height: '100%', objectFit: 'fill' }} />
+                    ) : (
+                        <MusicNoteIcon sx={{ fontSize: '2.5rem', color: 'text.secondary' }} />
+                    )}
                 </Box>
             );
             break;
@@ -33,8 +33,8 @@ export const AuthModal: React.FC<AuthModalProps> = ({ open, onClose, initialForm
     setError(null);
   };
 
-  const handleLoginSuccess = (token: string, user: User) => {
-    login(token, user);
+  const handleLoginSuccess = (token: string, user: User, refreshToken: string) => {
+    login(token, user, refreshToken);
     onClose();
   };
 
@@ -42,7 +42,7 @@ export const AuthModal: React.FC<AuthModalProps> = ({ open, onClose, initialForm
     try {
       showNotification('Вы успешно зарегистрированы!', 'success');
       const response = await apiClient.post('/login', { email: values.email, password: values.password });
-      handleLoginSuccess(response.data.token, response.data.user);
+      handleLoginSuccess(response.data.token, response.data.user, response.data.refresh_token);
     } catch (err: any) {
       const errorMessage = err.response?.data?.message || 'Не удалось войти после регистрации.';
       setError(errorMessage);
@@ -6,7 +6,7 @@ import apiClient from '../../services/apiService';
 import { User } from '../../context/AuthContext';
 
 interface LoginFormProps {
-  onSuccess: (token: string, user: User) => void;
+  onSuccess: (token: string, user: User, refreshToken: string) => void;
   onError: (message: string) => void;
   switchToRegister: () => void;
 }
@@ -22,7 +22,7 @@ export const LoginForm: React.FC<LoginFormProps> = ({ onSuccess, onError, switch
       try {
         onError('');
         const response = await apiClient.post('/login', values);
-        onSuccess(response.data.token, response.data.user); 
+        onSuccess(response.data.token, response.data.user, response.data.refresh_token); 
       } catch (err: any) {
         onError(err.response?.data?.message || 'Произошла ошибка');
       } finally {
@@ -1,6 +1,6 @@
 import { createContext, useState, useContext, useEffect, ReactNode, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { setupInterceptors } from '../services/apiService';
+import apiClient, { setupInterceptors } from '../services/apiService';
 import { useNotification } from './NotificationContext';
 
 export interface User {
@@ -13,7 +13,7 @@ interface AuthContextType {
   token: string | null;
   user: User | null;
   isAuthenticated: boolean;
-  login: (token: string, user: User) => void;
+  login: (token: string, user: User, refreshToken: string) => void;
   logout: () => void;
 }
 
@@ -30,9 +30,14 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
   const { showNotification } = useNotification();
 
   const logout = useCallback(() => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      apiClient.post('/logout', { refresh_token: refreshToken }).catch(() => {});
+    }
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
     navigate('/');
   }, [navigate]);
@@ -41,10 +46,11 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
     setupInterceptors(logout);
   }, [logout]);
 
-  const login = (newToken: string, newUser: User) => {
+  const login = (newToken: string, newUser: User, refreshToken: string) => {
     setToken(newToken);
     setUser(newUser);
     localStorage.setItem('token', newToken);
+    localStorage.setItem('refresh_token', refreshToken);
     localStorage.setItem('user', JSON.stringify(newUser));
     showNotification('Добро пожаловать!', 'success');
     navigate('/presentations');
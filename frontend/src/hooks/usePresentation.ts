@@ -15,6 +15,10 @@ export interface SlideElement {
   autoplay: boolean;
   muted: boolean;
   thumbnailUrl?: string;
+  posterUrl?: string;
+  thumbnailStripUrl?: string;
+  waveformUrl?: string;
+  status?: 'processing' | 'ready' | 'failed';
 }
 
 export interface Slide {
@@ -92,6 +96,43 @@ export const usePresentation = (presentationId?: string) => {
     savePendingUpdates();
   }, [debouncedUpdates, showNotification]);
 
+  const processingElementIds = (presentation?.slides || [])
+    .flatMap(s => s.elements)
+    .filter(e => e.status === 'processing')
+    .map(e => e.id)
+    .join(',');
+
+  useEffect(() => {
+    if (!processingElementIds) return;
+
+    const interval = setInterval(async () => {
+      const results = await Promise.all(
+        processingElementIds.split(',').map(id =>
+          apiClient.get(`/elements/${id}/status`).then(r => r.data).catch(() => null)
+        )
+      );
+      const finished: Record<string, SlideElement['status']> = {};
+      results.forEach(r => {
+        if (r && r.status !== 'processing') finished[r.id] = r.status;
+      });
+      if (Object.keys(finished).length === 0) return;
+
+      updatePresentationState(prev => {
+        if (!prev) return null;
+        const newSlides = prev.slides.map(s => ({
+          ...s,
+          elements: s.elements.map(e => finished[e.id] ? { ...e, status: finished[e.id] } : e)
+        }));
+        return { ...prev, slides: newSlides };
+      });
+      if (Object.values(finished).includes('failed')) {
+        showNotification('Не удалось обработать видеофайл', 'error');
+      }
+    }, 3000);
+
+    return () => clearInterval(interval);
+  }, [processingElementIds, showNotification, updatePresentationState]);
+
   const handleUpdateMultipleElements = useCallback((updates: Record<string, Partial<SlideElement>>, saveImmediately: boolean) => {
     if (!activeSlide) return;
 
@@ -20,13 +20,53 @@ apiClient.interceptors.request.use(
   }
 );
 
+let refreshPromise: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    refreshPromise = (refreshToken
+      ? axios.post(`${apiClient.defaults.baseURL}/refresh`, { refresh_token: refreshToken })
+      : Promise.reject(new Error('Нет refresh-токена'))
+    )
+      .then((response) => {
+        localStorage.setItem('token', response.data.token);
+        localStorage.setItem('refresh_token', response.data.refresh_token);
+        localStorage.setItem('user', JSON.stringify(response.data.user));
+        return response.data.token as string;
+      })
+      .catch((error) => {
+        // Соседняя вкладка могла уже обменять токен — тогда используем сохраненный ею
+        const storedRefreshToken = localStorage.getItem('refresh_token');
+        if (storedRefreshToken && storedRefreshToken !== refreshToken) {
+          return localStorage.getItem('token') as string;
+        }
+        throw error;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 export const setupInterceptors = (logout: () => void) => {
   apiClient.interceptors.response.use(
     (response) => {
       return response;
     },
-    (error) => {
-      if (error.response && error.response.status === 401) {
+    async (error) => {
+      const originalRequest = error.config;
+      if (error.response && error.response.status === 401 && originalRequest && !originalRequest._retry) {
+        originalRequest._retry = true;
+        try {
+          const token = await refreshAccessToken();
+          originalRequest.headers['Authorization'] = `Bearer ${token}`;
+          return apiClient(originalRequest);
+        } catch {
+          logout();
+        }
+      } else if (error.response && error.response.status === 401) {
         logout();
       }
       return Promise.reject(error);